@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .metrics import install_query_recorder
+        from .querycheck import install_statement_recorder
+        connection_created.connect(install_query_recorder)
+        connection_created.connect(install_statement_recorder)
@@ -0,0 +1,258 @@
+"""
+Асинхронный путь чтения для ASGI.
+
+Под ASGI маршруты произведений, категорий, жанров, отзывов и
+комментариев обслуживают асинхронные обертки над обычными вьюсетами:
+для GET и HEAD работа с ORM и рендеринг выполняются в ограниченном
+пуле потоков (ASYNC_READS['WORKERS']), а не в единственном потоке,
+через который Django пропускает синхронный код. Запись и остальные
+маршруты обслуживаются как обычно.
+
+ReadCacheApplication держит в памяти процесса готовые ответы на
+анонимные GET-запросы к этим маршрутам и отдает их прямо из цикла
+событий, не доходя до Django. Ответы хранятся в том виде, в каком их
+отдал Django, то есть уже сжатыми (api.compression). Кэш сбрасывается
+сигналами при любом изменении данных в этом процессе, изменения
+в других процессах становятся видны не позже чем через
+ASYNC_READS['CACHE_SECONDS'].
+
+Потоковые ответы (выгрузка api.export) Django 3.2 перебирает прямо в
+цикле событий, где ORM недоступна. AsyncReadHandler берет каждую их
+часть в потоке синхронного кода Django, в котором отработала вью и
+открыто ее соединение с базой.
+"""
+import asyncio
+import contextvars
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+from .compression import negotiate
+from .events import EventStreamApplication
+
+READ_BASENAMES = (
+    'titles', 'categories', 'genres', 'reviews', 'comments', 'user-reviews',
+    'user-comments',
+)
+READ_METHODS = ('GET', 'HEAD')
+CACHED_PATHS = re.compile(r'^/api/v1/(titles|categories|genres)/')
+# Заголовки запроса, от которых зависит ответ (кроме Accept-Encoding:
+# в ключ входит выбранная по нему кодировка).
+KEY_HEADERS = (b'host', b'accept')
+
+DEFAULTS = {
+    'WORKERS': 8,
+    'CACHE_SECONDS': 5,
+    'CACHE_MAX_ENTRIES': 1000,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'ASYNC_READS', {})}
+
+
+executor = ThreadPoolExecutor(
+    max_workers=get_config()['WORKERS'], thread_name_prefix='reads'
+)
+
+
+def run_view(view, request, args, kwargs):
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """
+    Асинхронная обертка: чтения (GET, HEAD) выполняет в пуле, запись —
+    как обычную синхронную вью Django.
+    """
+    sync_view = sync_to_async(view, thread_sensitive=True)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await sync_view(request, *args, **kwargs)
+        # Контекст (реплика для чтения, метрики запроса) переносится
+        # в поток пула.
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            functools.partial(
+                context.run, run_view, view, request, args, kwargs
+            ),
+        )
+
+    return wrapper
+
+
+def async_patterns(patterns):
+    """
+    Заменяет вью маршрутов READ_BASENAMES асинхронными обертками,
+    отправляющими в пул только чтения.
+    """
+    result = []
+    for pattern in patterns:
+        initkwargs = getattr(pattern.callback, 'initkwargs', {})
+        if initkwargs.get('basename') in READ_BASENAMES:
+            pattern = URLPattern(
+                pattern.pattern,
+                async_view(pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+        result.append(pattern)
+    return result
+
+
+class ReadCache:
+    """Готовые ответы (статус, заголовки, тело) с ограниченным сроком."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def make_key(self, scope):
+        if (
+            scope['type'] != 'http'
+            or scope['method'] != 'GET'
+            or not CACHED_PATHS.match(scope['path'])
+        ):
+            return None
+        headers = dict(scope['headers'])
+        if b'authorization' in headers:
+            return None
+        accept_encoding = headers.get(b'accept-encoding', b'')
+        return (
+            scope['scheme'], scope['path'], scope['query_string'],
+            *(headers.get(name) for name in KEY_HEADERS),
+            negotiate(accept_encoding.decode('latin-1')),
+        )
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key, generation, response):
+        config = get_config()
+        with self.lock:
+            # Пока ответ готовился, данные могли измениться.
+            if generation != self.generation:
+                return
+            self.entries[key] = (
+                time.monotonic() + config['CACHE_SECONDS'], response
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > config['CACHE_MAX_ENTRIES']:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+read_cache = ReadCache()
+
+
+def collect_response(messages):
+    """Собирает ответ из сообщений ASGI, если его можно кэшировать."""
+    start, *bodies = messages
+    if (
+        start['status'] != 200
+        or any(name == b'set-cookie' for name, _ in start['headers'])
+        or not bodies
+        or bodies[-1].get('more_body', False)
+    ):
+        return None
+    body = b''.join(message.get('body', b'') for message in bodies)
+    return start['status'], start['headers'], body
+
+
+class ReadCacheApplication:
+    """ASGI-обертка, отдающая ответы из read_cache."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        key = read_cache.make_key(scope)
+        if key is None:
+            return await self.app(scope, receive, send)
+        cached = read_cache.get(key)
+        if cached is not None:
+            status, headers, body = cached
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': headers,
+            })
+            await send({'type': 'http.response.body', 'body': body})
+            return
+        generation = read_cache.generation
+        messages = []
+
+        async def capture(message):
+            messages.append(message)
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if messages:
+            response = collect_response(messages)
+            if response is not None:
+                read_cache.put(key, generation, response)
+
+
+class AsyncReadRequest(ASGIRequest):
+    urlconf = 'api_yamdb.urls_asgi'
+
+
+class AsyncReadHandler(ASGIHandler):
+    request_class = AsyncReadRequest
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        # Заголовки и завершающее сообщение отправляет Django, части
+        # тела — send_parts сразу после заголовков.
+        response.streaming_content = ()
+
+        async def send_parts(message):
+            await send(message)
+            if message['type'] != 'http.response.start':
+                return
+            while True:
+                part = await next_part(parts, None)
+                if part is None:
+                    return
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+
+        await super().send_response(response, send_parts)
+
+
+def get_application():
+    return EventStreamApplication(ReadCacheApplication(AsyncReadHandler()))
@@ -0,0 +1,23 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .revocation import revocation_list
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с проверкой списка отозванных токенов.
+
+    Список хранится в памяти процесса, поэтому проверка
+    не добавляет запросов к базе.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token):
+            raise InvalidToken({
+                'detail': _('Token has been revoked'),
+                'code': 'token_revoked',
+            })
+        return validated_token
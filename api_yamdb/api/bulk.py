@@ -0,0 +1,159 @@
+"""
+Массовое создание и изменение пользователей.
+
+Записи обрабатываются пачками: поля проверяются сериализатором,
+уникальность username и email — одним запросом на пачку,
+сохранение — через bulk_create/bulk_update.
+"""
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from api import consts
+from reviews.models import User
+from reviews.signals import users_changed
+from .serializers import UserBulkSerializer
+
+CREATE = 'create'
+UPDATE = 'update'
+UPSERT = 'upsert'
+
+
+def iter_batches(rows, batch_size):
+    """Разбивает любой итерируемый объект на списки длиной batch_size."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def validate_batch(batch, mode):
+    """
+    Проверяет пачку записей и возвращает (validated_data, errors).
+
+    errors — словарь {номер записи в пачке: ошибки}.
+    """
+    serializer = UserBulkSerializer(
+        data=batch, many=True, partial=(mode == UPDATE)
+    )
+    if not serializer.is_valid():
+        errors = serializer.errors
+        if not isinstance(errors, list):
+            return None, {0: errors}
+        return None, {
+            index: error for index, error in enumerate(errors) if error
+        }
+    items = serializer.validated_data
+    errors = {}
+    if mode == UPDATE:
+        for index, item in enumerate(items):
+            if 'username' not in item:
+                errors[index] = {'username': ['Обязательное поле.']}
+    return items, errors
+
+
+def check_uniqueness(items, mode):
+    """
+    Сверяет пачку с базой одним запросом.
+
+    Возвращает (existing, errors), где existing — {username: User}
+    для уже существующих пользователей.
+    """
+    usernames = {item['username'] for item in items}
+    emails = {item['email'] for item in items if 'email' in item}
+    users = list(
+        User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+    )
+    existing = {user.username: user for user in users}
+    email_owners = {user.email: user.username for user in users}
+
+    errors = {}
+    seen_usernames = set()
+    seen_emails = set()
+    for index, item in enumerate(items):
+        username = item['username']
+        email = item.get('email')
+        error = {}
+        if username in seen_usernames:
+            error['username'] = [f'Username {username} повторяется в запросе.']
+        elif mode == CREATE and username in existing:
+            error['username'] = [f'Username {username} уже занято']
+        elif mode == UPDATE and username not in existing:
+            error['username'] = [f'Пользователь {username} не найден.']
+        if email is not None:
+            if email in seen_emails:
+                error['email'] = [f'Почта {email} повторяется в запросе.']
+            elif email_owners.get(email, username) != username:
+                error['email'] = [
+                    f'Пользователь с почтой {email} уже зарагистрирован.'
+                ]
+            seen_emails.add(email)
+        seen_usernames.add(username)
+        if error:
+            errors[index] = error
+    return existing, errors
+
+
+def save_batch(items, existing, ids=None):
+    """Создает новых и обновляет существующих пользователей пачки."""
+    to_create = []
+    to_update = []
+    fields = set()
+    for index, item in enumerate(items):
+        user = existing.get(item['username'])
+        if user is None:
+            user = User(**item)
+            if ids and ids[index]:
+                user.id = ids[index]
+            to_create.append(user)
+            continue
+        for field, value in item.items():
+            setattr(user, field, value)
+        fields.update(item)
+        to_update.append(user)
+    fields.discard('username')
+    if to_create:
+        User.objects.bulk_create(to_create)
+    if to_update and fields:
+        User.objects.bulk_update(to_update, sorted(fields))
+    return to_create, to_update
+
+
+def bulk_save_users(rows, mode, batch_size=consts.BULK_BATCH_SIZE,
+                    keep_ids=False):
+    """
+    Создает и/или обновляет пользователей пачками в одной транзакции.
+
+    mode: CREATE — все пользователи новые, UPDATE — все существуют
+    (записи ищутся по username), UPSERT — создать или обновить.
+    При keep_ids создаваемым пользователям сохраняется переданный id.
+    При первой ошибке транзакция откатывается и выбрасывается
+    ValidationError с ошибками по номерам записей.
+    Возвращает (created, updated).
+    """
+    created = []
+    updated = []
+    with transaction.atomic():
+        for number, batch in enumerate(iter_batches(rows, batch_size)):
+            offset = number * batch_size
+            items, errors = validate_batch(batch, mode)
+            if not errors:
+                existing, errors = check_uniqueness(items, mode)
+            if errors:
+                raise serializers.ValidationError({
+                    offset + index: error for index, error in errors.items()
+                })
+            ids = [row.get('id') for row in batch] if keep_ids else None
+            batch_created, batch_updated = save_batch(items, existing, ids)
+            created.extend(batch_created)
+            updated.extend(batch_updated)
+        user_ids = {user.id for user in updated}
+        if user_ids:
+            transaction.on_commit(
+                lambda: users_changed.send(sender=User, user_ids=user_ids)
+            )
+    return created, updated
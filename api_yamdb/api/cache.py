@@ -0,0 +1,54 @@
+"""
+Кэширование ответов API.
+
+Используется кэш Django по умолчанию (settings.CACHES): чтобы сброс
+был виден всем процессам, в продакшене нужен общий бэкенд.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+
+ME_CACHE_KEY = 'users:me:{user_id}'
+ME_CACHE_TIMEOUT = 60 * 60
+
+
+def make_etag(data):
+    content = json.dumps(
+        data, sort_keys=True, ensure_ascii=False, default=str
+    ).encode()
+    return quote_etag(hashlib.md5(content).hexdigest())
+
+
+def etag_matches(request, etag):
+    """Проверяет заголовок If-None-Match (слабое сравнение)."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    return etag in (
+        value[2:] if value.startswith('W/') else value for value in etags
+    )
+
+
+def get_me_payload(user, serializer_class):
+    """
+    Возвращает {'data': ..., 'etag': ...} для /users/me/ из кэша,
+    при промахе сериализует пользователя и кладет результат в кэш.
+    """
+    key = ME_CACHE_KEY.format(user_id=user.pk)
+    payload = cache.get(key)
+    if payload is None:
+        data = dict(serializer_class(user).data)
+        payload = {'data': data, 'etag': make_etag(data)}
+        cache.set(key, payload, ME_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_users(user_ids):
+    cache.delete_many(
+        [ME_CACHE_KEY.format(user_id=user_id) for user_id in user_ids]
+    )
@@ -0,0 +1,279 @@
+"""
+Запись выборки реального трафика API для последующего воспроизведения.
+
+TrafficCaptureMiddleware (при заданном CAPTURE['PATH']) отбирает долю
+SAMPLE_RATE запросов к /api/ и пишет их в JSONL по строке на запрос:
+время, метод, маршрут (шаблон URL), путь, параметры, тело или только
+его SHA-256 и размер (BODY = 'full' | 'digest'), обезличенный
+пользователь (HMAC от id на SECRET_KEY) с ролью, статус и время ответа.
+
+Личные и учетные данные в файл не попадают: имя пользователя в пути
+заменяется на {user}, а его HMAC пишется в path_user; от тел запросов
+авторизации (код подтверждения, refresh-токен) сохраняется только
+размер; в остальных телах значения REDACTED_KEYS заменяются на
+REDACTED, а тело, которое не разобрать как JSON или форму, сохраняется
+только хэшем.
+
+Запрос только кладет сырые поля в ограниченную очередь (put_nowait);
+сериализацию, хэширование и запись пачками делает фоновый поток, так
+что к времени ответа запись ничего не добавляет. При переполненной
+очереди записи отбрасываются и считаются в dropped. Процессы дописывают
+пачки в общий файл одним write() с O_APPEND, строки не перемешиваются.
+
+Файл воспроизводит команда replay_traffic (api.replay).
+"""
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from . import consts
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'PATH': None,
+    'SAMPLE_RATE': 0.01,
+    'BODY': 'digest',
+    'MAX_BODY_BYTES': 65536,
+    'QUEUE_SIZE': 10000,
+}
+
+FULL_BODY = 'full'
+SECRET_BODY = 'secret'
+SECRET_BODY_URL_NAMES = ('signup', 'token', 'revoke')
+REDACTED_KEYS = ('confirmation_code', 'email', 'password')
+REDACTED = '***'
+PATH_USER = '{user}'
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+BATCH_SIZE = 500
+FLUSH_TIMEOUT_SECONDS = 5
+SKIPPED_CONTENT_TYPES = ('multipart/',)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CAPTURE', {})}
+
+
+def anonymize(user_id):
+    return hmac.new(
+        settings.SECRET_KEY.encode(), str(user_id).encode(), hashlib.sha256
+    ).hexdigest()[:16]
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in REDACTED_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def redacted_body(body, content_type):
+    """Текст тела без REDACTED_KEYS; None, если тело не разобрать."""
+    try:
+        text = body.decode()
+    except UnicodeDecodeError:
+        return None
+    if (content_type or '').startswith(FORM_CONTENT_TYPE):
+        return urlencode([
+            (key, REDACTED if key in REDACTED_KEYS else value)
+            for key, value in parse_qsl(text, keep_blank_values=True)
+        ])
+    try:
+        return json.dumps(redact(json.loads(text)), ensure_ascii=False)
+    except ValueError:
+        return None
+
+
+def format_entry(entry):
+    (started, method, route, path, path_user, params, body, content_type,
+     user_id, role, status, duration, body_mode, max_body) = entry
+    secret = body_mode == SECRET_BODY
+    record = {
+        'ts': round(started, 6),
+        'method': method,
+        'route': route,
+        'path': path,
+        'path_user': None if path_user is None else anonymize(path_user),
+        'params': params,
+        'content_type': content_type,
+        'body_size': None if body is None else len(body),
+        'body_sha256': (
+            hashlib.sha256(body).hexdigest() if body and not secret else None
+        ),
+        'user': None if user_id is None else anonymize(user_id),
+        'role': role,
+        'status': status,
+        'duration_ms': round(duration * 1000, 3),
+    }
+    if body and body_mode == FULL_BODY and len(body) <= max_body:
+        text = redacted_body(body, content_type)
+        if text is not None:
+            record['body'] = text
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class CaptureWriter:
+    """Фоновая запись захваченных запросов пачками."""
+
+    def __init__(self, path, queue_size):
+        self.path = path
+        self.pid = os.getpid()
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self.failed = 0
+        self.thread = threading.Thread(
+            target=self.run, name='traffic-capture', daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(''.join(map(format_entry, batch)).encode())
+            except Exception:
+                # Поток должен пережить ошибку записи (нет места, нет
+                # прав): иначе запись остановится, а flush будет ждать
+                # вечно.
+                self.failed += len(batch)
+                logger.exception(
+                    'Не удалось записать %s запросов в %s',
+                    len(batch), self.path,
+                )
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def write(self, data):
+        descriptor = os.open(
+            self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        try:
+            os.write(descriptor, data)
+        finally:
+            os.close(descriptor)
+
+    def flush(self, timeout=FLUSH_TIMEOUT_SECONDS):
+        """Ждет записи очереди не дольше timeout; True, если дождался."""
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.thread.is_alive():
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer(config):
+    """Писатель текущего процесса (после fork создается заново)."""
+    global _writer
+    path = str(config['PATH'])
+    writer = _writer
+    if writer is None or writer.path != path or writer.pid != os.getpid():
+        with _writer_lock:
+            writer = _writer
+            if (
+                writer is None or writer.path != path
+                or writer.pid != os.getpid()
+            ):
+                writer = CaptureWriter(path, config['QUEUE_SIZE'])
+                atexit.register(writer.flush)
+                _writer = writer
+    return writer
+
+
+def flush():
+    if _writer is not None:
+        _writer.flush()
+
+
+class TrafficCaptureMiddleware(MiddlewareMixin):
+
+    def process_request(self, request):
+        config = get_config()
+        if (
+            config['PATH'] is None
+            or not request.path.startswith('/api/')
+            or random.random() >= config['SAMPLE_RATE']
+        ):
+            return
+        request.capture_config = config
+        request.capture_started = time.time()
+        request.capture_timer = time.perf_counter()
+        content_type = request.META.get('CONTENT_TYPE', '')
+        # Тело читается до вью: после разбора потока DRF оно недоступно.
+        request.capture_body = (
+            None
+            if content_type.startswith(SKIPPED_CONTENT_TYPES)
+            else request.body
+        )
+
+    def process_response(self, request, response):
+        config = getattr(request, 'capture_config', None)
+        if config is None:
+            return response
+        duration = time.perf_counter() - request.capture_timer
+        match = request.resolver_match
+        user = getattr(request, 'user', None)
+        authenticated = user is not None and user.is_authenticated
+        # Суперпользователь воспроизводится администратором.
+        role = None
+        if authenticated:
+            role = consts.ADMIN if user.is_admin else user.role
+        path = request.path
+        path_user = None
+        body_mode = config['BODY']
+        if match is not None:
+            path_user = match.kwargs.get('username')
+            if path_user is not None:
+                path = path.replace(f'/{path_user}/', f'/{PATH_USER}/', 1)
+            if match.url_name in SECRET_BODY_URL_NAMES:
+                body_mode = SECRET_BODY
+        get_writer(config).submit((
+            request.capture_started,
+            request.method,
+            match.route if match is not None else None,
+            path,
+            path_user,
+            dict(request.GET.lists()),
+            request.capture_body,
+            request.META.get('CONTENT_TYPE') or None,
+            user.pk if authenticated else None,
+            role,
+            response.status_code,
+            duration,
+            body_mode,
+            config['MAX_BODY_BYTES'],
+        ))
+        return response
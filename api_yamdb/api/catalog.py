@@ -0,0 +1,92 @@
+"""
+Кэш слагов категорий и жанров в памяти процесса.
+
+Справочники меняются редко, поэтому слаг -> (id, name, slug) хранится
+в словаре процесса. Версия каталога лежит в общем кэше Django: любая
+запись категории или жанра увеличивает её, и процессы с устаревшей
+версией очищают свои словари. Слаги, которых нет в словаре,
+дочитываются из базы одним запросом с IN.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.models import Category, Genre
+
+CATALOG_VERSION_KEY = 'catalog:version'
+SLUG_CACHE_FIELDS = ('id', 'name', 'slug')
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Ключ мог быть вытеснен: начинаем с нового, а не с 1,
+        # чтобы не совпасть с версией, которую процессы уже видели.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+class SlugCache:
+    """Словарь слаг -> строка справочника для одной модели."""
+
+    def __init__(self, model):
+        self.model = model
+        self.version = None
+        self.rows = {}
+
+    def sync(self):
+        version = get_catalog_version()
+        if version != self.version:
+            self.rows = {}
+            self.version = version
+        return self.rows
+
+    def make_instance(self, row):
+        return self.model.from_db(DEFAULT_DB_ALIAS, SLUG_CACHE_FIELDS, row)
+
+    def resolve(self, slugs):
+        """
+        Возвращает {слаг: объект} для найденных слагов.
+
+        Отсутствующие в словаре слаги дочитываются одним запросом.
+        """
+        rows = self.sync()
+        missing = {slug for slug in slugs if slug not in rows}
+        if missing:
+            for row in self.model.objects.filter(
+                slug__in=missing
+            ).order_by().values_list(*SLUG_CACHE_FIELDS):
+                rows[row[2]] = row
+        return {
+            slug: self.make_instance(rows[slug])
+            for slug in slugs if slug in rows
+        }
+
+    def resolve_ids(self, ids):
+        """Возвращает {id: объект}; промахи дочитываются одним запросом."""
+        rows = {row[0]: row for row in self.sync().values()}
+        missing = {pk for pk in ids if pk not in rows}
+        if missing:
+            for row in self.model.objects.filter(
+                id__in=missing
+            ).order_by().values_list(*SLUG_CACHE_FIELDS):
+                rows[row[0]] = self.rows[row[2]] = row
+        return {pk: self.make_instance(rows[pk]) for pk in ids if pk in rows}
+
+
+slug_caches = {model: SlugCache(model) for model in (Category, Genre)}
+
+
+def reset_slug_caches():
+    for slug_cache in slug_caches.values():
+        slug_cache.version = None
+        slug_cache.rows = {}
@@ -0,0 +1,90 @@
+"""
+Лента изменений для синхронизации клиентов (/api/v1/changes/).
+
+Записи журнала (reviews.changes) после токена сворачиваются до
+последней записи о каждом объекте; для созданных и измененных
+объектов в ответ добавляется их текущее представление, для удаленных —
+только модель и id.
+"""
+from api import consts
+from reviews.models import (
+    Category, Change, Comment, Genre, Review, TitleDocument
+)
+from .serializers import ReviewSerializer, UserCommentSerializer
+
+
+def render_titles(ids):
+    return dict(TitleDocument.objects.filter(
+        title_id__in=ids
+    ).values_list('title_id', 'data'))
+
+
+def render_catalog(model):
+    def render(ids):
+        return {
+            row['id']: row for row in model.objects.filter(
+                id__in=ids
+            ).values('id', 'name', 'slug')
+        }
+    return render
+
+
+def render_reviews(ids):
+    reviews = Review.objects.filter(id__in=ids).select_related('author')
+    return {
+        data['id']: data
+        for data in ReviewSerializer(reviews, many=True).data
+    }
+
+
+def render_comments(ids):
+    comments = Comment.objects.filter(id__in=ids).select_related(
+        'author', 'review'
+    )
+    return {
+        data['id']: data
+        for data in UserCommentSerializer(comments, many=True).data
+    }
+
+
+RENDERERS = {
+    Change.TITLE: render_titles,
+    Change.CATEGORY: render_catalog(Category),
+    Change.GENRE: render_catalog(Genre),
+    Change.REVIEW: render_reviews,
+    Change.COMMENT: render_comments,
+}
+
+
+def read_changes(since, limit=consts.CHANGES_PAGE_SIZE):
+    """
+    Возвращает (изменения, новый токен, есть ли еще) для записей
+    журнала после since.
+    """
+    entries = list(Change.objects.filter(id__gt=since).order_by(
+        'id'
+    ).values_list('id', 'model', 'object_id', 'action')[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    latest = {}
+    for _, model, object_id, action in entries:
+        latest.pop((model, object_id), None)
+        latest[(model, object_id)] = action
+    upserts = {}
+    for (model, object_id), action in latest.items():
+        if action == Change.UPSERT:
+            upserts.setdefault(model, []).append(object_id)
+    rendered = {
+        model: RENDERERS[model](ids) for model, ids in upserts.items()
+    }
+    changes = []
+    for (model, object_id), action in latest.items():
+        change = {'model': model, 'id': object_id, 'action': action}
+        if action == Change.UPSERT:
+            if object_id not in rendered[model]:
+                # Объект уже удален: удаление придет дальше по журналу.
+                continue
+            change['data'] = rendered[model][object_id]
+        changes.append(change)
+    token = entries[-1][0] if entries else since
+    return changes, token, has_more
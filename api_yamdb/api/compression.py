@@ -0,0 +1,122 @@
+"""
+Сжатие ответов.
+
+Кодировка выбирается по Accept-Encoding с учетом q-значений: brotli
+(если установлен модуль brotli), затем gzip. Сжимаются только JSON и
+текст не меньше COMPRESSION['MIN_SIZE'] байт. Готовые ответы кэшей
+(снимки справочников, кэш ответов ASGI) хранятся уже сжатыми, поэтому
+попадание в кэш не сжимает тело повторно.
+
+Для каждой точки API считается, сколько байт сэкономлено и сколько
+процессорного времени ушло на сжатие (compression_stats); отчет
+печатает команда compression_report.
+"""
+import gzip
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP = 'gzip'
+BROTLI = 'br'
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'COMPRESSION', {})}
+
+
+def supported_encodings():
+    """Поддерживаемые кодировки в порядке предпочтения."""
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def parse_accept_encoding(header):
+    codings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def negotiate(header):
+    """
+    Выбирает кодировку для заголовка Accept-Encoding или None.
+
+    Побеждает наибольшее q, при равенстве — порядок предпочтения
+    сервера; «*» относится ко всем не перечисленным кодировкам.
+    """
+    if not header:
+        return None
+    codings = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = codings.get(encoding, codings.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding):
+    config = get_config()
+    if encoding == BROTLI:
+        return brotli.compress(content, quality=config['BROTLI_QUALITY'])
+    return gzip.compress(content, config['GZIP_LEVEL'], mtime=0)
+
+
+def is_compressible(response):
+    return response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionStats:
+    """Сэкономленные байты и время сжатия по точкам API."""
+
+    FIELDS = ('responses', 'original', 'compressed', 'cpu_seconds')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, endpoint, original, compressed, cpu_seconds):
+        with self.lock:
+            stats = self.endpoints[endpoint]
+            stats['responses'] += 1
+            stats['original'] += original
+            stats['compressed'] += compressed
+            stats['cpu_seconds'] += cpu_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                endpoint: dict(stats)
+                for endpoint, stats in self.endpoints.items()
+            }
+
+
+compression_stats = CompressionStats()
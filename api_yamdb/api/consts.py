@@ -4,8 +4,20 @@ MODER = 'moderator'
 
 MAX_SCORE = 10
 MIN_SCORE = 1
-LENGTH_CONFIRMATION_CODE = 6
+LENGTH_CONFIRMATION_CODE = 64
 NAME_LENGTH = 256
 NAME_USER_LENGTH = 150
 ROLE_LENGTH = 20
 SLUG_LENGTH = 50
+JOB_FIELD_LENGTH = 30
+
+BULK_BATCH_SIZE = 500
+TOP_TITLES_LIMIT = 10
+LEADERBOARD_KEY_LENGTH = 30
+TRENDING_HALF_LIFE_DAYS = 7
+CATEGORY_DELETE_BATCH_SIZE = 500
+CHANGE_FIELD_LENGTH = 10
+CHANGES_PAGE_SIZE = 500
+CHANGES_RETENTION_DAYS = 30
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_GZIP_LEVEL = 6
@@ -0,0 +1,329 @@
+"""
+Генератор больших наборов данных в схемах static/data/*.csv.
+
+Популярность произведений распределена по Ципфу: число отзывов
+произведения ранга r пропорционально 1 / r ** zipf (не больше числа
+пользователей — у автора один отзыв на произведение), ранги
+перемешаны относительно id. Часть комментариев (VIRAL_SHARE) достается
+небольшому набору «вирусных» отзывов, остальные — равномерно. Тексты
+собираются из слов исходных отзывов и комментариев, длина в словах —
+логнормальная. Категории и жанры берутся из исходных файлов.
+
+Каждая таблица делится на куски по chunk_size строк; кусок полностью
+определяется seed, таблицей и номером, поэтому результат не зависит от
+числа процессов. Куски пишутся процессами пула во временные файлы и
+по порядку дописываются в итоговый, так что память не растет с
+размером набора.
+"""
+import bisect
+import csv
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from multiprocessing import Pool
+
+from django.conf import settings
+
+from . import consts
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+HEADERS = {
+    'users': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+              'last_name'),
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'titles': ('id', 'name', 'year', 'category'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+COPIED_TABLES = ('category', 'genre')
+
+ROLES = (consts.USER, consts.MODER, consts.ADMIN)
+ROLE_WEIGHTS = (989, 10, 1)
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 8, 13, 18, 20, 28)
+FIRST_NAMES = (
+    'Александр', 'Мария', 'Дмитрий', 'Анна', 'Сергей', 'Елена', 'Иван',
+    'Ольга', 'Максим', 'Наталья', 'Андрей', 'Татьяна', 'Павел', 'Юлия',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Соколов', 'Лебедева',
+    'Козлов', 'Новикова', 'Морозов', 'Волкова', 'Павлов', 'Зайцева',
+)
+MAX_GENRES = 3
+YEARS = (1900, 2024)
+# Отзывы датируются этим интервалом, комментарии — позже своего отзыва.
+DATES = (
+    datetime(2015, 1, 1, tzinfo=timezone.utc).timestamp(),
+    datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp(),
+)
+COMMENT_DELAY_SECONDS = 3 * 24 * 3600
+REVIEW_WORDS = 40
+COMMENT_WORDS = 12
+BIO_WORDS = 8
+WORDS_SIGMA = 0.8
+MAX_WORDS = 600
+CORPUS_WORDS = 200000
+VIRAL_SHARE = 0.3
+VIRAL_REVIEWS_PER = 10000
+
+MASK = (1 << 64) - 1
+
+
+def mix(*values):
+    """Детерминированный 64-битный хэш целых (splitmix64)."""
+    result = 0
+    for value in values:
+        result = (result + value + 0x9E3779B97F4A7C15) & MASK
+        result = ((result ^ (result >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+        result = ((result ^ (result >> 27)) * 0x94D049BB133111EB) & MASK
+        result ^= result >> 31
+    return result
+
+
+def coprime_step(number, modulo):
+    step = number % modulo or 1
+    while math.gcd(step, modulo) != 1:
+        step = step % modulo + 1
+    return step
+
+
+def read_seed_rows(table):
+    with open(DATA_DIR / f'{table}.csv', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def read_vocabulary():
+    words = [
+        word.strip('.,!?…«»"()—:;').lower()
+        for table in ('review', 'comments')
+        for row in read_seed_rows(table)
+        for word in row['text'].split()
+    ]
+    return sorted({word for word in words if word.isalpha()})
+
+
+def review_counts(titles, reviews, users, zipf):
+    """
+    Число отзывов произведения каждого ранга: доли по Ципфу,
+    остаток от округления — самым популярным, превышение числа
+    пользователей переносится на следующие ранги.
+    """
+    weights = [1 / rank ** zipf for rank in range(1, titles + 1)]
+    total = sum(weights)
+    counts = [int(reviews * weight / total) for weight in weights]
+    for rank in range(reviews - sum(counts)):
+        counts[rank % titles] += 1
+    carry = 0
+    for rank, count in enumerate(counts):
+        count += carry
+        counts[rank] = min(count, users)
+        carry = count - counts[rank]
+    if carry:
+        raise ValueError(
+            f'{reviews} отзывов не помещаются: у каждого из {users} '
+            f'пользователей не больше одного отзыва на каждое из {titles} '
+            f'произведений.'
+        )
+    return counts
+
+
+class Plan:
+    """Параметры набора, общие для всех кусков."""
+
+    def __init__(self, users, titles, reviews, comments, seed=0, zipf=1.1,
+                 chunk_size=100000):
+        if min(users, titles) < 1 and (reviews or comments):
+            raise ValueError('Для отзывов нужны пользователи и произведения.')
+        if comments and not reviews:
+            raise ValueError('Для комментариев нужны отзывы.')
+        self.sizes = {
+            'users': users, 'titles': titles, 'genre_title': titles,
+            'review': reviews, 'comments': comments,
+        }
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.vocabulary = read_vocabulary()
+        # Тексты — случайные отрезки одной длинной цепочки слов: срез
+        # строки в разы дешевле выбора каждого слова.
+        words = random.Random(f'{seed}:corpus').choices(
+            self.vocabulary, k=CORPUS_WORDS
+        )
+        self.corpus = ' '.join(words) + ' '
+        self.word_starts = [0, *accumulate(len(word) + 1 for word in words)]
+        self.categories = [
+            int(row['id']) for row in read_seed_rows('category')
+        ]
+        self.genres = [int(row['id']) for row in read_seed_rows('genre')]
+        # Первые id отзывов каждого ранга популярности.
+        self.review_starts = list(accumulate(
+            review_counts(titles, reviews, users, zipf) if reviews else [],
+            initial=1,
+        ))
+        self.title_step = coprime_step(mix(seed, 1), max(titles, 1))
+        self.title_offset = mix(seed, 2) % max(titles, 1)
+        self.viral = []
+        if reviews:
+            self.viral = random.Random(f'{seed}:viral').sample(
+                range(1, reviews + 1), reviews // VIRAL_REVIEWS_PER + 1
+            )
+
+    def tasks(self):
+        for table, size in self.sizes.items():
+            for start in range(1, size + 1, self.chunk_size):
+                yield table, start, min(start + self.chunk_size, size + 1)
+
+    def title_id(self, rank):
+        titles = self.sizes['titles']
+        return (rank * self.title_step + self.title_offset) % titles + 1
+
+    def review_date(self, review_id):
+        span = int((DATES[1] - DATES[0]) * 1000)
+        return DATES[0] + mix(self.seed, 3, review_id) % span / 1000
+
+    def text(self, rng, median_words):
+        count = min(MAX_WORDS, max(1, int(
+            rng.lognormvariate(math.log(median_words), WORDS_SIGMA)
+        )))
+        first = rng.randrange(CORPUS_WORDS - count)
+        text = self.corpus[
+            self.word_starts[first]:self.word_starts[first + count] - 1
+        ]
+        return text[0].upper() + text[1:] + '.'
+
+    def users(self, rng, start, stop):
+        for user_id in range(start, stop):
+            named = rng.random() < 0.6
+            yield (
+                user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                rng.choices(ROLES, ROLE_WEIGHTS)[0],
+                self.text(rng, BIO_WORDS) if rng.random() < 0.3 else '',
+                rng.choice(FIRST_NAMES) if named else '',
+                rng.choice(LAST_NAMES) if named else '',
+            )
+
+    def titles(self, rng, start, stop):
+        for title_id in range(start, stop):
+            name = ' '.join(rng.choices(
+                self.vocabulary, k=rng.randint(1, 4)
+            ))
+            yield (
+                title_id, name[0].upper() + name[1:],
+                rng.randint(*YEARS), rng.choice(self.categories),
+            )
+
+    def genre_title(self, rng, start, stop):
+        for title_id in range(start, stop):
+            genres = rng.sample(self.genres, rng.randint(1, MAX_GENRES))
+            for number, genre_id in enumerate(genres):
+                yield (
+                    (title_id - 1) * MAX_GENRES + number + 1,
+                    title_id, genre_id,
+                )
+
+    def review(self, rng, start, stop):
+        users = self.sizes['users']
+        starts = self.review_starts
+        rank = bisect.bisect_right(starts, start) - 1
+        first = None
+        for review_id in range(start, stop):
+            while review_id >= starts[rank + 1]:
+                rank += 1
+            if first != starts[rank]:
+                # Авторы отзывов одного произведения — разные
+                # пользователи: шаг обхода взаимно прост с их числом.
+                first = starts[rank]
+                title_id = self.title_id(rank)
+                offset = mix(self.seed, 4, rank)
+                step = coprime_step(mix(self.seed, 5, rank), users)
+            yield (
+                review_id, title_id, self.text(rng, REVIEW_WORDS),
+                (offset + (review_id - first) * step) % users + 1,
+                rng.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                format_date(self.review_date(review_id)),
+            )
+
+    def comments(self, rng, start, stop):
+        reviews = self.sizes['review']
+        for comment_id in range(start, stop):
+            if rng.random() < VIRAL_SHARE:
+                review_id = rng.choice(self.viral)
+            else:
+                review_id = rng.randint(1, reviews)
+            date = min(
+                self.review_date(review_id)
+                + rng.expovariate(1 / COMMENT_DELAY_SECONDS),
+                DATES[1],
+            )
+            yield (
+                comment_id, review_id, self.text(rng, COMMENT_WORDS),
+                rng.randint(1, self.sizes['users']), format_date(date),
+            )
+
+
+def format_date(timestamp):
+    return time.strftime(
+        '%Y-%m-%dT%H:%M:%S', time.gmtime(timestamp)
+    ) + f'.{int(timestamp * 1000) % 1000:03d}Z'
+
+
+_plan = None
+
+
+def init_worker(plan):
+    global _plan
+    _plan = plan
+
+
+def write_chunk(task):
+    """Пишет кусок таблицы во временный файл и возвращает его путь."""
+    table, start, stop, directory = task
+    rng = random.Random(f'{_plan.seed}:{table}:{start}')
+    path = os.path.join(directory, f'{table}.{start}.part')
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        for row in getattr(_plan, table)(rng, start, stop):
+            writer.writerow(row)
+            rows += 1
+    return table, path, rows
+
+
+def generate(plan, directory, workers=None):
+    """
+    Пишет набор в directory; возвращает число строк по таблицам.
+    Файлы category и genre копируются из static/data.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rows = {}
+    for table in COPIED_TABLES:
+        shutil.copyfile(DATA_DIR / f'{table}.csv',
+                        os.path.join(directory, f'{table}.csv'))
+        rows[table] = len(read_seed_rows(table))
+    outputs = {}
+    try:
+        for table in plan.sizes:
+            path = os.path.join(directory, f'{table}.csv')
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                csv.writer(file).writerow(HEADERS[table])
+            outputs[table] = open(path, 'ab')
+            rows[table] = 0
+        with tempfile.TemporaryDirectory(dir=directory) as parts, Pool(
+            workers, initializer=init_worker, initargs=(plan,)
+        ) as pool:
+            tasks = [(*task, parts) for task in plan.tasks()]
+            for table, path, count in pool.imap(write_chunk, tasks):
+                with open(path, 'rb') as part:
+                    shutil.copyfileobj(part, outputs[table])
+                os.remove(path)
+                rows[table] += count
+    finally:
+        for output in outputs.values():
+            output.close()
+    return rows
@@ -0,0 +1,163 @@
+"""
+Материализованные документы произведений (модель для чтения).
+
+TitleDocument хранит готовый ответ TitleReadSerializer и рейтинг
+каждого произведения, поэтому список и карточка произведения читаются
+одним запросом без соединений с категориями и жанрами и без
+агрегации отзывов.
+
+Документы перестраиваются в той же транзакции, что и изменение
+произведения, его жанров, его категории или жанра (api.signals);
+запись отзыва обновляет в документе только рейтинг. Внутри batch()
+повторные перестроения одного произведения (сохранение и смена
+жанров при PATCH) объединяются и выполняются один раз при выходе
+из блока. Перестроить все документы:
+manage.py rebuild_title_documents.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+
+from api import consts
+from reviews.models import Category, Title, TitleDocument
+from .catalog import slug_caches
+from .serializers import TitleReadSerializer
+
+# id произведения -> создавать ли отсутствующий документ.
+pending = contextvars.ContextVar('pending_documents', default=None)
+
+
+def rating_expression(prefix=''):
+    return Cast(f'{prefix}stats__score_sum', FloatField()) / NullIf(
+        F(f'{prefix}stats__reviews_count'), 0
+    )
+
+
+RATING = rating_expression()
+
+
+def build_documents(title_ids):
+    titles = list(
+        Title.objects.filter(id__in=title_ids)
+        .annotate(rating=RATING)
+        .prefetch_related('genre')
+    )
+    # Категории — из кэша справочника процесса: при записи произведения
+    # они обычно уже там после проверки слагов.
+    categories = slug_caches[Category].resolve_ids(
+        {title.category_id for title in titles} - {None}
+    )
+    for title in titles:
+        title.category = categories.get(title.category_id)
+    return [
+        TitleDocument(
+            title_id=title.id, rating=title.rating,
+            data=TitleReadSerializer(title).data,
+        )
+        for title in titles
+    ]
+
+
+def save_documents(title_ids, create=True):
+    """
+    Перестраивает документы произведений пачками. При create=False
+    обновляет только существующие: отзывы удаляются каскадом уже после
+    документа удаляемого произведения.
+    """
+    title_ids = list(title_ids)
+    for start in range(0, len(title_ids), consts.BULK_BATCH_SIZE):
+        chunk = title_ids[start:start + consts.BULK_BATCH_SIZE]
+        existing = set(TitleDocument.objects.filter(
+            title_id__in=chunk
+        ).values_list('title_id', flat=True))
+        if not create:
+            chunk = existing
+        documents = build_documents(chunk)
+        with transaction.atomic():
+            TitleDocument.objects.bulk_update(
+                [doc for doc in documents if doc.title_id in existing],
+                ('rating', 'data'),
+            )
+            TitleDocument.objects.bulk_create(
+                [doc for doc in documents if doc.title_id not in existing]
+            )
+
+
+def refresh_documents(title_ids, create=True):
+    titles = pending.get()
+    if titles is None:
+        save_documents(title_ids, create)
+        return
+    for title_id in title_ids:
+        titles[title_id] = titles.get(title_id, False) or create
+
+
+def refresh_ratings(title_ids):
+    """
+    Обновляет в документах только рейтинг: запись отзыва не меняет
+    остальной ответ. Документы, которые batch() все равно перестроит
+    целиком, пропускаются.
+    """
+    titles = pending.get()
+    if titles is not None:
+        title_ids = [
+            title_id for title_id in title_ids if title_id not in titles
+        ]
+    documents = list(
+        TitleDocument.objects.filter(title_id__in=title_ids)
+        .annotate(current_rating=rating_expression('title__'))
+    )
+    for document in documents:
+        document.rating = document.current_rating
+        # Как IntegerField в TitleReadSerializer.
+        document.data['rating'] = (
+            None if document.rating is None else int(document.rating)
+        )
+    TitleDocument.objects.bulk_update(documents, ('rating', 'data'))
+
+
+@contextmanager
+def batch():
+    """Откладывает перестроение документов до конца блока."""
+    titles = {}
+    token = pending.set(titles)
+    try:
+        yield
+    finally:
+        pending.reset(token)
+    for create in (True, False):
+        title_ids = [
+            title_id for title_id, flag in titles.items() if flag is create
+        ]
+        if title_ids:
+            save_documents(title_ids, create)
+
+
+def rebuild_documents():
+    """Перестраивает документы всех произведений; возвращает их число."""
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    with transaction.atomic():
+        save_documents(title_ids)
+    return len(title_ids)
+
+
+class DocumentBatchMixin:
+    """
+    Выполняет запись вьюсета и перестроение затронутых ею документов
+    в одной транзакции, перестраивая каждый документ один раз.
+    """
+
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic(), batch():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic(), batch():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic(), batch():
+            return super().destroy(request, *args, **kwargs)
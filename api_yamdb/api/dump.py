@@ -0,0 +1,157 @@
+"""
+Снимок базы в CSV в схемах static/data/*.csv (manage.py dump_csv).
+
+Все таблицы читаются в одной читающей транзакции, поэтому файлы
+согласованы между собой: отзыв не ссылается на произведение, которого
+нет в titles.csv. В SQLite снимок фиксируется первым чтением
+транзакции (в режиме WAL писатели при этом не ждут, в режиме журнала
+отката их коммиты ждут конца выгрузки).
+
+Транзакция принадлежит одному соединению, поэтому читает один поток:
+он открывает по курсору на таблицу, по очереди берет из них пачки по
+chunk_size строк и передает их через ограниченные очереди потокам
+записи — по потоку и файлу на таблицу, которые форматируют CSV и
+пишут файлы параллельно. В памяти одновременно не больше
+QUEUE_CHUNKS пачек на таблицу, сколько бы строк ни было в базе.
+Файл пишется во временный и переименовывается после успешной выгрузки.
+"""
+import csv
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from .datagen import HEADERS
+
+QUEUE_CHUNKS = 4
+WAIT_SECONDS = 1
+DEFAULT_CHUNK_SIZE = 10000
+
+QUERIES = {
+    'users': lambda: User.objects.values_list(
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'category': lambda: Category.objects.values_list('id', 'name', 'slug'),
+    'genre': lambda: Genre.objects.values_list('id', 'name', 'slug'),
+    'titles': lambda: Title.objects.values_list(
+        'id', 'name', 'year', 'category_id'
+    ),
+    'genre_title': lambda: Title.genre.through.objects.values_list(
+        'id', 'title_id', 'genre_id'
+    ),
+    'review': lambda: Review.objects.values_list(
+        'id', 'title_id', 'text', 'author_id', 'score', 'pub_date'
+    ),
+    'comments': lambda: Comment.objects.values_list(
+        'id', 'review_id', 'text', 'author_id', 'pub_date'
+    ),
+}
+
+
+def format_value(value):
+    """Даты — как в static/data: UTC с миллисекундами и суффиксом Z."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc)
+        return (
+            value.strftime('%Y-%m-%dT%H:%M:%S')
+            + f'.{value.microsecond // 1000:03d}Z'
+        )
+    return value
+
+
+def write_table(path, header, chunks):
+    """Пишет пачки из очереди chunks до None; возвращает число строк."""
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for chunk in iter(chunks.get, None):
+            writer.writerows(
+                [format_value(value) for value in row] for row in chunk
+            )
+            rows += len(chunk)
+    return rows
+
+
+def hand_over(chunks, writer, chunk):
+    """Кладет пачку в очередь, пока поток записи жив."""
+    while True:
+        try:
+            chunks.put(chunk, timeout=WAIT_SECONDS)
+            return
+        except queue.Full:
+            if writer.done():
+                # Поток записи упал: поднимаем его исключение.
+                writer.result()
+
+
+def read_chunks(queryset, chunk_size):
+    rows = queryset.order_by('id').iterator(chunk_size=chunk_size)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, chunk_size))
+
+
+def dump(directory, tables=tuple(QUERIES), chunk_size=DEFAULT_CHUNK_SIZE,
+         using=DEFAULT_DB_ALIAS):
+    """Пишет таблицы в directory; возвращает число строк по таблицам."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        table: os.path.join(directory, f'{table}.csv') for table in tables
+    }
+    try:
+        rows = write_tables(paths, chunk_size, using)
+    except BaseException:
+        for path in paths.values():
+            if os.path.exists(f'{path}.part'):
+                os.remove(f'{path}.part')
+        raise
+    for path in paths.values():
+        os.replace(f'{path}.part', path)
+    return rows
+
+
+def write_tables(paths, chunk_size, using):
+    queues = {table: queue.Queue(QUEUE_CHUNKS) for table in paths}
+    with ThreadPoolExecutor(len(paths)) as executor:
+        writers = {
+            table: executor.submit(
+                write_table, f'{path}.part', HEADERS[table], queues[table]
+            )
+            for table, path in paths.items()
+        }
+        try:
+            with transaction.atomic(using=using):
+                readers = {
+                    table: read_chunks(
+                        QUERIES[table]().using(using), chunk_size
+                    )
+                    for table in paths
+                }
+                try:
+                    while readers:
+                        for table, reader in list(readers.items()):
+                            chunk = next(reader, None)
+                            if chunk is None:
+                                del readers[table]
+                                continue
+                            hand_over(queues[table], writers[table], chunk)
+                finally:
+                    # Незакрытые курсоры держат блокировки таблиц.
+                    for reader in readers.values():
+                        reader.close()
+        finally:
+            # Завершающий None получают все потоки записи, иначе выход
+            # из пула будет ждать их вечно; исключение упавшего потока
+            # поднимется ниже из result().
+            for table, writer in writers.items():
+                try:
+                    hand_over(queues[table], writer, None)
+                except Exception:
+                    pass
+        return {table: writer.result() for table, writer in writers.items()}
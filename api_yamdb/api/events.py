@@ -0,0 +1,278 @@
+"""
+Поток событий о новых отзывах и комментариях (server-sent events).
+
+GET /api/v1/events/?title=<id> присылает новые отзывы и комментарии
+к произведению, ?review=<id> — новые комментарии к отзыву. Поток
+обслуживает EventStreamApplication прямо в цикле событий ASGI, без
+Django и пула потоков: ожидающий подписчик — это корутина и очередь
+ссылок на общие для всех байты события, поэтому процесс держит
+тысячи простаивающих соединений.
+
+Событие готовится один раз после коммита записи (api.signals) и
+раздается подписчикам через Broker процесса. Если задан
+EVENTS['DIR'], процессы обмениваются событиями через unix-сокеты
+дейтаграмм в этом каталоге (по сокету на процесс с подписчиками) —
+локальная замена LISTEN/NOTIFY или pub/sub внешнего брокера; иначе
+события видят только подписчики того же процесса. Подписчик, который
+не успевает читать, отключается (браузер переподключится сам).
+"""
+import asyncio
+import atexit
+import json
+import os
+import socket
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+from reviews.models import Review
+from .renderers import FastJSONRenderer
+from .serializers import ReviewSerializer, UserCommentSerializer
+
+PATH = '/api/v1/events/'
+CHANNEL_PARAMS = ('title', 'review')
+
+DEFAULTS = {
+    'DIR': None,
+    'QUEUE_SIZE': 100,
+    'KEEPALIVE_SECONDS': 15,
+}
+
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EVENTS', {})}
+
+
+def format_event(event, event_id, data):
+    return (
+        f'event: {event}\nid: {event_id}\ndata: '.encode()
+        + FastJSONRenderer().render(data) + b'\n\n'
+    )
+
+
+class Broker:
+    """Подписчики процесса по каналам ('title:1', 'review:5')."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.channels = {}
+        self.transport = None
+        self.path = None
+
+    def subscribe(self, channel):
+        queue = asyncio.Queue(get_config()['QUEUE_SIZE'])
+        self.channels.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        queues = self.channels.get(channel, set())
+        queues.discard(queue)
+        if not queues:
+            self.channels.pop(channel, None)
+
+    def dispatch(self, message):
+        channels, frame = message
+        for channel in channels:
+            for queue in list(self.channels.get(channel, ())):
+                try:
+                    queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    # None в голове очереди не поместится: отключаем
+                    # подписчика, опустошив ее.
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+                    self.unsubscribe(channel, queue)
+
+    async def listen(self, directory):
+        """Принимает события других процессов через unix-сокет."""
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{os.getpid()}.sock')
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        broker = self
+
+        class Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                broker.dispatch(decode(data))
+
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            Protocol, local_addr=self.path, family=socket.AF_UNIX
+        )
+        atexit.register(self.remove_socket)
+
+    def remove_socket(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def close(self):
+        if self.transport is not None and not self.loop.is_closed():
+            self.transport.close()
+        self.remove_socket()
+
+
+def encode(channels, frame):
+    return json.dumps(channels).encode() + b'\n' + frame
+
+
+def decode(data):
+    channels, frame = data.split(b'\n', 1)
+    return json.loads(channels), frame
+
+
+broker = None
+
+
+async def get_broker():
+    global broker
+    loop = asyncio.get_running_loop()
+    if broker is None or broker.loop is not loop:
+        if broker is not None:
+            broker.close()
+        broker = Broker(loop)
+        directory = get_config()['DIR']
+        if directory:
+            await broker.listen(directory)
+    return broker
+
+
+def send_datagram(sender, datagram, path):
+    try:
+        sender.sendto(datagram, path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Процесс завершился, не убрав сокет.
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    except OSError:
+        # Очередь сокета переполнена или событие слишком велико: этот
+        # процесс событие пропустит.
+        pass
+
+
+def publish(channels, event, event_id, data):
+    """Рассылает событие подписчикам каналов во всех процессах."""
+    message = (channels, format_event(event, event_id, data))
+    directory = get_config()['DIR']
+    if not directory:
+        current = broker
+        if current is not None and not current.loop.is_closed():
+            current.loop.call_soon_threadsafe(current.dispatch, message)
+        return
+    if not os.path.isdir(directory):
+        return
+    datagram = encode(*message)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+        for name in os.listdir(directory):
+            if name.endswith('.sock'):
+                send_datagram(
+                    sender, datagram, os.path.join(directory, name)
+                )
+
+
+def publish_created(instance):
+    """Рассылает событие о новом отзыве или комментарии."""
+    if not get_config()['DIR'] and broker is None:
+        return
+    if isinstance(instance, Review):
+        publish(
+            [f'title:{instance.title_id}'], 'review', instance.pk,
+            ReviewSerializer(instance).data,
+        )
+        return
+    publish(
+        [f'title:{instance.review.title_id}', f'review:{instance.review_id}'],
+        'comment', instance.pk, UserCommentSerializer(instance).data,
+    )
+
+
+def parse_channel(query_string):
+    params = parse_qs(query_string.decode('latin-1'))
+    channels = [
+        f'{name}:{params[name][0]}' for name in CHANNEL_PARAMS
+        if name in params and params[name][0].isdigit()
+    ]
+    return channels[0] if len(channels) == 1 else None
+
+
+async def send_error(send, status, detail):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': FastJSONRenderer().render({'detail': detail}),
+    })
+
+
+async def stream(scope, receive, send):
+    if scope['method'] != 'GET':
+        return await send_error(send, 405, 'Метод не разрешен.')
+    channel = parse_channel(scope['query_string'])
+    if channel is None:
+        return await send_error(
+            send, 400, 'Укажите один параметр: title или review (id).'
+        )
+    current = await get_broker()
+    queue = current.subscribe(channel)
+    disconnected = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start', 'status': 200, 'headers': HEADERS,
+        })
+        await send({
+            'type': 'http.response.body', 'body': b': subscribed\n\n',
+            'more_body': True,
+        })
+        keepalive = get_config()['KEEPALIVE_SECONDS']
+        while not disconnected.done():
+            frame = asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                (frame, disconnected), timeout=keepalive,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not frame.done():
+                frame.cancel()
+                if not disconnected.done():
+                    await send({
+                        'type': 'http.response.body', 'body': b': ping\n\n',
+                        'more_body': True,
+                    })
+                continue
+            if frame.result() is None:
+                break
+            await send({
+                'type': 'http.response.body', 'body': frame.result(),
+                'more_body': True,
+            })
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+        current.unsubscribe(channel, queue)
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class EventStreamApplication:
+    """ASGI-обертка, обслуживающая PATH потоком событий."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == PATH:
+            return await stream(scope, receive, send)
+        return await self.app(scope, receive, send)
@@ -0,0 +1,85 @@
+"""
+Потоковая выгрузка данных в NDJSON (/api/v1/export/<kind>/,
+manage.py export_ndjson).
+
+Выгружаются произведения с рейтингом (из документов произведений),
+отзывы и комментарии — по объекту на строку в том же представлении,
+что и в API. Строки читаются пачками по EXPORT_CHUNK_SIZE по
+возрастанию id с условием id > последнего выданного (без OFFSET),
+и каждая пачка сразу уходит клиенту, поэтому память не зависит от
+размера таблицы. Тот же id служит точкой продолжения: прерванную
+выгрузку можно продолжить с ?after=<id последней полученной строки>.
+Пачки не образуют общего снимка: строки, добавленные во время
+выгрузки, попадают в нее, если их id еще впереди.
+"""
+import zlib
+
+from api import consts
+from reviews.models import Comment, Review, TitleDocument
+from .renderers import FastJSONRenderer
+from .serializers import ReviewSerializer, UserCommentSerializer
+
+GZIP = 'gzip'
+CONTENT_TYPE = 'application/x-ndjson'
+
+
+def read_titles(after, limit):
+    documents = TitleDocument.objects.filter(
+        title_id__gt=after
+    ).order_by('title_id').values_list('data', flat=True)[:limit]
+    return list(documents)
+
+
+def read_reviews(after, limit):
+    reviews = Review.objects.filter(id__gt=after).select_related(
+        'author'
+    ).order_by('id')[:limit]
+    return ReviewSerializer(reviews, many=True).data
+
+
+def read_comments(after, limit):
+    comments = Comment.objects.filter(id__gt=after).select_related(
+        'author', 'review'
+    ).order_by('id')[:limit]
+    return UserCommentSerializer(comments, many=True).data
+
+
+READERS = {
+    'titles': read_titles,
+    'reviews': read_reviews,
+    'comments': read_comments,
+}
+
+
+def iter_chunks(kind, after=0, chunk_size=consts.EXPORT_CHUNK_SIZE):
+    """Выдает строки NDJSON пачками: bytes на каждую пачку."""
+    read = READERS[kind]
+    renderer = FastJSONRenderer()
+    while True:
+        rows = read(after, chunk_size)
+        if not rows:
+            return
+        yield b''.join(renderer.render(row) + b'\n' for row in rows)
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1]['id']
+
+
+def gzip_chunks(chunks, level=consts.EXPORT_GZIP_LEVEL):
+    """Сжимает поток пачек в один gzip-поток, не накапливая его."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export(kind, after=0, compression=None,
+           chunk_size=consts.EXPORT_CHUNK_SIZE):
+    chunks = iter_chunks(kind, after, chunk_size)
+    return gzip_chunks(chunks) if compression == GZIP else chunks
+
+
+def filename(kind, compression=None):
+    return f'{kind}.ndjson' + ('.gz' if compression == GZIP else '')
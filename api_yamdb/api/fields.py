@@ -0,0 +1,54 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from .catalog import slug_caches
+
+
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Поле категории или жанра по слагу.
+
+    Слаги ищутся в кэше справочника процесса (api.catalog),
+    а не запросом к базе на каждое значение.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'slug')
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return CatalogManySlugRelatedField(**list_kwargs)
+
+    def to_internal_value_many(self, data):
+        for value in data:
+            if not isinstance(value, str):
+                self.fail('invalid')
+        objects = slug_caches[self.queryset.model].resolve(data)
+        for value in data:
+            if value not in objects:
+                self.fail(
+                    'does_not_exist',
+                    slug_name=self.slug_field,
+                    value=smart_str(value),
+                )
+        return [objects[value] for value in data]
+
+    def to_internal_value(self, data):
+        return self.to_internal_value_many([data])[0]
+
+
+class CatalogManySlugRelatedField(ManyRelatedField):
+    """Список слагов: все промахи кэша дочитываются одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.to_internal_value_many(list(data))
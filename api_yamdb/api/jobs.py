@@ -0,0 +1,99 @@
+"""
+Фоновые задачи.
+
+Задача сохраняется в таблицу Job и после коммита отправляется в пул
+из одного потока процесса. Прогресс пишется в ту же запись, поэтому
+клиент опрашивает /api/v1/jobs/{id}/. Задачи идемпотентны: оборванные
+перезапуском процесса доделывает команда run_jobs.
+При BACKGROUND_JOBS_EAGER задача выполняется сразу после коммита
+в текущем потоке (для тестов и отладки).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from api import consts
+from reviews.counters import change_titles_count
+from reviews.models import Category, Job, Title
+from reviews.signals import titles_changed
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='jobs')
+
+
+def delete_category(job):
+    """
+    Отвязывает произведения от категории пачками, затем удаляет её.
+
+    Каждая пачка — отдельная короткая транзакция, поэтому блокировка
+    на запись не держится на время всего удаления.
+    """
+    category_id = job.params['category_id']
+    batch_size = job.params.get(
+        'batch_size', consts.CATEGORY_DELETE_BATCH_SIZE
+    )
+    titles = Title.objects.filter(category_id=category_id)
+    job.total = job.processed + titles.count()
+    job.save(update_fields=('total', 'updated'))
+    while True:
+        with transaction.atomic():
+            title_ids = list(
+                titles.order_by('id').values_list('id', flat=True)[
+                    :batch_size
+                ]
+            )
+            if not title_ids:
+                break
+            Title.objects.filter(id__in=title_ids).update(category=None)
+            change_titles_count(Category, [category_id] * len(title_ids), -1)
+            job.processed += len(title_ids)
+            job.save(update_fields=('processed', 'updated'))
+            transaction.on_commit(
+                lambda title_ids=title_ids: titles_changed.send(
+                    sender=Title, title_ids=title_ids
+                )
+            )
+    Category.objects.filter(id=category_id).delete()
+
+
+HANDLERS = {
+    Job.DELETE_CATEGORY: delete_category,
+}
+
+
+def run_job(job):
+    job.status = Job.RUNNING
+    job.save(update_fields=('status', 'updated'))
+    try:
+        HANDLERS[job.kind](job)
+    except Exception as error:
+        logger.exception('Фоновая задача %s завершилась ошибкой', job.id)
+        job.status = Job.FAILED
+        job.error = str(error)
+        job.save(update_fields=('status', 'error', 'updated'))
+        return
+    job.status = Job.DONE
+    job.save(update_fields=('status', 'updated'))
+
+
+def run_job_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(Job.objects.get(id=job_id))
+    finally:
+        close_old_connections()
+
+
+def submit_job(kind, params):
+    """Создает задачу и запускает её после коммита текущей транзакции."""
+    job = Job.objects.create(kind=kind, params=params)
+    if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_job(job))
+    else:
+        transaction.on_commit(
+            lambda: executor.submit(run_job_in_thread, job.id)
+        )
+    return job
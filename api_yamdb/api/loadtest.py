@@ -0,0 +1,415 @@
+"""
+Нагрузочный прогон по Postman-коллекции.
+
+Коллекция из postman_collection/ разбирается на шаги: метод, путь,
+тело, переменная с токеном из auth (с наследованием от папок),
+ожидаемый статус из проверок pm.response.status и переменные, которые
+тесты коллекции сохраняют из ответа. Запросы каждой папки становятся
+сценарием с весом; сценарий signup проходит цепочку регистрация →
+токен → авторизованные чтения от имени нового пользователя.
+
+Сначала коллекция один раз выполняется по порядку без папок delete_*,
+чтобы заполнить переменные (токены ролей, id и slug объектов). Затем
+сценарии выполняются параллельно: в замкнутой модели concurrency
+потоков запускают их друг за другом, в открытой сценарии прибывают
+по Пуассону с частотой rate независимо от скорости ответов.
+
+Коды подтверждения приходят на почту, поэтому их выдает функция
+codes(username), переданная вызывающим кодом.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import ChainMap, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import requests
+
+Step = namedtuple('Step', 'name method path body token expected extract')
+Scenario = namedtuple('Scenario', 'name steps weight fresh_user')
+
+VARIABLE = re.compile(r'\{\{(\w+)\}\}')
+EXPECTED_STATUS = re.compile(
+    r'pm\.response\.status,.*?\)\.to\.be\.eql\("([^"]+)"\)', re.S
+)
+LOCAL_FROM_RESPONSE = re.compile(
+    r'const (\w+) = (?:\w+\()?_\.get\(responseData, [\'"](\w+)[\'"]\)'
+)
+SET_VARIABLE = re.compile(
+    r'pm\.collectionVariables\.set\("(\w+)", (\w+)\)'
+)
+STATUS_BY_PHRASE = {status.phrase: status.value for status in HTTPStatus}
+CONFIRMATION_CODE = 'ConfirmationCode'
+
+SIGNUP = 'signup'
+READ_WEIGHT = 5
+WRITE_WEIGHT = 1
+SKIPPED_FOLDERS = 'delete_*'
+
+
+def bearer_variable(auth):
+    if not auth or auth.get('type') != 'bearer':
+        return None
+    for item in auth['bearer']:
+        match = VARIABLE.fullmatch(item['value'])
+        if item['key'] == 'token' and match:
+            return match.group(1)
+    return None
+
+
+def parse_request(item, auth):
+    request = item['request']
+    url = urlsplit(request['url']['raw'])
+    path = url.path + (f'?{url.query}' if url.query else '')
+    script = '\n'.join(
+        line
+        for event in item.get('event', ())
+        if event['listen'] == 'test'
+        for line in event['script']['exec']
+    )
+    expected = EXPECTED_STATUS.search(script)
+    fields = dict(LOCAL_FROM_RESPONSE.findall(script))
+    extract = {
+        variable: fields[local]
+        for variable, local in SET_VARIABLE.findall(script)
+        if local in fields
+    }
+    body = request.get('body', {})
+    return Step(
+        name=item['name'],
+        method=request['method'],
+        path=path,
+        body=body.get('raw') if body.get('mode') == 'raw' else None,
+        token=bearer_variable(request.get('auth') or auth),
+        expected=STATUS_BY_PHRASE.get(expected.group(1)) if expected else None,
+        extract=extract,
+    )
+
+
+def load_collection(path):
+    """
+    Возвращает переменные коллекции и словарь «путь папки → шаги» в
+    порядке коллекции. Путь папки — имена папок через «/».
+    """
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    groups = {}
+
+    def walk(items, folder, auth):
+        for item in items:
+            if 'item' in item:
+                walk(
+                    item['item'], folder + [item['name']],
+                    item.get('auth') or auth,
+                )
+            else:
+                groups.setdefault('/'.join(folder), []).append(
+                    parse_request(item, auth)
+                )
+
+    walk(collection['item'], [], collection.get('auth'))
+    variables = {
+        variable['key']: variable['value']
+        for variable in collection.get('variable', ())
+    }
+    return variables, groups
+
+
+def is_skipped(folder):
+    return any(
+        fnmatchcase(name, SKIPPED_FOLDERS) for name in folder.split('/')
+    )
+
+
+def signup_steps(groups):
+    """
+    Цепочка нового пользователя: регистрация и токен обычного
+    пользователя из коллекции и все его успешные GET-запросы.
+    Регистрация переписана на переменные userUsername/userEmail,
+    которые сценарий задает уникальными.
+    """
+    steps = [step for folder in groups.values() for step in folder]
+    signup = next(
+        step for step in steps
+        if step.path.endswith('/auth/signup/')
+        and 'userUsername' in step.extract
+    )
+    token = next(step for step in steps if 'userToken' in step.extract)
+    reads = [
+        step for step in steps
+        if step.method == 'GET' and step.token == 'userToken'
+        and step.expected == HTTPStatus.OK
+    ]
+    signup = signup._replace(body=json.dumps({
+        'email': '{{userEmail}}', 'username': '{{userUsername}}',
+    }))
+    return [signup, token, *reads]
+
+
+def default_weight(folder, steps):
+    if is_skipped(folder):
+        return 0
+    if all(step.method == 'GET' for step in steps):
+        return READ_WEIGHT
+    return WRITE_WEIGHT
+
+
+def build_scenarios(groups, weights=()):
+    """
+    Сценарии с весами. weights — пары (шаблон fnmatch, вес), более
+    поздние перекрывают ранние; нулевой вес исключает сценарий.
+    """
+    scenarios = [Scenario(SIGNUP, signup_steps(groups), WRITE_WEIGHT, True)]
+    scenarios += [
+        Scenario(folder, steps, default_weight(folder, steps), False)
+        for folder, steps in groups.items()
+    ]
+    for pattern, weight in weights:
+        scenarios = [
+            scenario._replace(weight=weight)
+            if fnmatchcase(scenario.name, pattern) else scenario
+            for scenario in scenarios
+        ]
+    return [scenario for scenario in scenarios if scenario.weight > 0]
+
+
+def percentile(values, percent):
+    """Процентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return 0.0
+    rank = max(0, -(-len(values) * percent // 100) - 1)
+    return values[int(rank)]
+
+
+class Stats:
+    """Задержки, ошибки и расхождения со статусами коллекции по шагам."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.mismatches = {}
+        self.lags = []
+        self.elapsed = 0.0
+
+    def record(self, name, seconds, status, expected):
+        error = status is None or status >= 500
+        with self.lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            self.errors[name] = self.errors.get(name, 0) + error
+            self.mismatches[name] = self.mismatches.get(name, 0) + (
+                not error and expected is not None and status != expected
+            )
+
+    def record_lag(self, seconds):
+        with self.lock:
+            self.lags.append(seconds)
+
+    def rows(self):
+        """Строки отчета: шаг, число, rps, p50/p95/p99 (мс), ошибки."""
+        elapsed = self.elapsed or 1.0
+        rows = []
+        everything = []
+        for name, latencies in sorted(self.latencies.items()):
+            everything += latencies
+            rows.append(self.row(
+                name, latencies, self.errors[name], self.mismatches[name],
+                elapsed,
+            ))
+        if rows:
+            rows.append(self.row(
+                'ИТОГО', everything, sum(self.errors.values()),
+                sum(self.mismatches.values()), elapsed,
+            ))
+        return rows
+
+    @staticmethod
+    def row(name, latencies, errors, mismatches, elapsed):
+        latencies = sorted(latencies)
+        return {
+            'name': name,
+            'count': len(latencies),
+            'rps': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'errors': errors,
+            'error_rate': errors / len(latencies),
+            'mismatches': mismatches,
+        }
+
+
+class LoadTest:
+
+    def __init__(self, base_url, variables, groups, codes=None,
+                 timeout=10, seed=None, keepalive=False):
+        self.base_url = base_url.rstrip('/')
+        self.variables = dict(variables)
+        self.groups = groups
+        self.codes = codes
+        self.timeout = timeout
+        self.seed = seed
+        self.keepalive = keepalive
+        self.local = threading.local()
+        self.counter = 0
+        self.counter_lock = threading.Lock()
+        self.run_id = random.Random(seed).getrandbits(32)
+
+    @property
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def resolve(self, name, variables):
+        if name.endswith(CONFIRMATION_CODE) and self.codes:
+            username = variables.get(
+                name[:-len(CONFIRMATION_CODE)] + 'Username'
+            )
+            if username:
+                return self.codes(username)
+        return variables.get(name, f'{{{{{name}}}}}')
+
+    def render(self, text, variables):
+        return VARIABLE.sub(
+            lambda match: str(self.resolve(match.group(1), variables)), text
+        )
+
+    def execute(self, step, variables, stats):
+        headers = {'Content-Type': 'application/json'}
+        if step.token and step.token in variables:
+            headers['Authorization'] = f'Bearer {variables[step.token]}'
+        body = self.render(step.body, variables) if step.body else None
+        url = self.base_url + self.render(step.path, variables)
+        # runserver пишет заголовки и тело ответа отдельно, и на
+        # повторно используемом соединении алгоритм Нейгла вместе с
+        # отложенным ACK добавляет к каждому ответу около 40 мс, поэтому
+        # по умолчанию каждый запрос идет по новому соединению.
+        client = self.session if self.keepalive else requests
+        started = time.perf_counter()
+        try:
+            response = client.request(
+                step.method, url, data=body and body.encode(),
+                headers=headers, timeout=self.timeout,
+            )
+        except requests.RequestException:
+            stats.record(step.name, time.perf_counter() - started,
+                         None, step.expected)
+            return
+        stats.record(step.name, time.perf_counter() - started,
+                     response.status_code, step.expected)
+        if step.extract and response.ok:
+            try:
+                data = response.json()
+            except ValueError:
+                return
+            for variable, field in step.extract.items():
+                if isinstance(data, dict) and field in data:
+                    variables[variable] = data[field]
+
+    def fresh_user(self):
+        with self.counter_lock:
+            self.counter += 1
+            number = self.counter
+        username = f'load-{self.run_id:08x}-{number}'
+        return {'userUsername': username,
+                'userEmail': f'{username}@example.com'}
+
+    def run_scenario(self, scenario, stats):
+        # Переменные, полученные в сценарии, видны только ему.
+        local = self.fresh_user() if scenario.fresh_user else {}
+        variables = ChainMap(local, self.variables)
+        for step in scenario.steps:
+            self.execute(step, variables, stats)
+
+    def setup(self):
+        """Прогоняет коллекцию по порядку и запоминает ее переменные."""
+        stats = Stats()
+        started = time.perf_counter()
+        for folder, steps in self.groups.items():
+            if is_skipped(folder):
+                continue
+            for step in steps:
+                self.execute(step, self.variables, stats)
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    def run_closed(self, scenarios, concurrency, duration=None,
+                   iterations=None):
+        """
+        Замкнутая модель: каждый из concurrency потоков запускает
+        сценарии подряд до истечения duration секунд или пока всего не
+        выполнено iterations сценариев.
+        """
+        stats = Stats()
+        weights = [scenario.weight for scenario in scenarios]
+        remaining = [iterations]
+        deadline = None
+
+        def take():
+            if duration is not None and time.perf_counter() >= deadline:
+                return False
+            if iterations is None:
+                return True
+            with self.counter_lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+
+        def worker(number):
+            rng = random.Random(
+                None if self.seed is None else self.seed + number
+            )
+            while take():
+                scenario, = rng.choices(scenarios, weights)
+                self.run_scenario(scenario, stats)
+
+        started = time.perf_counter()
+        if duration is not None:
+            deadline = started + duration
+        threads = [
+            threading.Thread(target=worker, args=(number,), daemon=True)
+            for number in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    def run_open(self, scenarios, rate, duration, concurrency):
+        """
+        Открытая модель: сценарии прибывают с частотой rate в секунду
+        (экспоненциальные интервалы) в течение duration секунд. Если
+        concurrency потоков не успевают, прибытия ждут в очереди, и
+        это ожидание попадает в stats.lags, а не теряется.
+        """
+        stats = Stats()
+        rng = random.Random(self.seed)
+        weights = [scenario.weight for scenario in scenarios]
+
+        def arrive(scenario, scheduled):
+            stats.record_lag(time.perf_counter() - scheduled)
+            self.run_scenario(scenario, stats)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            scheduled = started
+            while True:
+                scheduled += rng.expovariate(rate)
+                if scheduled - started >= duration:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                scenario, = rng.choices(scenarios, weights)
+                executor.submit(arrive, scenario, scheduled)
+        stats.elapsed = time.perf_counter() - started
+        return stats
@@ -0,0 +1,138 @@
+import asyncio
+import io
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+
+from api.asgi import get_application, read_cache
+
+DEFAULT_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/top/',
+)
+
+
+def wsgi_environ(path, authorization):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '8000',
+        'HTTP_HOST': 'localhost:8000',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    if authorization:
+        environ['HTTP_AUTHORIZATION'] = authorization
+    return environ
+
+
+def asgi_scope(path, authorization):
+    headers = [(b'host', b'localhost:8000')]
+    if authorization:
+        headers.append((b'authorization', authorization.encode()))
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 8000),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает WSGI- и ASGI-путь чтения в одном процессе без сети: '
+        'WSGI-обработчик в пуле из --concurrency потоков (как потоковый '
+        'WSGI-сервер) против ASGI-приложения с --concurrency '
+        'одновременными запросами в цикле событий. Печатает запросов '
+        'в секунду и пик памяти (tracemalloc).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--path', action='append', dest='paths')
+        parser.add_argument(
+            '--authorization', default='',
+            help='Заголовок Authorization (например, «Bearer <token>»): '
+                 'авторизованные запросы не берутся из кэша ответов.',
+        )
+
+    def run_wsgi(self, paths, total, concurrency, authorization):
+        handler = WSGIHandler()
+
+        def start_response(status, headers, exc_info=None):
+            pass
+
+        def request(index):
+            response = handler(
+                wsgi_environ(paths[index % len(paths)], authorization),
+                start_response,
+            )
+            b''.join(response)
+            response.close()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(request, range(total)))
+
+    def run_asgi(self, paths, total, concurrency, authorization):
+        application = get_application()
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        async def worker(indexes):
+            for index in indexes:
+                await application(
+                    asgi_scope(paths[index % len(paths)], authorization),
+                    receive,
+                    send,
+                )
+
+        async def main():
+            await asyncio.gather(*(
+                worker(range(start, total, concurrency))
+                for start in range(concurrency)
+            ))
+
+        asyncio.run(main())
+
+    def measure(self, name, run, options):
+        paths = options['paths'] or DEFAULT_PATHS
+        read_cache.clear()
+        tracemalloc.start()
+        started = time.perf_counter()
+        run(
+            paths, options['requests'], options['concurrency'],
+            options['authorization'],
+        )
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{name}: {options["requests"] / elapsed:.0f} запросов/с, '
+            f'пик памяти {peak / 1024 / 1024:.1f} МБ'
+        )
+
+    def handle(self, *args, **options):
+        self.measure('WSGI', self.run_wsgi, options)
+        self.measure('ASGI', self.run_asgi, options)
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+
+GENRES = [
+    {'name': 'Драма', 'slug': 'drama'},
+    {'name': 'Комедия', 'slug': 'comedy'},
+    {'name': 'Фэнтези', 'slug': 'fantasy'},
+]
+
+
+def title_page(size):
+    """Страница /titles/ с вложенными жанрами и категорией."""
+    return {
+        'count': 1000,
+        'next': 'http://localhost:8000/api/v1/titles/?page=3',
+        'previous': 'http://localhost:8000/api/v1/titles/?page=1',
+        'results': [
+            {
+                'id': index,
+                'name': f'Произведение номер {index}',
+                'year': 1950 + index % 70,
+                'rating': 5 + index % 50 / 10,
+                'description': 'Описание произведения на русском языке. ' * 3,
+                'genre': GENRES,
+                'category': {'name': 'Фильмы', 'slug': 'films'},
+            }
+            for index in range(size)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает процессорное время на рендеринг страницы /titles/ '
+        'стандартным JSONRenderer и FastJSONRenderer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=2000)
+
+    def measure(self, renderer, data, repeat):
+        started = time.process_time()
+        for _ in range(repeat):
+            content = renderer.render(data)
+        return (time.process_time() - started) / repeat, content
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson не установлен: сравнивать не с чем.')
+        data = title_page(options['page_size'])
+        standard, expected = self.measure(
+            JSONRenderer(), data, options['repeat']
+        )
+        fast, content = self.measure(
+            renderers.FastJSONRenderer(), data, options['repeat']
+        )
+        if content != expected:
+            raise CommandError('Ответы рендереров различаются.')
+        self.stdout.write(
+            f'Ответ {len(content)} байт. JSONRenderer: '
+            f'{standard * 1e6:.0f} мкс, FastJSONRenderer: '
+            f'{fast * 1e6:.0f} мкс, экономия {(standard - fast) * 1e6:.0f} '
+            f'мкс ЦП на ответ ({standard / fast:.1f}×).'
+        )
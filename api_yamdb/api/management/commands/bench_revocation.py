@@ -0,0 +1,85 @@
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import RevocableJWTAuthentication
+from api.revocation import revocation_list
+from reviews.models import RevokedToken, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет накладные расходы проверки отозванных токенов на запрос. '
+        'Все созданные записи откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--revoked', type=int, default=100000)
+
+    def measure(self, func, requests, rounds=3):
+        """Лучшее из нескольких повторов среднее время вызова, мкс."""
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(requests):
+                func()
+            elapsed = (time.perf_counter() - start) / requests * 1e6
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        with transaction.atomic():
+            user = User.objects.create(
+                username=f'bench_{uuid4().hex[:8]}',
+                email=f'{uuid4().hex[:8]}@yamdb.fake',
+            )
+            expires_at = timezone.now() + timedelta(days=1)
+            RevokedToken.objects.bulk_create(
+                (
+                    RevokedToken(jti=uuid4().hex, expires_at=expires_at)
+                    for _ in range(options['revoked'])
+                ),
+                batch_size=1000,
+            )
+            start = time.perf_counter()
+            revocation_list.refresh(force=True)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            raw_token = str(AccessToken.for_user(user)).encode()
+            request = APIRequestFactory().get(
+                '/', HTTP_AUTHORIZATION=f'Bearer {raw_token.decode()}'
+            )
+            plain = JWTAuthentication()
+            revocable = RevocableJWTAuthentication()
+
+            plain_token_us = self.measure(
+                lambda: plain.get_validated_token(raw_token), requests
+            )
+            revocable_token_us = self.measure(
+                lambda: revocable.get_validated_token(raw_token), requests
+            )
+            auth_us = self.measure(
+                lambda: revocable.authenticate(request), requests
+            )
+            transaction.set_rollback(True)
+        revocation_list.reset()
+
+        overhead_us = revocable_token_us - plain_token_us
+        self.stdout.write(
+            f'Отозванных токенов: {options["revoked"]}, '
+            f'загрузка списка: {load_ms:.1f} мс\n'
+            f'Проверка токена: {plain_token_us:.1f} мкс -> '
+            f'{revocable_token_us:.1f} мкс (+{overhead_us:.2f} мкс)\n'
+            f'Аутентификация целиком (с запросом пользователя): '
+            f'{auth_us:.1f} мкс, доля проверки отзыва: '
+            f'{overhead_us / auth_us:.1%}'
+        )
@@ -0,0 +1,177 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Avg
+from django.utils import timezone
+
+from reviews.db import apply_pragmas
+from reviews.models import Review, Title, User
+
+
+def now():
+    return timezone.now().isoformat(sep=' ')
+
+
+def to_sqlite(query):
+    sql, params = query.sql_with_params()
+    return sql.replace('%s', '?'), params
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность читателей SQLite, пока писатель '
+        'непрерывно добавляет отзывы: стандартные настройки (новое '
+        'соединение на запрос) против профиля SQLITE_PRODUCTION. '
+        'Работает на временной копии схемы текущей базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--users', type=int, default=500)
+
+    def get_schema(self):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан только на SQLite.')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY type DESC"
+            )
+            schema = [row[0] for row in cursor.fetchall()]
+        if not schema:
+            raise CommandError('Схема пуста: выполните migrate.')
+        return schema
+
+    def create_database(self, path, schema, options):
+        db = sqlite3.connect(path)
+        for statement in schema:
+            db.execute(statement)
+        db.executemany(
+            f'INSERT INTO {User._meta.db_table} (id, password, '
+            'is_superuser, username, first_name, last_name, email, '
+            'is_staff, is_active, date_joined, bio, role) '
+            "VALUES (?, '', 0, ?, '', '', ?, 0, 1, ?, '', 'user')",
+            (
+                (idx, f'user{idx}', f'user{idx}@yamdb.fake', now())
+                for idx in range(1, options['users'] + 1)
+            ),
+        )
+        db.executemany(
+            f'INSERT INTO {Title._meta.db_table} (id, name, year) '
+            'VALUES (?, ?, 2000)',
+            ((idx, f'Title {idx}') for idx in range(1, options['titles'] + 1)),
+        )
+        db.commit()
+        db.close()
+
+    def connect(self, path, production):
+        db = sqlite3.connect(path, isolation_level=None)
+        if production:
+            apply_pragmas(db.cursor(), settings.SQLITE_PRAGMAS)
+        return db
+
+    def writer(self, path, production, deadline, stats):
+        db = self.connect(path, production)
+        insert = (
+            f'INSERT INTO {Review._meta.db_table} '
+            '(text, author_id, title_id, pub_date, score) '
+            'VALUES (?, ?, ?, ?, ?)'
+        )
+        pairs = (
+            (author, title)
+            for author in range(1, self.options['users'] + 1)
+            for title in range(1, self.options['titles'] + 1)
+        )
+        while time.monotonic() < deadline:
+            author, title = next(pairs, (None, None))
+            if author is None:
+                break
+            try:
+                db.execute(insert, (
+                    'Отзыв ' * 20, author, title, now(),
+                    random.randint(1, 10),
+                ))
+                stats['writes'] += 1
+            except sqlite3.OperationalError:
+                stats['write_errors'] += 1
+        db.close()
+
+    def reader(self, path, production, deadline, stats, lock):
+        titles_sql, titles_params = to_sqlite(
+            Title.objects.annotate(
+                rating=Avg('reviews__score')
+            ).order_by('rating')[:5].query
+        )
+        reviews_sql, _ = to_sqlite(
+            Review.objects.filter(title_id=1).select_related('author')[:5]
+            .query
+        )
+        db = self.connect(path, production) if production else None
+        reads = errors = 0
+        while time.monotonic() < deadline:
+            request_db = db or self.connect(path, production)
+            try:
+                request_db.execute(titles_sql, titles_params).fetchall()
+                request_db.execute(
+                    reviews_sql,
+                    (random.randint(1, self.options['titles']),),
+                ).fetchall()
+                reads += 1
+            except sqlite3.OperationalError:
+                errors += 1
+            finally:
+                if db is None:
+                    request_db.close()
+        if db is not None:
+            db.close()
+        with lock:
+            stats['reads'] += reads
+            stats['read_errors'] += errors
+
+    def run(self, path, production):
+        stats = dict.fromkeys(
+            ('reads', 'read_errors', 'writes', 'write_errors'), 0
+        )
+        lock = threading.Lock()
+        deadline = time.monotonic() + self.options['seconds']
+        threads = [threading.Thread(
+            target=self.writer, args=(path, production, deadline, stats)
+        )]
+        threads.extend(
+            threading.Thread(
+                target=self.reader,
+                args=(path, production, deadline, stats, lock),
+            )
+            for _ in range(self.options['readers'])
+        )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+    def handle(self, *args, **options):
+        self.options = options
+        schema = self.get_schema()
+        seconds = options['seconds']
+        for production in (False, True):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, 'bench.sqlite3')
+                self.create_database(path, schema, options)
+                stats = self.run(path, production)
+            profile = 'SQLITE_PRODUCTION' if production else 'по умолчанию'
+            self.stdout.write(
+                f'{profile}: чтений {stats["reads"] / seconds:.0f}/с '
+                f'(ошибок {stats["read_errors"]}), '
+                f'записей {stats["writes"] / seconds:.0f}/с '
+                f'(ошибок {stats["write_errors"]})'
+            )
@@ -0,0 +1,78 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе: поднимает WSGI-приложение, делает
+# первый запрос и печатает время готовности и пиковый RSS.
+WORKER = '''
+import io, json, resource, sys, time
+started = time.perf_counter()
+from api_yamdb.wsgi import application
+loaded = time.perf_counter() - started
+response = application({
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '8000',
+    'HTTP_HOST': 'localhost:8000', 'wsgi.url_scheme': 'http',
+    'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+}, lambda status, headers, exc_info=None: None)
+b''.join(response)
+print(json.dumps({
+    'loaded': loaded,
+    'ready': time.perf_counter() - started,
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет холодный старт рабочего процесса для профилей настроек: '
+        'время до готовности WSGI-приложения и первого ответа, пиковый '
+        'RSS и число загруженных модулей (медианы по --runs запускам).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profiles', nargs='*',
+            default=['api_yamdb.settings', 'api_yamdb.settings_api'],
+        )
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/api/v1/categories/')
+
+    def run_worker(self, profile, path):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', WORKER, path],
+            cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            raise CommandError(f'{profile}: {result.stderr.strip()}')
+        return {**json.loads(result.stdout), 'process': elapsed}
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            runs = [
+                self.run_worker(profile, options['path'])
+                for _ in range(options['runs'])
+            ]
+
+            def median(key):
+                return statistics.median(run[key] for run in runs)
+
+            self.stdout.write(
+                f'{profile}: процесс {median("process") * 1000:.0f} мс, '
+                f'загрузка {median("loaded") * 1000:.0f} мс, '
+                f'первый ответ {median("ready") * 1000:.0f} мс, '
+                f'RSS {median("rss_kb") / 1024:.1f} МБ, '
+                f'модулей {median("modules"):.0f}'
+            )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.counters import find_titles_count_mismatches, fix_titles_count
+from reviews.models import Category, Genre
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счетчики произведений у категорий и жанров с фактическими. '
+        'Без --fix завершается с ошибкой при расхождениях (для cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true', help='Исправить расхождения.'
+        )
+
+    def handle(self, *args, **options):
+        mismatches = []
+        for model in (Category, Genre):
+            mismatches.extend(find_titles_count_mismatches(model))
+        for obj, stored, actual in mismatches:
+            self.stdout.write(
+                f'{obj._meta.verbose_name} {obj.slug}: '
+                f'{stored} вместо {actual}'
+            )
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        if not options['fix']:
+            raise CommandError(f'Расхождений: {len(mismatches)}')
+        fix_titles_count(mismatches)
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено: {len(mismatches)}')
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api import consts
+from reviews.changes import compact
+
+
+class Command(BaseCommand):
+    help = (
+        'Сжимает журнал изменений: убирает записи, перекрытые более '
+        'поздними записями о том же объекте, и удаления старше --days. '
+        'Клиенты с токенами старше убранных удалений получат 410.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=consts.CHANGES_RETENTION_DAYS,
+            help='Сколько дней хранить записи об удалениях.',
+        )
+
+    def handle(self, *args, **options):
+        compaction = compact(options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено записей: {compaction.removed}, '
+            f'минимальный токен: {compaction.floor}'
+        ))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from api.compression import compression_stats, supported_encodings
+
+DEFAULT_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/top/',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает точки API с каждой поддерживаемой кодировкой сжатия '
+        'и печатает по точкам: сколько байт сэкономлено и сколько '
+        'процессорного времени ушло на сжатие.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', dest='paths')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--authorization', default='',
+            help='Заголовок Authorization для закрытых точек.',
+        )
+
+    def handle(self, *args, **options):
+        compression_stats.reset()
+        headers = {}
+        if options['authorization']:
+            headers['HTTP_AUTHORIZATION'] = options['authorization']
+        for encoding in supported_encodings():
+            client = Client(HTTP_ACCEPT_ENCODING=encoding, **headers)
+            for path in options['paths'] or DEFAULT_PATHS:
+                for _ in range(options['repeat']):
+                    client.get(path)
+        stats = compression_stats.snapshot()
+        if not stats:
+            self.stdout.write(
+                'Ни один ответ не сжат: ответы меньше COMPRESSION'
+                "['MIN_SIZE'] или база пуста."
+            )
+            return
+        for endpoint, endpoint_stats in sorted(stats.items()):
+            self.stdout.write(self.format_line(endpoint, endpoint_stats))
+
+    def format_line(self, endpoint, stats):
+        responses = stats['responses']
+        saved = stats['original'] - stats['compressed']
+        return (
+            f'{endpoint}: ответов {responses}, '
+            f'{stats["original"] // responses} → '
+            f'{stats["compressed"] // responses} байт '
+            f'(−{saved * 100 / stats["original"]:.0f}%), '
+            f'сжатие {stats["cpu_seconds"] * 1e6 / responses:.0f} мкс ЦП'
+        )
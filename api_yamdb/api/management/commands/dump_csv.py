@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from api.dump import DEFAULT_CHUNK_SIZE, QUERIES, dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает базу в CSV в схемах static/data/*.csv: по файлу на '
+        'таблицу, файлы пишутся параллельно из одного согласованного '
+        'снимка (одна читающая транзакция), строки читаются пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для CSV-файлов.')
+        parser.add_argument(
+            '--tables', nargs='+', choices=tuple(QUERIES),
+            default=tuple(QUERIES),
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            choices=tuple(settings.DATABASES),
+            help='База для чтения, например реплика.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = dump(
+            options['directory'], tuple(dict.fromkeys(options['tables'])),
+            options['chunk_size'], options['database'],
+        )
+        for table, count in rows.items():
+            self.stdout.write(f'{table}.csv: {count} строк')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с'
+        ))
@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api import consts
+from api.export import GZIP, READERS, export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает произведения с рейтингом, отзывы или комментарии в '
+        'NDJSON пачками по возрастанию id, не загружая таблицу в память. '
+        '--after продолжает прерванную выгрузку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(READERS))
+        parser.add_argument(
+            '--output', help='Файл для выгрузки (по умолчанию stdout).',
+        )
+        parser.add_argument(
+            '--after', type=int, default=0,
+            help='id последней уже выгруженной строки.',
+        )
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--chunk-size', type=int, default=consts.EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        chunks = export(
+            options['kind'], options['after'],
+            GZIP if options['gzip'] else None, options['chunk_size'],
+        )
+        if options['output'] is None:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        # Продолжение выгрузки (--after) дописывается в тот же файл:
+        # gzip допускает склеенные потоки.
+        mode = 'ab' if options['after'] else 'wb'
+        with open(options['output'], mode) as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,46 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.datagen import Plan, generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует набор данных в схемах static/data/*.csv произвольного '
+        'размера: популярность произведений по Ципфу, «вирусные» отзывы '
+        'с большим числом комментариев, тексты на кириллице. Один и тот '
+        'же --seed дает одинаковые файлы при любом числе процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для CSV-файлов.')
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=300000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения популярности произведений.',
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--chunk-size', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            plan = Plan(
+                options['users'], options['titles'], options['reviews'],
+                options['comments'], seed=options['seed'],
+                zipf=options['zipf'], chunk_size=options['chunk_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        rows = generate(plan, options['directory'], options['workers'])
+        for table, count in rows.items():
+            self.stdout.write(f'{table}.csv: {count} строк')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.snapshots import SNAPSHOT_PATHS, generate_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Перегенерирует JSON-снимки публичных справочников.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=(
+                'Имена снимков (по умолчанию все): '
+                f'{", ".join(SNAPSHOT_PATHS.values())}.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(SNAPSHOT_PATHS.values())
+        if unknown:
+            raise CommandError(f'Неизвестные снимки: {", ".join(unknown)}')
+        generated = generate_snapshots(options['names'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Снимки обновлены: {", ".join(generated)}')
+        )
@@ -0,0 +1,60 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from api import consts
+from api.bulk import CREATE, UPDATE, UPSERT, bulk_save_users
+
+USER_FIELDS = ('username', 'email', 'role', 'bio', 'first_name', 'last_name')
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей из CSV в формате static/data/users.csv: '
+        'создает новых и обновляет существующих (поиск по username).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к CSV-файлу.')
+        parser.add_argument(
+            '--mode',
+            choices=(CREATE, UPDATE, UPSERT),
+            default=UPSERT,
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=consts.BULK_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--keep-ids',
+            action='store_true',
+            help='Сохранять id из файла для создаваемых пользователей.',
+        )
+
+    def read_rows(self, csv_file, keep_ids):
+        for row in csv.DictReader(csv_file):
+            data = {
+                field: row[field] for field in USER_FIELDS if field in row
+            }
+            if keep_ids and row.get('id'):
+                data['id'] = int(row['id'])
+            yield data
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as f:
+                created, updated = bulk_save_users(
+                    self.read_rows(f, options['keep_ids']),
+                    options['mode'],
+                    batch_size=options['batch_size'],
+                    keep_ids=options['keep_ids'],
+                )
+        except OSError as error:
+            raise CommandError(error)
+        except ValidationError as error:
+            details = json.dumps(error.detail, ensure_ascii=False, indent=2)
+            raise CommandError(f'Ошибки в строках (нумерация с 0): {details}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {len(created)}, обновлено: {len(updated)}'
+        ))
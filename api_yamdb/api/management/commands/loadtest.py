@@ -0,0 +1,165 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import (
+    LoadTest, build_scenarios, load_collection, percentile,
+)
+from api.utils import generate_and_save_confirmation_codes
+
+User = get_user_model()
+
+COLLECTION = (
+    settings.BASE_DIR.parent / 'postman_collection'
+    / 'Ymdb-collection.postman_collection.json'
+)
+
+
+def weight(value):
+    pattern, _, number = value.rpartition('=')
+    if not pattern or not number.isdigit():
+        raise ValueError(value)
+    return pattern, int(number)
+
+
+def confirmation_code(username):
+    return generate_and_save_confirmation_codes(
+        User.objects.get(username=username)
+    )
+
+
+def start_server(url):
+    """Запускает runserver на адресе url и ждет, пока он примет соединение."""
+    address = urlsplit(url)
+    host, port = address.hostname, address.port or 80
+    server = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'{host}:{port}',
+         '--noreload'],
+        cwd=settings.BASE_DIR, env=os.environ.copy(),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise CommandError('runserver завершился при запуске.')
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise CommandError(f'Сервер на {url} не ответил за 30 секунд.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон сценариев Postman-коллекции против запущенного '
+        'сервера: замкнутая модель (--concurrency) или открытая '
+        '(--rate сценариев в секунду). Печатает пропускную способность, '
+        'p50/p95/p99 и долю ошибок по каждому запросу. База сервера '
+        'должна быть подготовлена postman_collection/set_up_data.sh, '
+        'а команда — смотреть в ту же базу: из нее берутся коды '
+        'подтверждения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--collection', default=str(COLLECTION))
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--iterations', type=int, default=None,
+            help='Число сценариев вместо --duration (замкнутая модель).',
+        )
+        parser.add_argument(
+            '--rate', type=float, default=None,
+            help='Открытая модель: прибытий сценариев в секунду.',
+        )
+        parser.add_argument(
+            '--weight', type=weight, action='append', default=[],
+            metavar='ШАБЛОН=ВЕС',
+            help='Вес сценариев по шаблону fnmatch, например '
+                 '"titles/*=10" или "*bad_requests*=0".',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument(
+            '--keepalive', action='store_true',
+            help='Переиспользовать соединения (для серверов за прокси, '
+                 'не для runserver).',
+        )
+        parser.add_argument(
+            '--start', action='store_true',
+            help='Запустить runserver на адресе --url на время прогона.',
+        )
+        parser.add_argument(
+            '--list', action='store_true',
+            help='Только показать сценарии и их веса.',
+        )
+
+    def report(self, title, stats):
+        self.stdout.write(f'{title}: {stats.elapsed:.1f} с')
+        self.stdout.write(
+            f'{"запрос":<60} {"число":>7} {"rps":>8} {"p50":>8} '
+            f'{"p95":>8} {"p99":>8} {"ошибки":>7} {"статус≠":>7}'
+        )
+        for row in stats.rows():
+            self.stdout.write(
+                f'{row["name"][:60]:<60} {row["count"]:>7} '
+                f'{row["rps"]:>8.1f} {row["p50"]:>8.1f} '
+                f'{row["p95"]:>8.1f} {row["p99"]:>8.1f} '
+                f'{row["error_rate"]:>7.1%} {row["mismatches"]:>7}'
+            )
+        if stats.lags:
+            lags = sorted(stats.lags)
+            self.stdout.write(
+                f'ожидание в очереди: p99 '
+                f'{percentile(lags, 99) * 1000:.1f} мс, '
+                f'макс {lags[-1] * 1000:.1f} мс'
+            )
+
+    def handle(self, *args, **options):
+        variables, groups = load_collection(options['collection'])
+        scenarios = build_scenarios(groups, options['weight'])
+        if not scenarios:
+            raise CommandError('Все сценарии исключены весами.')
+        if options['list']:
+            for scenario in scenarios:
+                self.stdout.write(
+                    f'{scenario.weight:>3}  {scenario.name} '
+                    f'({len(scenario.steps)} запр.)'
+                )
+            return
+        server = None
+        if options['start']:
+            server = start_server(options['url'])
+        try:
+            loadtest = LoadTest(
+                options['url'], variables, groups, codes=confirmation_code,
+                timeout=options['timeout'], seed=options['seed'],
+                keepalive=options['keepalive'],
+            )
+            self.report('Подготовка (коллекция по порядку)', loadtest.setup())
+            if options['rate']:
+                stats = loadtest.run_open(
+                    scenarios, options['rate'], options['duration'],
+                    options['concurrency'],
+                )
+            else:
+                stats = loadtest.run_closed(
+                    scenarios, options['concurrency'],
+                    None if options['iterations'] else options['duration'],
+                    options['iterations'],
+                )
+            self.report('Нагрузка', stats)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reviews.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет записи об отозванных токенах, срок действия которых '
+        'уже истек. Последняя запись сохраняется, чтобы id новых записей '
+        'не переиспользовались и процессы не пропустили их при '
+        'инкрементальном обновлении.'
+    )
+
+    def handle(self, *args, **options):
+        last = RevokedToken.objects.order_by('-id').first()
+        if last is None:
+            return
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lt=timezone.now()
+        ).exclude(id=last.id).delete()
+        self.stdout.write(self.style.SUCCESS(f'Удалено записей: {deleted}'))
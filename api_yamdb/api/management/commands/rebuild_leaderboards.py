@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Title
+from reviews.signals import titles_changed
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает агрегаты отзывов произведений по фактическим '
+        'отзывам и заново строит таблицы лидеров (топ и тренды).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = rebuild_leaderboards(options['batch_size'])
+        if changed:
+            # Рейтинг в документах произведений считается по TitleStats.
+            titles_changed.send(sender=Title, title_ids=changed)
+        self.stdout.write(self.style.SUCCESS(
+            'Таблицы лидеров перестроены, исправлено произведений: '
+            f'{len(changed)}'
+        ))
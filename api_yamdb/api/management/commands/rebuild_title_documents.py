@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.documents import rebuild_documents
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает готовые документы всех произведений, из которых '
+        'отдаются список и карточка произведения.'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_documents()
+        self.stdout.write(self.style.SUCCESS(
+            f'Документы перестроены: {count}'
+        ))
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import percentile
+from api.management.commands.loadtest import start_server
+from api.replay import (
+    Replayer, compare, is_replayable, load_capture, replay_tokens,
+)
+
+
+def speed(value):
+    if value == 'max':
+        return None
+    number = float(value)
+    if number <= 0:
+        raise ValueError(value)
+    return number
+
+
+class Command(BaseCommand):
+    help = (
+        'Воспроизводит трафик, записанный TrafficCaptureMiddleware, против '
+        'локального сервера с исходными интервалами (--speed 1), '
+        'ускоренными в N раз (--speed N) или без пауз (--speed max), и '
+        'сравнивает задержки по маршрутам с записанными. Для '
+        'обезличенных пользователей создаются локальные двойники '
+        'replay-<хэш> с той же ролью.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('capture')
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--speed', type=speed, default=1.0)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument(
+            '--start', action='store_true',
+            help='Запустить runserver на адресе --url на время прогона.',
+        )
+
+    def handle(self, *args, **options):
+        records = load_capture(options['capture'])
+        replayable = [record for record in records if is_replayable(record)]
+        if not replayable:
+            raise CommandError('В файле нет запросов для воспроизведения.')
+        skipped = len(records) - len(replayable)
+        server = None
+        if options['start']:
+            server = start_server(options['url'])
+        try:
+            replayer = Replayer(
+                options['url'], replay_tokens(replayable),
+                timeout=options['timeout'],
+            )
+            stats = replayer.run(
+                replayable, options['speed'], options['concurrency']
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        self.stdout.write(
+            f'Воспроизведено {len(replayable)} запросов за '
+            f'{stats.elapsed:.1f} с; пропущено без тела: {skipped}'
+        )
+        self.stdout.write(
+            f'{"маршрут":<60} {"число":>6} {"было p50":>9} {"было p95":>9} '
+            f'{"p50":>8} {"p95":>8} {"Δp50":>7} {"ошибки":>6} '
+            f'{"статус≠":>7}'
+        )
+        for row in compare(replayable, stats):
+            self.stdout.write(
+                f'{row["name"][:60]:<60} {row["count"]:>6} '
+                f'{row["recorded_p50"]:>9.1f} {row["recorded_p95"]:>9.1f} '
+                f'{row["p50"]:>8.1f} {row["p95"]:>8.1f} '
+                f'{row["change"]:>+7.0%} {row["errors"]:>6} '
+                f'{row["mismatches"]:>7}'
+            )
+        lags = sorted(stats.lags)
+        self.stdout.write(
+            f'опоздание относительно расписания: p99 '
+            f'{percentile(lags, 99) * 1000:.1f} мс'
+        )
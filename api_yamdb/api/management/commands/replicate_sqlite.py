@@ -0,0 +1,54 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Заменитель репликации для локальной проверки: копирует основную '
+        'базу SQLite во все реплики из DATABASE_REPLICAS через backup API. '
+        'С --interval повторяет копирование, имитируя отставание реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Повторять копирование каждые N секунд.',
+        )
+
+    def replicate(self, primary, replicas):
+        source = sqlite3.connect(primary)
+        try:
+            for alias, name in replicas.items():
+                target = sqlite3.connect(name)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: скопировано в {name}')
+        finally:
+            source.close()
+
+    def handle(self, *args, **options):
+        databases = settings.DATABASES
+        if databases[DEFAULT_DB_ALIAS]['ENGINE'] != (
+            'django.db.backends.sqlite3'
+        ):
+            raise CommandError('Команда рассчитана только на SQLite.')
+        replicas = {
+            alias: str(databases[alias]['NAME'])
+            for alias in settings.DATABASE_REPLICAS
+        }
+        if not replicas:
+            raise CommandError(
+                'Реплики не настроены: задайте YAMDB_REPLICAS.'
+            )
+        primary = str(databases[DEFAULT_DB_ALIAS]['NAME'])
+        while True:
+            self.replicate(primary, replicas)
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.jobs import run_job
+from reviews.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет незавершенные фоновые задачи, например оборванные '
+        'перезапуском процесса. Задачи идемпотентны.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Повторить и задачи, завершившиеся ошибкой.',
+        )
+
+    def handle(self, *args, **options):
+        statuses = [Job.PENDING, Job.RUNNING]
+        if options['retry_failed']:
+            statuses.append(Job.FAILED)
+        for job in Job.objects.filter(status__in=statuses).order_by('id'):
+            run_job(job)
+            self.stdout.write(f'{job}')
@@ -0,0 +1,253 @@
+"""
+Метрики производительности запросов.
+
+MetricsMiddleware замеряет для каждого маршрута API общее время
+запроса, число и время SQL-запросов, время сериализации и размер
+ответа, отдает их клиенту в заголовке Server-Timing и складывает
+в гистограммы, которые /metrics отдает в текстовом формате Prometheus.
+
+SQL-запросы считает обертка, которую получает каждое новое соединение
+(connection_created), а сериализацию — TimedSerializerMixin
+сериализаторов API. Оба пишут в объект текущего запроса из контекстной
+переменной, поэтому замеры работают и в пуле потоков ASGI.
+
+Каждый процесс копит метрики в памяти и не реже раза
+в METRICS['FLUSH_SECONDS'] сбрасывает их в свой файл в METRICS['DIR'];
+/metrics суммирует файлы всех процессов. Без DIR видны только
+метрики процесса, ответившего на /metrics.
+
+/metrics отвечает только адресам из METRICS['ALLOWED_IPS'] (по
+REMOTE_ADDR, по умолчанию локальным), остальным — 404: трафик и
+задержки по маршрутам не должны быть видны всем.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .snapshots import write_atomic
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIR': None,
+    'FLUSH_SECONDS': 5,
+    'ALLOWED_IPS': ('127.0.0.1', '::1'),
+}
+
+PREFIX = 'yamdb_'
+HISTOGRAMS = {
+    'request_duration_seconds': (
+        'Время обработки запроса.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    'db_queries': (
+        'Число SQL-запросов на запрос.',
+        (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    ),
+    'db_duration_seconds': (
+        'Время SQL-запросов на запрос.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    ),
+    'serializer_duration_seconds': (
+        'Время сериализации ответа.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    ),
+    'response_size_bytes': (
+        'Размер тела ответа.',
+        (256, 1024, 4096, 16384, 65536, 262144, 1048576),
+    ),
+}
+REQUESTS_TOTAL = 'requests_total'
+
+current = contextvars.ContextVar('request_metrics', default=None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+class RequestMetrics:
+    __slots__ = (
+        'db_queries', 'db_seconds', 'serializer_seconds', 'serializing'
+    )
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Объект соединения переживает переподключения: не дублируем обертку.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """Учитывает время to_representation внешнего сериализатора."""
+
+    def to_representation(self, instance):
+        metrics = current.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializing = False
+            metrics.serializer_seconds += time.perf_counter() - started
+
+
+class Registry:
+    """
+    Гистограммы по маршрутам: для каждой — счетчики корзин, сумма
+    и число наблюдений; счетчик запросов по маршруту, методу и статусу.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {name: {} for name in HISTOGRAMS}
+            self.requests = {}
+            self.flushed = time.monotonic()
+
+    def observe(self, route, method, status, values):
+        with self.lock:
+            for name, value in values.items():
+                buckets = HISTOGRAMS[name][1]
+                series = self.histograms[name].setdefault(
+                    route, [0] * len(buckets) + [0.0, 0]
+                )
+                for index, bound in enumerate(buckets):
+                    if value <= bound:
+                        series[index] += 1
+                series[-2] += value
+                series[-1] += 1
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+        if time.monotonic() - self.flushed >= get_config()['FLUSH_SECONDS']:
+            self.flush()
+
+    def state(self):
+        with self.lock:
+            return {
+                'histograms': {
+                    name: {route: list(series) for route, series in
+                           routes.items()}
+                    for name, routes in self.histograms.items()
+                },
+                'requests': [
+                    [*key, count] for key, count in self.requests.items()
+                ],
+            }
+
+    def file(self, pid=None):
+        return Path(get_config()['DIR']) / f'metrics-{pid or os.getpid()}.json'
+
+    def flush(self):
+        self.flushed = time.monotonic()
+        if get_config()['DIR'] is None:
+            return
+        path = self.file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Сбрасывается на пути запроса, а после сбоя машины метрики все
+        # равно начинаются заново: fsync не нужен.
+        write_atomic(
+            path, json.dumps(self.state()).encode(), durable=False
+        )
+
+    def collect(self):
+        """Состояния всех процессов (или только текущего без DIR)."""
+        if get_config()['DIR'] is None:
+            return [self.state()]
+        self.flush()
+        states = []
+        for path in Path(get_config()['DIR']).glob('metrics-*.json'):
+            try:
+                states.append(json.loads(path.read_bytes()))
+            except (OSError, ValueError):
+                continue
+        return states
+
+
+registry = Registry()
+
+
+def merge(states):
+    histograms = {name: {} for name in HISTOGRAMS}
+    requests = {}
+    for state in states:
+        for name, routes in state['histograms'].items():
+            for route, series in routes.items():
+                merged = histograms[name].setdefault(route, [0] * len(series))
+                for index, value in enumerate(series):
+                    merged[index] += value
+        for *key, count in state['requests']:
+            requests[tuple(key)] = requests.get(tuple(key), 0) + count
+    return histograms, requests
+
+
+def format_labels(**labels):
+    return ','.join(
+        f'{name}="{value}"' for name, value in labels.items()
+    )
+
+
+def render_prometheus(states):
+    histograms, requests = merge(states)
+    lines = [
+        f'# HELP {PREFIX}{REQUESTS_TOTAL} Число обработанных запросов.',
+        f'# TYPE {PREFIX}{REQUESTS_TOTAL} counter',
+    ]
+    for (route, method, status), count in sorted(requests.items()):
+        labels = format_labels(route=route, method=method, status=status)
+        lines.append(f'{PREFIX}{REQUESTS_TOTAL}{{{labels}}} {count}')
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        metric = f'{PREFIX}{name}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for route, series in sorted(histograms[name].items()):
+            for bound, count in zip(buckets, series):
+                labels = format_labels(route=route, le=bound)
+                lines.append(f'{metric}_bucket{{{labels}}} {count}')
+            labels = format_labels(route=route, le='+Inf')
+            lines.append(f'{metric}_bucket{{{labels}}} {series[-1]}')
+            labels = format_labels(route=route)
+            lines.append(f'{metric}_sum{{{labels}}} {series[-2]}')
+            lines.append(f'{metric}_count{{{labels}}} {series[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    config = get_config()
+    if (
+        not config['ENABLED']
+        or request.META.get('REMOTE_ADDR') not in config['ALLOWED_IPS']
+    ):
+        raise Http404
+    return HttpResponse(
+        render_prometheus(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
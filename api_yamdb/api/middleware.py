@@ -0,0 +1,122 @@
+import time
+
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import compression, metrics
+from .snapshots import get_config, get_snapshot_path
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Замеряет время запроса, SQL, сериализацию и размер ответа
+    (api.metrics) и отдает их в заголовке Server-Timing.
+    """
+
+    def process_request(self, request):
+        if metrics.get_config()['ENABLED']:
+            request.metrics = metrics.RequestMetrics()
+            request.metrics_started = time.perf_counter()
+            metrics.current.set(request.metrics)
+
+    def process_response(self, request, response):
+        request_metrics = getattr(request, 'metrics', None)
+        if request_metrics is None:
+            return response
+        metrics.current.set(None)
+        duration = time.perf_counter() - request.metrics_started
+        response['Server-Timing'] = (
+            f'total;dur={duration * 1000:.1f}, '
+            f'db;dur={request_metrics.db_seconds * 1000:.1f};'
+            f'desc="{request_metrics.db_queries} queries", '
+            f'serializer;dur={request_metrics.serializer_seconds * 1000:.1f}'
+        )
+        match = request.resolver_match
+        if match is None or not request.path.startswith('/api/'):
+            return response
+        values = {
+            'request_duration_seconds': duration,
+            'db_queries': request_metrics.db_queries,
+            'db_duration_seconds': request_metrics.db_seconds,
+            'serializer_duration_seconds': request_metrics.serializer_seconds,
+        }
+        if not response.streaming:
+            values['response_size_bytes'] = len(response.content)
+        elif response.has_header('Content-Length'):
+            values['response_size_bytes'] = int(response['Content-Length'])
+        metrics.registry.observe(
+            match.view_name, request.method, response.status_code, values
+        )
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает JSON и текстовые ответы (api.compression) и учитывает
+    сэкономленные байты и время сжатия по точкам API.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or not compression.is_compressible(response)
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < compression.get_config()['MIN_SIZE']:
+            return response
+        encoding = compression.negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        started = time.thread_time()
+        content = compression.compress(response.content, encoding)
+        compression.compression_stats.record(
+            self.get_endpoint(request),
+            len(response.content),
+            len(content),
+            time.thread_time() - started,
+        )
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def get_endpoint(self, request):
+        match = request.resolver_match
+        return match.view_name if match is not None else request.path
+
+
+class SnapshotMiddleware(MiddlewareMixin):
+    """
+    Отдает анонимные GET-запросы к справочникам из готовых снимков
+    (api.snapshots), не доходя до DRF и ORM.
+    """
+
+    def process_request(self, request):
+        if get_config()['ENABLED']:
+            snapshot = get_snapshot_path(request)
+            if snapshot is not None:
+                try:
+                    return self.serve(*snapshot)
+                except FileNotFoundError:
+                    pass
+        return None
+
+    def serve(self, path, encoding):
+        response = FileResponse(
+            open(path, 'rb'), content_type='application/json'
+        )
+        del response['Content-Disposition']
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding, Authorization'
+        return response
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class HistoryPagination(CursorPagination):
+    """
+    Курсорная (keyset) пагинация истории пользователя.
+
+    Следующая страница продолжается от pub_date последней записи по
+    индексу (author, -pub_date, -id), поэтому стоимость запроса не
+    зависит ни от глубины листания, ни от числа записей автора.
+    """
+    ordering = ('-pub_date', '-id')
@@ -0,0 +1,146 @@
+"""
+Поиск N+1 и медленных запросов.
+
+QueryDetectorMiddleware (при QUERY_DETECTOR['ENABLED'], по умолчанию
+в DEBUG) группирует SQL каждого запроса по форме — тексту без
+параметров и с одним плейсхолдером вместо списков IN. Форма SELECT,
+выполненная не меньше REPEATED_SELECTS раз, и любой запрос дольше
+SLOW_QUERY_MS попадают в отчет вместе с полем сериализатора, при
+заполнении которого они выполнены. Отчеты пишутся в лог, а последние
+REPORTED_LIMIT из них хранятся в reported; в тестах их проверяет
+фикстура tests/fixtures/fixture_queries.py.
+"""
+import contextvars
+import logging
+import re
+import sys
+import time
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': settings.DEBUG,
+    'REPEATED_SELECTS': 3,
+    'SLOW_QUERY_MS': 200,
+}
+
+N_PLUS_ONE = 'n+1'
+SLOW = 'slow'
+
+Query = namedtuple('Query', 'shape sql duration field')
+Issue = namedtuple('Issue', 'kind path shape count duration_ms fields')
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+current = contextvars.ContextVar('query_detector', default=None)
+REPORTED_LIMIT = 1000
+# Последние найденные проблемы (для тестов и отладки): детектор
+# включен в DEBUG на долгоживущих серверах, список не должен расти.
+reported = deque(maxlen=REPORTED_LIMIT)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'QUERY_DETECTOR', {})}
+
+
+def normalize(sql):
+    """Форма запроса: без литералов и с одним элементом в IN (...)."""
+    return IN_LIST.sub('IN (...)', LITERALS.sub('?', sql))
+
+
+def find_serializer_field():
+    """
+    Поле сериализатора, при заполнении которого выполняется запрос:
+    ближайший по стеку кадр Serializer.to_representation DRF.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if (
+            code.co_name == 'to_representation'
+            and code.co_filename.endswith('rest_framework/serializers.py')
+            and 'field' in frame.f_locals
+        ):
+            serializer = type(frame.f_locals['self']).__name__
+            return f'{serializer}.{frame.f_locals["field"].field_name}'
+        frame = frame.f_back
+    return None
+
+
+def record_statement(execute, sql, params, many, context):
+    queries = current.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append(Query(
+            normalize(sql), sql, time.perf_counter() - started,
+            find_serializer_field(),
+        ))
+
+
+def install_statement_recorder(sender, connection, **kwargs):
+    if record_statement not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_statement)
+
+
+def analyze(path, queries):
+    config = get_config()
+    shapes = {}
+    for query in queries:
+        shapes.setdefault(query.shape, []).append(query)
+    issues = []
+    for shape, same_shape in shapes.items():
+        if (
+            shape.lstrip().upper().startswith('SELECT')
+            and len(same_shape) >= config['REPEATED_SELECTS']
+        ):
+            issues.append(Issue(
+                N_PLUS_ONE, path, shape, len(same_shape),
+                sum(query.duration for query in same_shape) * 1000,
+                sorted({query.field for query in same_shape if query.field}),
+            ))
+    for query in queries:
+        if query.duration * 1000 >= config['SLOW_QUERY_MS']:
+            issues.append(Issue(
+                SLOW, path, query.shape, 1, query.duration * 1000,
+                [query.field] if query.field else [],
+            ))
+    return issues
+
+
+def format_issue(issue):
+    fields = ', '.join(issue.fields) or 'вне сериализатора'
+    if issue.kind == N_PLUS_ONE:
+        title = f'{issue.count} одинаковых запросов'
+    else:
+        title = 'медленный запрос'
+    return (
+        f'{issue.path}: {title} ({issue.duration_ms:.1f} мс), '
+        f'поле: {fields}\n    {issue.shape}'
+    )
+
+
+class QueryDetectorMiddleware(MiddlewareMixin):
+
+    def process_request(self, request):
+        if get_config()['ENABLED']:
+            request.query_log = []
+            current.set(request.query_log)
+
+    def process_response(self, request, response):
+        queries = getattr(request, 'query_log', None)
+        if queries is None:
+            return response
+        current.set(None)
+        for issue in analyze(request.path, queries):
+            logger.warning(format_issue(issue))
+            reported.append(issue)
+        return response
@@ -0,0 +1,55 @@
+"""
+Быстрый JSON-рендерер.
+
+Если установлен orjson, ответы кодируются им, иначе — стандартным
+JSONRenderer. Вывод совпадает с JSONRenderer: кириллица без
+экранирования, компактные разделители, экранированные U+2028/U+2029.
+Всё, что orjson не кодирует сам (даты и время, Decimal, ленивые
+строки, QuerySet), передается в JSONEncoder DRF, поэтому представление
+таких значений не меняется. Отступы (браузерный API, ?indent) и
+значения, которые orjson не умеет кодировать (целые больше 64 бит),
+рендерятся стандартным путем. Единственное расхождение: NaN
+и бесконечность orjson кодирует как null, а не падает с ошибкой —
+в ответах API таких значений нет.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson is not None else None
+)
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return content.replace(
+            LINE_SEPARATOR, b'\\u2028'
+        ).replace(PARAGRAPH_SEPARATOR, b'\\u2029')
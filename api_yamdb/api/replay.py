@@ -0,0 +1,179 @@
+"""
+Воспроизведение трафика, записанного api.capture.
+
+Записи идут в порядке времени с исходными интервалами, ускоренными
+в speed раз (без пауз при speed=None). Каждый обезличенный
+пользователь получает локального двойника replay-<хэш> с той же ролью
+и свой токен, так что кэши и права работают как при записи; имя
+пользователя в пути ({user}) заменяется на двойника с ролью user.
+Запросы с телом, от которого сохранен только хэш, пропускаются.
+
+Задержки сравниваются по маршрутам с записанными: p50/p95 до и после
+и изменение медианы; ответы со статусом, отличным от записанного,
+считаются отдельно. Как и при записи, берется время на сервере
+(total из Server-Timing), а без заголовка — время на клиенте.
+"""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import consts
+from .capture import PATH_USER
+from .loadtest import Stats, percentile
+
+User = get_user_model()
+
+REPLAY_USERNAME = 'replay-{}'
+SERVER_TOTAL = re.compile(r'\btotal;dur=([\d.]+)')
+
+
+def load_capture(path):
+    with open(path, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    return sorted(records, key=lambda record: record['ts'])
+
+
+def endpoint(record):
+    return f'{record["method"]} {record["route"] or record["path"]}'
+
+
+def replay_user(user, role):
+    username = REPLAY_USERNAME.format(user)
+    double, _ = User.objects.get_or_create(
+        username=username,
+        defaults={'email': f'{username}@example.com', 'role': role},
+    )
+    return double
+
+
+def replay_path(record):
+    if record.get('path_user') is None:
+        return record['path']
+    return record['path'].replace(
+        PATH_USER, REPLAY_USERNAME.format(record['path_user']), 1
+    )
+
+
+def replay_tokens(records):
+    """
+    Токены локальных двойников обезличенных пользователей; создает и
+    двойников пользователей из путей.
+    """
+    tokens = {}
+    path_users = set()
+    for record in records:
+        if record.get('path_user') is not None:
+            path_users.add(record['path_user'])
+        if record['user'] is None or record['user'] in tokens:
+            continue
+        user = replay_user(record['user'], record['role'] or consts.USER)
+        tokens[record['user']] = str(AccessToken.for_user(user))
+    for user in path_users:
+        replay_user(user, consts.USER)
+    return tokens
+
+
+def is_replayable(record):
+    return not record['body_size'] or 'body' in record
+
+
+class Replayer:
+
+    def __init__(self, base_url, tokens, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.tokens = tokens
+        self.timeout = timeout
+
+    def send(self, record, stats):
+        url = self.base_url + replay_path(record)
+        if record['params']:
+            url += '?' + urlencode(record['params'], doseq=True)
+        headers = {}
+        token = self.tokens.get(record['user'])
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = record.get('body')
+        if body is not None:
+            headers['Content-Type'] = record['content_type']
+            body = body.encode()
+        started = time.perf_counter()
+        try:
+            response = requests.request(
+                record['method'], url, data=body, headers=headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException:
+            stats.record(
+                endpoint(record), time.perf_counter() - started,
+                None, record['status'],
+            )
+            return
+        duration = time.perf_counter() - started
+        timing = SERVER_TOTAL.search(response.headers.get('Server-Timing', ''))
+        if timing:
+            duration = float(timing.group(1)) / 1000
+        stats.record(
+            endpoint(record), duration, response.status_code,
+            record['status'],
+        )
+
+    def run(self, records, speed=None, concurrency=16):
+        """
+        Воспроизводит записи; возвращает Stats, в lags которого —
+        опоздание отправки относительно расписания.
+        """
+        stats = Stats()
+
+        def send(record, scheduled):
+            stats.record_lag(time.perf_counter() - scheduled)
+            self.send(record, stats)
+
+        started = time.perf_counter()
+        first = records[0]['ts'] if records else 0
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for record in records:
+                if speed:
+                    scheduled = started + (record['ts'] - first) / speed
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    scheduled = time.perf_counter()
+                executor.submit(send, record, scheduled)
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+
+def compare(records, stats):
+    """Строки сравнения записанных и воспроизведенных задержек."""
+    recorded = {}
+    for record in records:
+        recorded.setdefault(endpoint(record), []).append(
+            record['duration_ms'] / 1000
+        )
+    rows = []
+    for name, latencies in sorted(stats.latencies.items()):
+        before = sorted(recorded[name])
+        after = sorted(latencies)
+        before_p50 = percentile(before, 50) * 1000
+        after_p50 = percentile(after, 50) * 1000
+        rows.append({
+            'name': name,
+            'count': len(after),
+            'recorded_p50': before_p50,
+            'recorded_p95': percentile(before, 95) * 1000,
+            'p50': after_p50,
+            'p95': percentile(after, 95) * 1000,
+            'change': (
+                (after_p50 - before_p50) / before_p50 if before_p50 else 0.0
+            ),
+            'errors': stats.errors[name],
+            'mismatches': stats.mismatches[name],
+        })
+    return rows
@@ -0,0 +1,87 @@
+"""
+Чтение с реплик.
+
+PrimaryReplicaRouter отправляет все записи в основную базу, а чтения —
+в базу, выбранную для текущего запроса. ReplicaReadMixin выбирает
+реплику только для действий только на чтение (list/retrieve) и только
+если пользователь не писал в последние READ_YOUR_WRITES_SECONDS:
+после своей записи пользователь читает из основной базы и видит её,
+даже если реплики отстают.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+LAST_WRITE_KEY = 'db:last_write:{user_id}'
+
+read_alias = ContextVar('read_alias', default=None)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики — копии основной базы, схему в них не мигрируют.
+        return db not in getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def choose_replica():
+    replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+    return random.choice(replicas) if replicas else None
+
+
+def mark_write(user):
+    cache.set(
+        LAST_WRITE_KEY.format(user_id=user.pk),
+        True,
+        settings.READ_YOUR_WRITES_SECONDS,
+    )
+
+
+def wrote_recently(user):
+    return (
+        user.is_authenticated
+        and cache.get(LAST_WRITE_KEY.format(user_id=user.pk)) is not None
+    )
+
+
+class ReplicaReadMixin:
+    """Читает с реплики в действиях replica_actions."""
+
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            self.action in self.replica_actions
+            and not wrote_recently(request.user)
+        ):
+            read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            mark_write(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
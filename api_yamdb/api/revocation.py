@@ -0,0 +1,125 @@
+"""
+Отзыв JWT-токенов.
+
+Отозванные jti и моменты not_before пользователей хранятся в таблице
+RevokedToken и копируются в память каждого процесса. Проверка токена —
+поиск в множестве и словаре без запросов к базе; новые записи
+подтягиваются одним запросом не чаще раза в REFRESH_SECONDS,
+раз в FULL_RELOAD_SECONDS копия перечитывается целиком.
+"""
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import RevokedToken
+
+REFRESH_SECONDS = getattr(settings, 'TOKEN_REVOCATION_REFRESH_SECONDS', 5)
+FULL_RELOAD_SECONDS = getattr(
+    settings, 'TOKEN_REVOCATION_FULL_RELOAD_SECONDS', 300
+)
+
+
+def issued_at(token):
+    """Время выдачи токена в секундах Unix."""
+    if 'iat' in token:
+        return token['iat']
+    return token['exp'] - int(token.lifetime.total_seconds())
+
+
+def collect(jtis, not_before, revocation):
+    if revocation.jti:
+        jtis.add(revocation.jti)
+    if revocation.user_id and revocation.not_before:
+        timestamp = int(revocation.not_before.timestamp())
+        if timestamp > not_before.get(revocation.user_id, 0):
+            not_before[revocation.user_id] = timestamp
+
+
+class RevocationList:
+    """Копия таблицы RevokedToken в памяти процесса."""
+
+    def __init__(self, refresh_seconds=REFRESH_SECONDS,
+                 full_reload_seconds=FULL_RELOAD_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.jtis, self.not_before, self.last_id = set(), {}, 0
+            self.next_refresh = 0
+            self.next_full_reload = 0
+
+    def add(self, revocation):
+        with self.lock:
+            collect(self.jtis, self.not_before, revocation)
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now < self.next_refresh:
+            return
+        with self.lock:
+            if not force and now < self.next_refresh:
+                return
+            if now >= self.next_full_reload:
+                # Новая копия собирается отдельно и подменяет старую
+                # целиком: is_revoked читает без блокировки и не должен
+                # увидеть частично заполненную копию.
+                jtis, not_before, last_id = set(), {}, 0
+                self.next_full_reload = now + self.full_reload_seconds
+            else:
+                jtis, not_before, last_id = (
+                    self.jtis, self.not_before, self.last_id
+                )
+            revocations = RevokedToken.objects.filter(
+                id__gt=last_id
+            ).only('id', 'jti', 'user_id', 'not_before').order_by('id')
+            for revocation in revocations:
+                collect(jtis, not_before, revocation)
+                last_id = revocation.id
+            self.jtis, self.not_before, self.last_id = (
+                jtis, not_before, last_id
+            )
+            self.next_refresh = now + self.refresh_seconds
+
+    def is_revoked(self, token):
+        self.refresh()
+        if token.get(api_settings.JTI_CLAIM) in self.jtis:
+            return True
+        not_before = self.not_before.get(
+            token.get(api_settings.USER_ID_CLAIM)
+        )
+        # Время выдачи известно с точностью до секунды, поэтому токены,
+        # выданные в ту же секунду, что и отзыв, тоже считаются отозванными.
+        return not_before is not None and issued_at(token) <= not_before
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """Отзывает один токен."""
+    revocation = RevokedToken.objects.create(
+        jti=token[api_settings.JTI_CLAIM],
+        expires_at=datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+    )
+    revocation_list.add(revocation)
+    return revocation
+
+
+def revoke_user_tokens(user):
+    """Отзывает все токены пользователя, выданные до этого момента."""
+    now = timezone.now()
+    revocation = RevokedToken.objects.create(
+        user=user,
+        not_before=now,
+        expires_at=now + AccessToken.lifetime,
+    )
+    revocation_list.add(revocation)
+    return revocation
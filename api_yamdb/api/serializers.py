@@ -4,11 +4,14 @@ from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from api import consts
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import Category, Comment, Genre, Job, Review, Title, User
+from reviews.validators import validate_username
+from .fields import CatalogSlugRelatedField
+from .metrics import TimedSerializerMixin
 from .utils import generate_and_save_confirmation_codes
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор отзывов.
     """
@@ -42,27 +45,42 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class TitlesCountMixin:
+    """
+    Отдает поле titles_count, только если его запросили
+    (with_counts в контексте сериализатора).
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('with_counts'):
+            fields.pop('titles_count')
+        return fields
+
+
+class CategorySerializer(TitlesCountMixin, TimedSerializerMixin,
+                         serializers.ModelSerializer):
     """
     Сериализатор категорий.
     """
 
     class Meta:
         model = Category
-        fields = ('name', 'slug',)
+        fields = ('name', 'slug', 'titles_count')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TitlesCountMixin, TimedSerializerMixin,
+                      serializers.ModelSerializer):
     """
     Сериализатор жанров
     """
 
     class Meta:
         model = Genre
-        fields = ('name', 'slug')
+        fields = ('name', 'slug', 'titles_count')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор комментариев.
     """
@@ -77,15 +95,26 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class UserCommentSerializer(CommentSerializer):
+    """
+    Сериализатор комментариев в истории пользователя: с отзывом и
+    произведением, к которым они оставлены.
+    """
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = ('id', 'title', 'review', 'text', 'author', 'pub_date')
+
+
+class TitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для записи произведений.
     """
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True,
@@ -101,7 +130,7 @@ class TitleSerializer(serializers.ModelSerializer):
         return TitleReadSerializer(instance).data
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для чтения произведений.
     """
@@ -119,7 +148,7 @@ class TitleReadSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор пользователя"""
 
     class Meta:
@@ -138,6 +167,22 @@ class MeSerializer(UserSerializer):
         read_only_fields = ('role',)
 
 
+class UserBulkSerializer(UserSerializer):
+    """
+    Сериализатор пользователя для массового создания и изменения.
+
+    Не проверяет уникальность полей построчно, чтобы не делать
+    запрос к базе на каждую запись: это делает api.bulk
+    одним запросом на пачку.
+    """
+
+    class Meta(UserSerializer.Meta):
+        extra_kwargs = {
+            'username': {'validators': [validate_username]},
+            'email': {'validators': []},
+        }
+
+
 class SignUpSerializers(serializers.Serializer):
     """
     Сериализатор для регистрации пользователя.
@@ -220,3 +265,16 @@ class TokenSerializer(serializers.Serializer):
         if not default_token_generator.check_token(user, confirmation_code):
             raise serializers.ValidationError('Неверный код подтверждения.')
         return data
+
+
+class JobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Сериализатор фоновых задач.
+    """
+
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'kind', 'status', 'total', 'processed', 'error',
+            'created', 'updated',
+        )
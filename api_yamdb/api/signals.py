@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import titles_changed, users_changed
+from .asgi import read_cache
+from .cache import invalidate_users
+from .catalog import bump_catalog_version, reset_slug_caches
+from .documents import refresh_documents, refresh_ratings
+from .events import publish_created
+from .snapshots import schedule_snapshots
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    # После коммита: иначе параллельный запрос успеет положить в кэш
+    # еще не измененную строку.
+    user_ids = (instance.pk,)
+    transaction.on_commit(lambda: invalidate_users(user_ids))
+
+
+@receiver(users_changed)
+def invalidate_changed_users(sender, user_ids, **kwargs):
+    invalidate_users(user_ids)
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_catalog(sender, instance, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+@receiver((post_save, post_delete), sender=Title)
+@receiver((post_save, post_delete), sender=Review)
+def refresh_snapshots(sender, instance, **kwargs):
+    schedule_snapshots(sender)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_title_snapshots(sender, action, **kwargs):
+    if action.startswith('post_'):
+        schedule_snapshots(Title)
+
+
+@receiver(titles_changed)
+def refresh_changed_titles_snapshots(sender, title_ids, **kwargs):
+    schedule_snapshots(Title)
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+@receiver((post_save, post_delete), sender=Title)
+@receiver((post_save, post_delete), sender=Review)
+@receiver((post_save, post_delete), sender=Comment)
+@receiver((post_save, post_delete), sender=User)
+def clear_read_cache(sender, **kwargs):
+    transaction.on_commit(read_cache.clear)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def clear_read_cache_on_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(read_cache.clear)
+
+
+@receiver(titles_changed)
+@receiver(users_changed)
+def clear_read_cache_on_bulk_changes(sender, **kwargs):
+    read_cache.clear()
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_document(sender, instance, **kwargs):
+    refresh_documents((instance.pk,))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_genre_documents(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            refresh_documents((instance.pk,))
+        elif action == 'post_clear':
+            refresh_documents(instance._affected_title_ids)
+        else:
+            refresh_documents(pk_set or ())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def refresh_catalog_documents(sender, instance, created, **kwargs):
+    if not created:
+        # Документы строятся по кэшу справочника: он должен видеть
+        # изменение уже сейчас, а не после коммита.
+        reset_slug_caches()
+        refresh_documents(
+            instance.title.values_list('id', flat=True), create=False
+        )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def refresh_uncataloged_documents(sender, instance, **kwargs):
+    reset_slug_caches()
+    refresh_documents(instance._affected_title_ids, create=False)
+
+
+@receiver(titles_changed)
+def refresh_changed_documents(sender, title_ids, **kwargs):
+    refresh_documents(title_ids, create=False)
+
+
+@receiver((post_save, post_delete), sender=Review)
+def refresh_review_rating(sender, instance, **kwargs):
+    refresh_ratings((instance.title_id,))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def publish_created_event(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_created(instance))
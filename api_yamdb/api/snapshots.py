@@ -0,0 +1,243 @@
+"""
+Готовые JSON-снимки публичных справочников.
+
+Ответы на анонимные GET-запросы к спискам категорий, жанров и топу
+произведений одинаковы для всех. Генератор рендерит их через обычные
+вью и записывает на диск вместе со сжатой копией, а SnapshotMiddleware
+отдает файлы без обращения к DRF и ORM. Сжатые копии пишутся для
+каждой поддерживаемой кодировки (api.compression).
+
+Файлы заменяются атомарно (запись во временный файл и os.replace),
+поэтому читатель никогда не увидит недописанный снимок.
+
+Изменения данных не перегенерируют снимки в запросе: имена устаревших
+снимков копятся и через DEBOUNCE_SECONDS после первого изменения
+перегенерируются фоновым потоком одним проходом (при
+BACKGROUND_JOBS_EAGER — сразу после коммита, для тестов). Каждый
+снимок помечается поколением — временем начала рендера; под
+блокировкой файла снимок не заменяется, если уже записано более новое
+поколение, поэтому опоздавший рендер (в том числе из другого
+процесса) не затрет свежий. Снимки, не перегенерированные до
+остановки процесса, обновит следующее изменение или команда
+generate_snapshots.
+"""
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.urls import resolve
+
+from reviews.models import Category, Genre, Review, Title
+from .compression import compress, negotiate, supported_encodings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATHS = {
+    '/api/v1/categories/': 'categories',
+    '/api/v1/genres/': 'genres',
+    '/api/v1/titles/top/': 'titles-top',
+}
+# Какие снимки устаревают при изменении модели.
+SNAPSHOT_SOURCES = {
+    Category: ('categories', 'titles-top'),
+    Genre: ('genres', 'titles-top'),
+    Title: ('titles-top',),
+    Review: ('titles-top',),
+}
+
+DEFAULTS = {
+    'ENABLED': False,
+    'DIR': Path(settings.BASE_DIR) / 'snapshots',
+    'BASE_URL': 'http://localhost:8000',
+    'DEBOUNCE_SECONDS': 1,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CATALOG_SNAPSHOTS', {})}
+
+
+SUFFIXES = {None: '.json', 'gzip': '.json.gz', 'br': '.json.br'}
+
+
+def snapshot_file(name, encoding=None):
+    return Path(get_config()['DIR']) / f'{name}{SUFFIXES[encoding]}'
+
+
+def write_atomic(path, content, durable=True):
+    """
+    Подменяет файл целиком; durable=False — без fsync, если файл
+    не нужен после сбоя машины.
+    """
+    descriptor, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f'.{path.name}.'
+    )
+    try:
+        with os.fdopen(descriptor, 'wb') as tmp_file:
+            tmp_file.write(content)
+            if durable:
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render(path):
+    """Рендерит ответ вью так, как его получил бы аноним."""
+    # django.test тянет тестовый клиент и шаблоны: не нужен при старте.
+    from django.test import RequestFactory
+
+    base_url = urlsplit(get_config()['BASE_URL'])
+    request = RequestFactory().get(
+        path,
+        HTTP_HOST=base_url.netloc,
+        secure=base_url.scheme == 'https',
+    )
+    match = resolve(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    response.render()
+    return response
+
+
+def generate_snapshots(names=None):
+    """Перегенерирует снимки (все или перечисленные по имени)."""
+    config = get_config()
+    Path(config['DIR']).mkdir(parents=True, exist_ok=True)
+    generated = []
+    for path, name in SNAPSHOT_PATHS.items():
+        if names is not None and name not in names:
+            continue
+        generation = time.time_ns()
+        response = render(path)
+        if response.status_code != 200:
+            publish_snapshot(name, generation, None)
+            continue
+        content = response.content
+        contents = {
+            encoding: compress(content, encoding)
+            for encoding in supported_encodings()
+        }
+        contents[None] = content
+        if publish_snapshot(name, generation, contents):
+            generated.append(name)
+    return generated
+
+
+def publish_snapshot(name, generation, contents):
+    """
+    Записывает (contents=None — удаляет) снимок, если не записано
+    поколение новее; возвращает, записан ли он.
+    """
+    directory = Path(get_config()['DIR'])
+    with open(directory / f'{name}.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        generation_file = directory / f'{name}.generation'
+        try:
+            written = int(generation_file.read_text())
+        except (FileNotFoundError, ValueError):
+            written = 0
+        if written >= generation:
+            return False
+        if contents is None:
+            remove_snapshot(name)
+        else:
+            # Несжатая копия — последней: по ней проверяется наличие.
+            for encoding, content in sorted(
+                contents.items(), key=lambda item: item[0] is None
+            ):
+                write_atomic(snapshot_file(name, encoding), content)
+        write_atomic(generation_file, str(generation).encode())
+        return contents is not None
+
+
+pending = set()
+pending_lock = threading.Lock()
+generation_lock = threading.Lock()
+timer = None
+
+
+def request_snapshots(names):
+    """Копит имена и запускает одну отложенную перегенерацию."""
+    global timer
+    with pending_lock:
+        pending.update(names)
+        if timer is not None:
+            return
+        timer = threading.Timer(
+            get_config()['DEBOUNCE_SECONDS'], run_pending
+        )
+        timer.daemon = True
+        timer.start()
+
+
+def run_pending():
+    global timer
+    with pending_lock:
+        names = set(pending)
+        pending.clear()
+        timer = None
+    close_old_connections()
+    try:
+        with generation_lock:
+            generate_snapshots(names)
+    except Exception:
+        logger.exception('Не удалось перегенерировать снимки %s', names)
+    finally:
+        close_old_connections()
+
+
+def schedule_snapshots(model):
+    """Перегенерирует снимки, зависящие от модели, после коммита."""
+    if not get_config()['ENABLED']:
+        return
+    names = SNAPSHOT_SOURCES[model]
+    if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        transaction.on_commit(lambda: generate_snapshots(names))
+    else:
+        transaction.on_commit(lambda: request_snapshots(names))
+
+
+def remove_snapshot(name):
+    for encoding in SUFFIXES:
+        try:
+            snapshot_file(name, encoding).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def get_snapshot_path(request):
+    """
+    Возвращает (путь к файлу, кодировка) для запроса, который можно
+    обслужить снимком, иначе None.
+    """
+    name = SNAPSHOT_PATHS.get(request.path)
+    if (
+        name is None
+        or request.method not in ('GET', 'HEAD')
+        or request.META.get('QUERY_STRING')
+        or 'HTTP_AUTHORIZATION' in request.META
+    ):
+        return None
+    base_url = urlsplit(get_config()['BASE_URL'])
+    if (request.scheme, request.get_host()) != (
+        base_url.scheme, base_url.netloc
+    ):
+        return None
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is not None:
+        path = snapshot_file(name, encoding)
+        if path.exists():
+            return path, encoding
+    path = snapshot_file(name)
+    if path.exists():
+        return path, None
+    return None
@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, SignUpView, TitleViewSet, TokenView,
-                       UserViewSet,)
+from api.views import (CategoryViewSet, ChangesView, CommentViewSet,
+                       ExportView, GenreViewSet, JobViewSet, ReviewViewSet,
+                       RevokeTokenView, SignUpView, TitleViewSet, TokenView,
+                       UserCommentViewSet, UserReviewViewSet, UserViewSet,)
 
 
 router = DefaultRouter()
@@ -11,6 +12,7 @@ router.register('titles', TitleViewSet, basename='titles')
 router.register('categories', CategoryViewSet, basename='categories')
 router.register('genres', GenreViewSet, basename='genres')
 router.register('users', UserViewSet, basename='users')
+router.register('jobs', JobViewSet, basename='jobs')
 router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -21,9 +23,22 @@ router.register(
     CommentViewSet,
     basename='comments'
 )
+router.register(
+    r'users/(?P<username>[^/.]+)/reviews',
+    UserReviewViewSet,
+    basename='user-reviews'
+)
+router.register(
+    r'users/(?P<username>[^/.]+)/comments',
+    UserCommentViewSet,
+    basename='user-comments'
+)
 
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', SignUpView.as_view(), name='signup'),
     path('v1/auth/token/', TokenView.as_view(), name='token'),
+    path('v1/auth/revoke/', RevokeTokenView.as_view(), name='revoke'),
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
+    path('v1/export/<str:kind>/', ExportView.as_view(), name='export'),
 ]
@@ -1,32 +1,51 @@
 from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions, filters, views, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import (
-    CreateModelMixin, DestroyModelMixin, ListModelMixin
+    CreateModelMixin, DestroyModelMixin, ListModelMixin, RetrieveModelMixin
 )
 from rest_framework.pagination import (
     LimitOffsetPagination, PageNumberPagination
 )
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title, User
+from api import consts
+from reviews import leaderboards
+from reviews.changes import get_floor
+from reviews.models import (
+    Category, Comment, Genre, Job, Review, Title, TitleDocument, User
+)
+from .bulk import CREATE, UPDATE, bulk_save_users
+from .cache import etag_matches, get_me_payload
+from .changes import read_changes
+from .documents import DocumentBatchMixin
+from .export import CONTENT_TYPE, GZIP, READERS, export, filename
 from .filters import TitleFilter
+from .jobs import submit_job
+from .pagination import HistoryPagination
 from .permissions import (
     IsModerOrAdminOrAuthorOrReadOnly,
     IsSuperUserOrAdminOnly,
     IsSuperUserOrAdminOrReadOnly
 )
+from .replicas import ReplicaReadMixin
+from .revocation import revoke_token, revoke_user_tokens
 from .serializers import (
-    CategorySerializer, CommentSerializer, GenreSerializer, MeSerializer,
+    CategorySerializer, CommentSerializer, GenreSerializer, JobSerializer,
+    MeSerializer,
     SignUpSerializers, TitleSerializer, TitleReadSerializer, TokenSerializer,
-    ReviewSerializer, UserSerializer
+    ReviewSerializer, UserCommentSerializer, UserSerializer
 )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Вьюсет для модели пользователя"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -43,20 +62,56 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,),
     )
     def me(self, request):
-        user = get_object_or_404(User, username=self.request.user.username)
-        serializer_class = self.get_serializer_class()
-        serializer = serializer_class(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        payload = get_me_payload(request.user, self.get_serializer_class())
+        if etag_matches(request, payload['etag']):
+            return self.me_response(payload, status.HTTP_304_NOT_MODIFIED)
+        return self.me_response(payload)
 
     @me.mapping.patch
     def me_patch(self, request):
-        user = get_object_or_404(User, username=self.request.user.username)
         serializer_class = self.get_serializer_class()
         serializer = serializer_class(
-            user, data=request.data, partial=True
+            request.user, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        return self.me_response(get_me_payload(request.user, serializer_class))
+
+    def me_response(self, payload, status_code=status.HTTP_200_OK):
+        response = Response(
+            payload['data'] if status_code == status.HTTP_200_OK else None,
+            status=status_code,
+            headers={
+                'ETag': payload['etag'],
+                'Cache-Control': 'private, no-cache',
+            },
+        )
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    @action(detail=True, methods=('post',), url_path='revoke-tokens')
+    def revoke_tokens(self, request, username=None):
+        """Отзывает все выданные пользователю токены."""
+        revoke_user_tokens(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_bulk_data(self):
+        if not isinstance(self.request.data, list):
+            raise ValidationError('Ожидается список пользователей.')
+        return self.request.data
+
+    @action(detail=False, methods=('post',))
+    def bulk(self, request):
+        """Массовое создание пользователей списком."""
+        created, _ = bulk_save_users(self.get_bulk_data(), CREATE)
+        serializer = self.get_serializer(created, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_patch(self, request):
+        """Массовое изменение пользователей (например, ролей)."""
+        _, updated = bulk_save_users(self.get_bulk_data(), UPDATE)
+        serializer = self.get_serializer(updated, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def get_serializer_class(self):
@@ -65,7 +120,8 @@ class UserViewSet(viewsets.ModelViewSet):
         return UserSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(DocumentBatchMixin, ReplicaReadMixin,
+                    viewsets.ModelViewSet):
     """
     Вьюсет для модели отзывов.
     """
@@ -79,31 +135,119 @@ class ReviewViewSet(viewsets.ModelViewSet):
             id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class UserHistoryViewSet(ReplicaReadMixin,
+                         viewsets.GenericViewSet,
+                         ListModelMixin):
+    """
+    Базовый вьюсет истории пользователя: его записи, новые первыми.
+    """
+    pagination_class = HistoryPagination
+
+    def get_queryset(self):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        return self.queryset.filter(author=author)
+
+
+class UserReviewViewSet(UserHistoryViewSet):
+    """
+    Вьюсет отзывов пользователя.
+    """
+    queryset = Review.objects.select_related('author')
+    serializer_class = ReviewSerializer
+
+
+class UserCommentViewSet(UserHistoryViewSet):
+    """
+    Вьюсет комментариев пользователя.
+    """
+    queryset = Comment.objects.select_related('author', 'review')
+    serializer_class = UserCommentSerializer
+
+
+class TitleViewSet(DocumentBatchMixin, ReplicaReadMixin,
+                   viewsets.ModelViewSet):
     """
     Вьюсет для модели произведений.
+
+    Список и карточка отдаются из готовых документов (api.documents).
     """
     queryset = (
-        Title.objects.annotate(rating=Avg('reviews__score')).order_by('rating')
+        Title.objects.annotate(rating=Avg('reviews__score'))
+        .select_related('category')
+        .prefetch_related('genre')
+        .order_by('rating')
     )
     permission_classes = (IsSuperUserOrAdminOrReadOnly,)
     http_method_names = ('get', 'post', 'patch', 'delete')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    replica_actions = ('list', 'retrieve', 'top', 'trending')
+
+    def list(self, request, *args, **kwargs):
+        documents = self.filter_queryset(
+            Title.objects.filter(document__isnull=False)
+        ).order_by('document__rating', 'id').values_list(
+            'document__data', flat=True
+        )
+        return self.get_paginated_response(
+            self.paginate_queryset(documents)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        document = get_object_or_404(TitleDocument, title_id=kwargs['pk'])
+        return Response(document.data)
+
+    def get_board(self):
+        """
+        Таблица лидеров из параметров запроса: общая или по slug
+        категории (?category=) либо жанра (?genre=).
+        """
+        category = self.request.query_params.get('category')
+        genre = self.request.query_params.get('genre')
+        if category and genre:
+            raise ValidationError(
+                'Укажите только один из параметров category и genre.'
+            )
+        if category:
+            return leaderboards.category_board(
+                get_object_or_404(Category, slug=category).id
+            )
+        if genre:
+            return leaderboards.genre_board(
+                get_object_or_404(Genre, slug=genre).id
+            )
+        return leaderboards.ALL
+
+    def leaderboard_response(self, order):
+        titles = leaderboards.read_board(
+            self.get_board(), order, consts.TOP_TITLES_LIMIT
+        )
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=('get',))
+    def top(self, request):
+        """Произведения с самым высоким рейтингом."""
+        return self.leaderboard_response('rating')
+
+    @action(detail=False, methods=('get',))
+    def trending(self, request):
+        """Произведения с самыми высокими недавними оценками."""
+        return self.leaderboard_response('trending')
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top', 'trending'):
             return TitleReadSerializer
         return TitleSerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     Вьюсет для модели комментариев.
     """
@@ -119,7 +263,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         return review
 
     def get_queryset(self):
-        return self.get_review().comment.all()
+        return self.get_review().comment.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
@@ -130,7 +274,8 @@ class CommentViewSet(viewsets.ModelViewSet):
         return permissions.IsAuthenticatedOrReadOnly(),
 
 
-class CategoryGenreBaseViewSet(viewsets.GenericViewSet,
+class CategoryGenreBaseViewSet(ReplicaReadMixin,
+                               viewsets.GenericViewSet,
                                ListModelMixin,
                                DestroyModelMixin,
                                CreateModelMixin):
@@ -139,6 +284,13 @@ class CategoryGenreBaseViewSet(viewsets.GenericViewSet,
     permission_classes = (IsSuperUserOrAdminOrReadOnly,)
     lookup_field = 'slug'
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['with_counts'] = (
+            self.request.query_params.get('with_counts') in ('1', 'true')
+        )
+        return context
+
 
 class CategoryViewSet(CategoryGenreBaseViewSet):
     """
@@ -147,6 +299,32 @@ class CategoryViewSet(CategoryGenreBaseViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    def destroy(self, request, *args, **kwargs):
+        """
+        При ?mode=async произведения отвязываются от категории пачками
+        в фоне, а ответ содержит задачу, которую можно опрашивать.
+        """
+        if request.query_params.get('mode') != 'async':
+            return super().destroy(request, *args, **kwargs)
+        category = self.get_object()
+        job = Job.objects.filter(
+            kind=Job.DELETE_CATEGORY,
+            status__in=(Job.PENDING, Job.RUNNING),
+            params__category_id=category.id,
+        ).first()
+        if job is None:
+            job = submit_job(
+                Job.DELETE_CATEGORY,
+                {'category_id': category.id, 'slug': category.slug},
+            )
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse(
+                'jobs-detail', args=(job.id,), request=request
+            )},
+        )
+
 
 class GenreViewSet(CategoryGenreBaseViewSet):
     """
@@ -157,6 +335,17 @@ class GenreViewSet(CategoryGenreBaseViewSet):
     pagination_class = LimitOffsetPagination
 
 
+class JobViewSet(viewsets.GenericViewSet,
+                 ListModelMixin,
+                 RetrieveModelMixin):
+    """
+    Вьюсет для опроса фоновых задач.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = (IsSuperUserOrAdminOnly,)
+
+
 class SignUpView(views.APIView):
     """
     Вьюсет для регистрация пользователя.
@@ -179,3 +368,70 @@ class TokenView(views.APIView):
         user = get_object_or_404(User, username=username)
         access_token = {'token': str(AccessToken.for_user(user))}
         return Response(access_token, status=status.HTTP_200_OK)
+
+
+class RevokeTokenView(views.APIView):
+    """
+    Вьюсет для отзыва текущего токена пользователя.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ChangesView(views.APIView):
+    """
+    Изменения произведений, категорий, жанров, отзывов и комментариев
+    после токена ?since= (без него — текущее состояние целиком).
+    """
+
+    def get(self, request):
+        since = request.query_params.get('since', '0')
+        if not since.isdecimal():
+            raise ValidationError(
+                {'since': 'Ожидается токен из предыдущего ответа.'}
+            )
+        since = int(since)
+        if 0 < since < get_floor():
+            return Response(
+                {'detail': 'Токен устарел, синхронизируйте данные заново '
+                           'без since.'},
+                status=status.HTTP_410_GONE,
+            )
+        changes, token, has_more = read_changes(since)
+        return Response({
+            'token': str(token), 'has_more': has_more, 'changes': changes,
+        })
+
+
+class ExportView(views.APIView):
+    """
+    Потоковая выгрузка произведений, отзывов или комментариев в NDJSON;
+    ?after=<id> продолжает выгрузку, ?compression=gzip сжимает ее.
+    Выгрузка таблиц целиком доступна только администраторам.
+    """
+    permission_classes = (IsSuperUserOrAdminOnly,)
+
+    def get(self, request, kind):
+        if kind not in READERS:
+            raise Http404
+        after = request.query_params.get('after', '0')
+        if not after.isdecimal():
+            raise ValidationError(
+                {'after': 'Ожидается id последней полученной строки.'}
+            )
+        compression = request.query_params.get('compression')
+        if compression not in (None, GZIP):
+            raise ValidationError(
+                {'compression': f'Поддерживается только {GZIP}.'}
+            )
+        response = StreamingHttpResponse(
+            export(kind, int(after), compression),
+            content_type='application/gzip' if compression else CONTENT_TYPE,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename(kind, compression)}"'
+        )
+        return response
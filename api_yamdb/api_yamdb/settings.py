@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -30,6 +31,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.capture.TrafficCaptureMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'api.querycheck.QueryDetectorMiddleware',
+    'api.middleware.SnapshotMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +76,47 @@ DATABASES = {
     }
 }
 
+# Профиль «SQLite в продакшене» (reviews.db): WAL, настроенные PRAGMA
+# при открытии соединения и постоянные соединения.
+# Включается переменной окружения YAMDB_SQLITE_PRODUCTION=1.
+SQLITE_PRODUCTION = os.getenv('YAMDB_SQLITE_PRODUCTION') == '1'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+if SQLITE_PRODUCTION:
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+
+# Реплики для чтения (api.replicas): list/retrieve вьюсетов читают
+# со случайной реплики, запись и чтение в течение
+# READ_YOUR_WRITES_SECONDS после записи пользователя — с основной базы.
+# YAMDB_REPLICAS — пути к файлам реплик SQLite через запятую; локально
+# их наполняет команда replicate_sqlite.
+DATABASE_REPLICAS = []
+for index, replica_name in enumerate(
+    filter(None, os.getenv('YAMDB_REPLICAS', '').split(',')), start=1
+):
+    alias = f'replica{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': replica_name}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.replicas.PrimaryReplicaRouter']
+READ_YOUR_WRITES_SECONDS = 5
+
+
+# Cache
+# Для нескольких процессов нужен общий бэкенд (например, Redis или
+# Memcached), иначе сброс кэша виден только в одном процессе.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 
 # Password validation
 
@@ -113,7 +160,17 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RevocableJWTAuthentication',
+    ],
+    # orjson, если установлен (api.renderers, api.parsers).
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -124,5 +181,79 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Готовые JSON-снимки публичных справочников (api.snapshots).
+# BASE_URL — адрес, под которым API видят клиенты: по нему строятся
+# ссылки пагинации внутри снимков. Изменения за DEBOUNCE_SECONDS
+# перегенерируются фоновым потоком одним проходом.
+CATALOG_SNAPSHOTS = {
+    'ENABLED': False,
+    'DIR': BASE_DIR / 'snapshots',
+    'BASE_URL': 'http://localhost:8000',
+    'DEBOUNCE_SECONDS': 1,
+}
+
+# Сжатие ответов (api.compression): ответы меньше MIN_SIZE байт
+# не сжимаются. Brotli используется, если установлен модуль brotli.
+COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Метрики запросов (api.metrics) на /metrics. При нескольких процессах
+# DIR (YAMDB_METRICS_DIR) — общий каталог, куда каждый процесс
+# сбрасывает свои метрики не реже раза в FLUSH_SECONDS. /metrics
+# доступен только с адресов ALLOWED_IPS (YAMDB_METRICS_ALLOWED_IPS
+# через запятую) — например, сборщика Prometheus.
+METRICS = {
+    'ENABLED': True,
+    'DIR': os.getenv('YAMDB_METRICS_DIR') or None,
+    'FLUSH_SECONDS': 5,
+    'ALLOWED_IPS': tuple(
+        os.getenv('YAMDB_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    ),
+}
+
+# Поиск N+1 и медленных запросов (api.querycheck), по умолчанию в DEBUG.
+QUERY_DETECTOR = {
+    'ENABLED': DEBUG,
+    'REPEATED_SELECTS': 3,
+    'SLOW_QUERY_MS': 200,
+}
+
+# Запись выборки трафика (api.capture) для replay_traffic: включается
+# путем к JSONL-файлу в YAMDB_CAPTURE_PATH. BODY = 'full' сохраняет тела
+# до MAX_BODY_BYTES, 'digest' — только их SHA-256 и размер.
+CAPTURE = {
+    'PATH': os.getenv('YAMDB_CAPTURE_PATH') or None,
+    'SAMPLE_RATE': float(os.getenv('YAMDB_CAPTURE_SAMPLE_RATE', '0.01')),
+    'BODY': os.getenv('YAMDB_CAPTURE_BODY', 'digest'),
+    'MAX_BODY_BYTES': 65536,
+    'QUEUE_SIZE': 10000,
+}
+
+# Асинхронный путь чтения под ASGI (api.asgi): размер пула потоков для
+# ORM и кэш готовых ответов на анонимные запросы в памяти процесса.
+ASYNC_READS = {
+    'WORKERS': 8,
+    'CACHE_SECONDS': 5,
+    'CACHE_MAX_ENTRIES': 1000,
+}
+
+# Поток событий о новых отзывах и комментариях (api.events) под ASGI.
+# DIR (YAMDB_EVENTS_DIR) — общий каталог unix-сокетов, через который
+# процессы пересылают друг другу события; без него события видны
+# только подписчикам процесса, где сделана запись.
+EVENTS = {
+    'DIR': os.getenv('YAMDB_EVENTS_DIR') or None,
+    'QUEUE_SIZE': 100,
+    'KEEPALIVE_SECONDS': 15,
+}
+
+# Как часто (в секундах) процесс подтягивает новые отозванные токены
+# и как часто перечитывает список целиком.
+TOKEN_REVOCATION_REFRESH_SECONDS = 5
+TOKEN_REVOCATION_FULL_RELOAD_SECONDS = 300
+
 AUTH_USER_MODEL = 'reviews.User'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
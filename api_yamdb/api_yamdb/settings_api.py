@@ -0,0 +1,41 @@
+"""
+Профиль рабочих процессов API.
+
+Процессы, которые обслуживают только /api/v1/ (JWT и JSON), не
+загружают админку, сессии, сообщения, статику, шаблоны и браузерный
+API DRF, а из промежуточных слоев оставляют только нужные API.
+Включается переменной окружения
+DJANGO_SETTINGS_MODULE=api_yamdb.settings_api. Админка и /redoc/
+остаются в профиле api_yamdb.settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+DEFERRED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+)
+DEFERRED_MIDDLEWARE = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEFERRED_APPS]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in DEFERRED_MIDDLEWARE
+]
+
+ROOT_URLCONF = 'api_yamdb.urls_api'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['api.renderers.FastJSONRenderer'],
+}
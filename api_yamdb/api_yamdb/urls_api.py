@@ -0,0 +1,11 @@
+"""
+URL-конфигурация профиля api_yamdb.settings_api: только API и метрики.
+"""
+from django.urls import include, path
+
+from api.metrics import metrics_view
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
+]
@@ -0,0 +1,16 @@
+"""
+URL-конфигурация для ASGI: те же маршруты, что в ROOT_URLCONF, но
+чтения обслуживают асинхронные вью (api.asgi).
+"""
+from importlib import import_module
+
+from django.conf import settings
+from django.urls import include, path
+
+from api.asgi import async_patterns
+from api.urls import router
+
+urlpatterns = [
+    path('api/v1/', include(async_patterns(router.urls))),
+    *import_module(settings.ROOT_URLCONF).urlpatterns,
+]
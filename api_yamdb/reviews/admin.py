@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import (User, Category, Genre, Title, Review, Comment)
+from .models import (
+    User, Category, Genre, Title, Review, Comment, RevokedToken, Job
+)
 
 admin.site.register(User)
 admin.site.register(Category)
@@ -7,3 +9,5 @@ admin.site.register(Genre)
 admin.site.register(Title)
 admin.site.register(Review)
 admin.site.register(Comment)
+admin.site.register(RevokedToken)
+admin.site.register(Job)
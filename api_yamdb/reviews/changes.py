@@ -0,0 +1,60 @@
+"""
+Журнал изменений для синхронизации клиентов.
+
+Каждое создание, изменение и удаление произведения, категории,
+жанра, отзыва и комментария добавляет в Change запись (модель, id,
+действие); изменения, меняющие представление произведения (отзывы,
+жанры, категория), добавляют и запись о нем. id записей растут,
+поэтому id последней полученной записи служит токеном: клиент
+запрашивает только то, что изменилось после него. SQLite пропускает
+одну пишущую транзакцию за раз, так что записи видны в порядке id.
+
+Сжатие (compact) удаляет записи, которые перекрыты более поздней
+записью о том же объекте, и удаления старше срока хранения. После
+этого токены меньше последнего убранного удаления устаревают: клиенту
+с таким токеном нужна полная синхронизация с нуля.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from api import consts
+from .models import Change, ChangeCompaction
+
+
+def record_changes(model, ids, action=Change.UPSERT):
+    Change.objects.bulk_create(
+        [
+            Change(model=model, object_id=pk, action=action)
+            for pk in dict.fromkeys(ids) if pk is not None
+        ],
+        batch_size=consts.BULK_BATCH_SIZE,
+    )
+
+
+def get_floor():
+    """Минимальный действительный токен."""
+    compaction = ChangeCompaction.objects.first()
+    return compaction.floor if compaction else 0
+
+
+def compact(retention_days=consts.CHANGES_RETENTION_DAYS):
+    """Сжимает журнал; возвращает запись о сжатии."""
+    later = Change.objects.filter(
+        model=OuterRef('model'),
+        object_id=OuterRef('object_id'),
+        id__gt=OuterRef('id'),
+    )
+    old_deletes = Change.objects.filter(
+        action=Change.DELETE,
+        created__lt=timezone.now() - timedelta(days=retention_days),
+    )
+    with transaction.atomic():
+        removed, _ = Change.objects.filter(Exists(later)).delete()
+        last_delete = old_deletes.aggregate(last=Max('id'))['last']
+        removed += old_deletes.filter(id__lte=last_delete or 0).delete()[0]
+        return ChangeCompaction.objects.create(
+            floor=max(get_floor(), last_delete or 0), removed=removed
+        )
@@ -0,0 +1,45 @@
+"""
+Счетчики произведений у категорий и жанров.
+
+Счетчики меняются на месте через F-выражения при создании и удалении
+произведения, смене его категории и изменении набора жанров,
+поэтому списки категорий и жанров не считают произведения запросом.
+"""
+from collections import Counter
+
+from django.db.models import Count, F
+
+from .models import Category, Genre
+
+
+def change_titles_count(model, ids, delta=1):
+    """
+    Меняет titles_count на delta для каждого вхождения id в ids.
+
+    ids может содержать повторы: для каждого объекта делается
+    один UPDATE со суммарным изменением.
+    """
+    for pk, times in Counter(pk for pk in ids if pk is not None).items():
+        queryset = model.objects.filter(pk=pk)
+        if delta < 0:
+            queryset = queryset.filter(titles_count__gte=-delta * times)
+        queryset.update(titles_count=F('titles_count') + delta * times)
+
+
+def find_titles_count_mismatches(model):
+    """Возвращает [(объект, сохраненное значение, фактическое)]."""
+    return [
+        (obj, obj.titles_count, obj.actual_count)
+        for obj in model.objects.annotate(actual_count=Count('title'))
+        if obj.titles_count != obj.actual_count
+    ]
+
+
+def fix_titles_count(mismatches):
+    for obj, _, actual in mismatches:
+        obj.titles_count = actual
+    objects = [obj for obj, _, _ in mismatches]
+    for model in (Category, Genre):
+        model_objects = [obj for obj in objects if isinstance(obj, model)]
+        if model_objects:
+            model.objects.bulk_update(model_objects, ('titles_count',))
@@ -0,0 +1,22 @@
+"""
+Настройка соединений SQLite.
+
+При включенном settings.SQLITE_PRODUCTION каждое новое соединение
+получает PRAGMA из settings.SQLITE_PRAGMAS: журнал WAL (читатели не
+блокируются писателем), synchronous=normal (в режиме WAL безопасно
+при сбое процесса), mmap, увеличенный кэш страниц и busy_timeout,
+чтобы конкурирующие записи ждали блокировку, а не падали сразу.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRODUCTION:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
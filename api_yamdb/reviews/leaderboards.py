@@ -0,0 +1,278 @@
+"""
+Таблицы лидеров произведений: лучшие по рейтингу и трендовые.
+
+TitleStats хранит число отзывов, сумму оценок и трендовый счет
+произведения, Leaderboard — по строке на каждую таблицу, в которую
+произведение входит: общую (ALL), своей категории и каждого своего
+жанра. Строки копируют рейтинг и трендовый счет и проиндексированы
+по (board, -rating) и (board, -trending), поэтому первые K мест
+любой таблицы читаются одним проходом индекса за O(K).
+
+Значения меняются на месте при записи отзывов, состав строк — при
+создании произведения, смене категории и изменении жанров (по
+аналогии с reviews.counters). Сверить и пересчитать все таблицы:
+manage.py rebuild_leaderboards.
+
+Трендовый счет — сумма оценок отзывов с экспоненциальным затуханием
+(период полураспада TRENDING_HALF_LIFE_DAYS). Чтобы не пересчитывать
+все произведения с течением времени, хранится логарифм суммы
+score * exp(λ * (t - EPOCH)) от фиксированной эпохи: порядок от
+текущего времени не зависит, и хранимые значения не устаревают.
+Вычитание в логарифмах теряет точность, когда убранный вклад
+составляет большую часть суммы (обычно это самый свежий отзыв), —
+тогда счет пересчитывается по отзывам произведения.
+"""
+import math
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import F
+
+from api import consts
+from .models import Leaderboard, Review, Title, TitleStats
+
+ALL = 'all'
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+DECAY = math.log(2) / (consts.TRENDING_HALF_LIFE_DAYS * 24 * 3600)
+# Наибольшая доля убираемого вклада, при которой тренд вычитается.
+MAX_SUBTRACTED_SHARE = 0.5
+
+
+def category_board(category_id):
+    return f'category:{category_id}'
+
+
+def genre_board(genre_id):
+    return f'genre:{genre_id}'
+
+
+def trend_term(score, pub_date):
+    """Логарифм вклада отзыва в трендовый счет."""
+    return math.log(score) + DECAY * (pub_date - EPOCH).total_seconds()
+
+
+def log_add(total, term):
+    if total is None:
+        return term
+    high, low = max(total, term), min(total, term)
+    return high + math.log1p(math.exp(low - high))
+
+
+def log_subtract(total, term):
+    if total is None or term >= total - 1e-9:
+        return None
+    return total + math.log1p(-math.exp(term - total))
+
+
+def average(score_sum, reviews_count):
+    return score_sum / reviews_count if reviews_count else None
+
+
+def title_trending(title_id):
+    """Трендовый счет произведения по его отзывам."""
+    trending = None
+    for score, pub_date in Review.objects.filter(
+        title_id=title_id
+    ).values_list('score', 'pub_date').iterator():
+        trending = log_add(trending, trend_term(score, pub_date))
+    return trending
+
+
+def change_title_reviews(title_id, count_delta, score_delta,
+                         added=None, removed=None):
+    """
+    Учитывает изменение отзывов произведения: count_delta и
+    score_delta — изменения числа отзывов и суммы оценок, added и
+    removed — (score, pub_date) добавленного и убранного вклада в
+    трендовый счет. Вызывается после записи отзыва.
+    """
+    with transaction.atomic():
+        # UPDATE первым: блокирует строку (в SQLite — базу) до чтения.
+        updated = TitleStats.objects.filter(title_id=title_id).update(
+            reviews_count=F('reviews_count') + count_delta,
+            score_sum=F('score_sum') + score_delta,
+        )
+        if not updated:
+            # Произведение удаляется вместе с отзывами.
+            return
+        stats = TitleStats.objects.get(title_id=title_id)
+        trending = stats.trending
+        removed_term = None if removed is None else trend_term(*removed)
+        if removed_term is not None and (
+            trending is None
+            or removed_term > trending + math.log(MAX_SUBTRACTED_SHARE)
+        ):
+            # Отзыв уже записан, поэтому added учтен в отзывах.
+            trending = title_trending(title_id)
+        else:
+            if removed_term is not None:
+                trending = log_subtract(trending, removed_term)
+            if added is not None:
+                trending = log_add(trending, trend_term(*added))
+        if stats.reviews_count == 0:
+            trending = None
+        TitleStats.objects.filter(title_id=title_id).update(
+            trending=trending
+        )
+        Leaderboard.objects.filter(title_id=title_id).update(
+            rating=average(stats.score_sum, stats.reviews_count),
+            trending=trending,
+        )
+
+
+def title_boards(category_id, genre_ids):
+    boards = {ALL, *map(genre_board, genre_ids)}
+    if category_id is not None:
+        boards.add(category_board(category_id))
+    return boards
+
+
+def sync_title_boards(title_ids):
+    """
+    Приводит набор строк таблиц лидеров произведений к их текущим
+    категории и жанрам; создает недостающие TitleStats.
+    """
+    title_ids = set(title_ids)
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    existing = {}
+    for title_id, board in Leaderboard.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', 'board'):
+        existing.setdefault(title_id, set()).add(board)
+    stats = TitleStats.objects.in_bulk(title_ids)
+    missing_stats = []
+    stale = []
+    created = []
+    for title_id, category_id in Title.objects.filter(
+        id__in=title_ids
+    ).values_list('id', 'category_id'):
+        if title_id not in stats:
+            stats[title_id] = TitleStats(title_id=title_id)
+            missing_stats.append(stats[title_id])
+        boards = title_boards(category_id, genres.get(title_id, ()))
+        current = existing.get(title_id, set())
+        stale += [(title_id, board) for board in current - boards]
+        created += [
+            Leaderboard(
+                board=board, title_id=title_id,
+                rating=average(
+                    stats[title_id].score_sum, stats[title_id].reviews_count
+                ),
+                trending=stats[title_id].trending,
+            )
+            for board in boards - current
+        ]
+    TitleStats.objects.bulk_create(missing_stats, ignore_conflicts=True)
+    for title_id, board in stale:
+        Leaderboard.objects.filter(title_id=title_id, board=board).delete()
+    Leaderboard.objects.bulk_create(created, ignore_conflicts=True)
+
+
+def add_to_boards(title_ids, boards):
+    """Добавляет произведения в таблицы boards с текущими значениями."""
+    stats = TitleStats.objects.in_bulk(title_ids)
+    Leaderboard.objects.bulk_create(
+        [
+            Leaderboard(
+                board=board, title_id=title_id,
+                rating=average(
+                    stats[title_id].score_sum, stats[title_id].reviews_count
+                ),
+                trending=stats[title_id].trending,
+            )
+            for title_id in title_ids if title_id in stats
+            for board in boards
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def remove_from_boards(title_ids, boards):
+    Leaderboard.objects.filter(
+        title_id__in=title_ids, board__in=boards
+    ).delete()
+
+
+def drop_board(board):
+    Leaderboard.objects.filter(board=board).delete()
+
+
+def drop_genre_boards(title_id):
+    Leaderboard.objects.filter(
+        title_id=title_id, board__startswith=genre_board('')
+    ).delete()
+
+
+def read_board(board, order, limit):
+    """
+    Первые limit произведений таблицы board по order ('rating' или
+    'trending') с категориями и жанрами; rating
+    проставлен из таблицы.
+    """
+    entries = (
+        Leaderboard.objects
+        .filter(board=board, **{f'{order}__isnull': False})
+        .order_by(f'-{order}', 'title_id')
+        .select_related('title__category')
+        .prefetch_related('title__genre')[:limit]
+    )
+    titles = []
+    for entry in entries:
+        title = entry.title
+        title.rating = entry.rating
+        titles.append(title)
+    return titles
+
+
+def compute_stats():
+    """Фактические {id произведения: [отзывы, сумма оценок, тренд]}."""
+    actual = {
+        title_id: [0, 0, None]
+        for title_id in Title.objects.values_list('id', flat=True).iterator()
+    }
+    reviews = Review.objects.values_list('title_id', 'score', 'pub_date')
+    for title_id, score, pub_date in reviews.iterator():
+        stats = actual[title_id]
+        stats[0] += 1
+        stats[1] += score
+        stats[2] = log_add(stats[2], trend_term(score, pub_date))
+    return actual
+
+
+def rebuild_leaderboards(batch_size=500):
+    """
+    Пересчитывает TitleStats по отзывам и заново строит таблицы
+    лидеров. Возвращает id произведений с расхождениями.
+    """
+    actual = compute_stats()
+    stored = TitleStats.objects.in_bulk()
+    changed = []
+    rows = []
+    for title_id, (count, score_sum, trending) in actual.items():
+        stats = stored.get(title_id)
+        if stats is None or (stats.reviews_count, stats.score_sum) != (
+            count, score_sum
+        ) or not same_trending(stats.trending, trending):
+            changed.append(title_id)
+        rows.append(TitleStats(
+            title_id=title_id, reviews_count=count, score_sum=score_sum,
+            trending=trending,
+        ))
+    with transaction.atomic():
+        TitleStats.objects.all().delete()
+        Leaderboard.objects.all().delete()
+        TitleStats.objects.bulk_create(rows, batch_size=batch_size)
+        title_ids = list(actual)
+        for start in range(0, len(title_ids), batch_size):
+            sync_title_boards(title_ids[start:start + batch_size])
+    return changed
+
+
+def same_trending(stored, actual):
+    if stored is None or actual is None:
+        return stored is actual
+    return math.isclose(stored, actual, rel_tol=1e-9)
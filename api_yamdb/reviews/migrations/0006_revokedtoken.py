@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-19 07:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(blank=True, db_index=True, max_length=255, verbose_name='Идентификатор токена')),
+                ('not_before', models.DateTimeField(blank=True, null=True, verbose_name='Токены, выданные раньше, недействительны')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Запись нужна до')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата отзыва')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='revoked_tokens', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Отозванный токен',
+                'verbose_name_plural': 'Отозванные токены',
+                'ordering': ('id',),
+            },
+        ),
+    ]
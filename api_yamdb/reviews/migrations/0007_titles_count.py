@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-19 07:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_titles_count(apps, schema_editor):
+    for model_name in ('Category', 'Genre'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.annotate(actual_count=Count('title')))
+        for obj in objects:
+            obj.titles_count = obj.actual_count
+        model.objects.bulk_update(objects, ('titles_count',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='titles_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество произведений'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='titles_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество произведений'),
+        ),
+        migrations.RunPython(fill_titles_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 3.2 on 2026-10-19 08:44
+
+import math
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Копии вспомогательных функций reviews.leaderboards на момент
+# миграции: их изменение не должно менять историческую миграцию.
+ALL = 'all'
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+DECAY = math.log(2) / (7 * 24 * 3600)
+
+
+def trend_term(score, pub_date):
+    return math.log(score) + DECAY * (pub_date - EPOCH).total_seconds()
+
+
+def log_add(total, term):
+    if total is None:
+        return term
+    high, low = max(total, term), min(total, term)
+    return high + math.log1p(math.exp(low - high))
+
+
+def average(score_sum, reviews_count):
+    return score_sum / reviews_count if reviews_count else None
+
+
+def title_boards(category_id, genre_ids):
+    boards = {ALL, *(f'genre:{genre_id}' for genre_id in genre_ids)}
+    if category_id is not None:
+        boards.add(f'category:{category_id}')
+    return boards
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    Leaderboard = apps.get_model('reviews', 'Leaderboard')
+    stats = {
+        title_id: TitleStats(title_id=title_id)
+        for title_id in Title.objects.values_list('id', flat=True)
+    }
+    for title_id, score, pub_date in Review.objects.values_list(
+        'title_id', 'score', 'pub_date'
+    ).iterator():
+        title_stats = stats[title_id]
+        title_stats.reviews_count += 1
+        title_stats.score_sum += score
+        title_stats.trending = log_add(
+            title_stats.trending, trend_term(score, pub_date)
+        )
+    TitleStats.objects.bulk_create(stats.values(), batch_size=500)
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        'title_id', 'genre_id'
+    ):
+        genres.setdefault(title_id, []).append(genre_id)
+    Leaderboard.objects.bulk_create(
+        (
+            Leaderboard(
+                board=board, title_id=title_id,
+                rating=average(
+                    stats[title_id].score_sum, stats[title_id].reviews_count
+                ),
+                trending=stats[title_id].trending,
+            )
+            for title_id, category_id in Title.objects.values_list(
+                'id', 'category_id'
+            )
+            for board in title_boards(category_id, genres.get(title_id, ()))
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Число отзывов')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('trending', models.FloatField(null=True, verbose_name='Трендовый счет (логарифм)')),
+            ],
+            options={
+                'verbose_name': 'Агрегаты произведения',
+                'verbose_name_plural': 'Агрегаты произведений',
+            },
+        ),
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=30, verbose_name='Таблица')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('trending', models.FloatField(null=True, verbose_name='Трендовый счет (логарифм)')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboards', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Строка таблицы лидеров',
+                'verbose_name_plural': 'Таблицы лидеров',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['board', '-rating', 'title'], name='leaderboard_rating'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['board', '-trending', 'title'], name='leaderboard_trending'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('board', 'title'), name='unique_leaderboard_title'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 3.2 on 2026-10-19 08:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+BATCH_SIZE = 500
+
+
+def title_data(title, rating):
+    # Копия ответа TitleReadSerializer на момент миграции: текущий
+    # сериализатор может ссылаться на поля, которых в этой схеме еще
+    # нет. Позже документы перестраивает rebuild_title_documents.
+    category = title.category
+    return {
+        'id': title.id,
+        'category': category and {
+            'name': category.name, 'slug': category.slug,
+        },
+        'genre': [
+            {'name': genre.name, 'slug': genre.slug}
+            for genre in title.genre.all()
+        ],
+        'rating': None if rating is None else int(rating),
+        'name': title.name,
+        'year': title.year,
+        'description': title.description,
+    }
+
+
+def fill_title_documents(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    TitleDocument = apps.get_model('reviews', 'TitleDocument')
+    title_ids = list(Title.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(title_ids), BATCH_SIZE):
+        chunk = title_ids[start:start + BATCH_SIZE]
+        stats = TitleStats.objects.in_bulk(chunk)
+        documents = []
+        for title in Title.objects.filter(id__in=chunk).select_related(
+            'category'
+        ).prefetch_related('genre'):
+            title_stats = stats.get(title.id)
+            rating = (
+                title_stats.score_sum / title_stats.reviews_count
+                if title_stats and title_stats.reviews_count else None
+            )
+            documents.append(TitleDocument(
+                title_id=title.id, rating=rating,
+                data=title_data(title, rating),
+            ))
+        TitleDocument.objects.bulk_create(documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_author_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleDocument',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('data', models.JSONField(verbose_name='Документ')),
+            ],
+            options={
+                'verbose_name': 'Документ произведения',
+                'verbose_name_plural': 'Документы произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titledocument',
+            index=models.Index(fields=['rating', 'title'], name='title_document_rating'),
+        ),
+        migrations.RunPython(fill_title_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 3.2 on 2026-10-19 08:55
+
+from django.db import migrations, models
+
+LOGGED_MODELS = {
+    'title': 'Title',
+    'category': 'Category',
+    'genre': 'Genre',
+    'review': 'Review',
+    'comment': 'Comment',
+}
+
+
+def fill_change_log(apps, schema_editor):
+    # Клиент без токена должен получить текущее состояние целиком.
+    Change = apps.get_model('reviews', 'Change')
+    for name, model_name in LOGGED_MODELS.items():
+        model = apps.get_model('reviews', model_name)
+        ids = model.objects.order_by('id').values_list('id', flat=True)
+        batch = []
+        for pk in ids.iterator():
+            batch.append(Change(model=name, object_id=pk, action='upsert'))
+            if len(batch) == 500:
+                Change.objects.bulk_create(batch)
+                batch = []
+        Change.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_documents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('title', 'Произведение'), ('category', 'Категория'), ('genre', 'Жанр'), ('review', 'Отзыв'), ('comment', 'Комментарий')], max_length=10, verbose_name='Модель')),
+                ('object_id', models.PositiveIntegerField(verbose_name='id объекта')),
+                ('action', models.CharField(choices=[('upsert', 'Создание или изменение'), ('delete', 'Удаление')], max_length=10, verbose_name='Действие')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Время')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeCompaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('floor', models.BigIntegerField(default=0, verbose_name='Минимальный токен')),
+                ('removed', models.PositiveIntegerField(default=0, verbose_name='Удалено записей')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Выполнено')),
+            ],
+            options={
+                'verbose_name': 'Сжатие журнала изменений',
+                'verbose_name_plural': 'Сжатия журнала изменений',
+                'ordering': ('-id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['model', 'object_id', 'id'], name='change_object'),
+        ),
+        migrations.RunPython(fill_change_log, migrations.RunPython.noop),
+    ]
@@ -64,6 +64,7 @@ class Category(models.Model):
 
     Описывает категории(типы) произведений.
     Все поля обязательные.
+    Поле titles_count поддерживается автоматически (reviews.counters).
     """
 
     name = models.CharField('Название категории', max_length=256)
@@ -73,6 +74,9 @@ class Category(models.Model):
         unique=True,
         validators=[validate_slug],
     )
+    titles_count = models.PositiveIntegerField(
+        'Количество произведений', default=0, editable=False
+    )
 
     class Meta:
         verbose_name = 'Категория'
@@ -89,6 +93,7 @@ class Genre(models.Model):
 
     Описывает категории жанров.
     Все поля обязательные.
+    Поле titles_count поддерживается автоматически (reviews.counters).
     """
 
     name = models.CharField('Название жанра', max_length=consts.NAME_LENGTH)
@@ -98,6 +103,9 @@ class Genre(models.Model):
         unique=True,
         validators=[validate_slug],
     )
+    titles_count = models.PositiveIntegerField(
+        'Количество произведений', default=0, editable=False
+    )
 
     class Meta:
         verbose_name = 'Жанр'
@@ -194,6 +202,12 @@ class Review(models.Model):
                 fields=('author', 'title'), name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='review_author_pub_date',
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -231,6 +245,268 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='comment_author_pub_date',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:20]
+
+
+class TitleStats(models.Model):
+    """
+    Модель агрегатов отзывов произведения.
+
+    Число отзывов, сумма оценок и трендовый счет поддерживаются
+    автоматически (reviews.leaderboards).
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение',
+    )
+    reviews_count = models.PositiveIntegerField('Число отзывов', default=0)
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    trending = models.FloatField('Трендовый счет (логарифм)', null=True)
+
+    class Meta:
+        verbose_name = 'Агрегаты произведения'
+        verbose_name_plural = 'Агрегаты произведений'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.reviews_count}'
+
+
+class TitleDocument(models.Model):
+    """
+    Модель готового представления произведения для чтения.
+
+    Хранит ответ API на запрос произведения и его рейтинг для
+    сортировки; перестраивается автоматически (api.documents).
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='document',
+        verbose_name='Произведение',
+    )
+    rating = models.FloatField('Рейтинг', null=True)
+    data = models.JSONField('Документ')
+
+    class Meta:
+        verbose_name = 'Документ произведения'
+        verbose_name_plural = 'Документы произведений'
+        indexes = [
+            models.Index(
+                fields=('rating', 'title'), name='title_document_rating'
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.title_id)
+
+
+class Leaderboard(models.Model):
+    """
+    Модель строки таблицы лидеров.
+
+    Произведение входит в общую таблицу, таблицу своей категории и
+    таблицы своих жанров; рейтинг и трендовый счет копируются из
+    TitleStats (reviews.leaderboards).
+    """
+
+    board = models.CharField(
+        'Таблица', max_length=consts.LEADERBOARD_KEY_LENGTH
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboards',
+        verbose_name='Произведение',
+    )
+    rating = models.FloatField('Рейтинг', null=True)
+    trending = models.FloatField('Трендовый счет (логарифм)', null=True)
+
+    class Meta:
+        verbose_name = 'Строка таблицы лидеров'
+        verbose_name_plural = 'Таблицы лидеров'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('board', 'title'), name='unique_leaderboard_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=('board', '-rating', 'title'),
+                name='leaderboard_rating',
+            ),
+            models.Index(
+                fields=('board', '-trending', 'title'),
+                name='leaderboard_trending',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.board}: {self.title_id}'
+
+
+class RevokedToken(models.Model):
+    """
+    Модель отозванных токенов.
+
+    Отзывает либо один токен по его jti,
+    либо все токены пользователя, выданные раньше not_before.
+    """
+
+    jti = models.CharField(
+        'Идентификатор токена', max_length=255, blank=True, db_index=True
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='revoked_tokens',
+        verbose_name='Пользователь',
+        null=True,
+        blank=True,
+    )
+    not_before = models.DateTimeField(
+        'Токены, выданные раньше, недействительны', null=True, blank=True
+    )
+    expires_at = models.DateTimeField('Запись нужна до', db_index=True)
+    created = models.DateTimeField('Дата отзыва', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Отозванный токен'
+        verbose_name_plural = 'Отозванные токены'
+        ordering = ('id',)
+
+    def __str__(self):
+        return self.jti or f'{self.user_id} < {self.not_before}'
+
+
+class Job(models.Model):
+    """
+    Модель фоновой задачи.
+
+    Хранит параметры и прогресс долгой операции,
+    которую HTTP-запрос запускает и не дожидается.
+    """
+
+    DELETE_CATEGORY = 'delete_category'
+    KINDS = [
+        (DELETE_CATEGORY, 'Удаление категории'),
+    ]
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершена'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    kind = models.CharField(
+        'Тип', max_length=consts.JOB_FIELD_LENGTH, choices=KINDS
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=consts.JOB_FIELD_LENGTH,
+        choices=STATUSES,
+        default=PENDING,
+        db_index=True,
+    )
+    params = models.JSONField('Параметры', default=dict)
+    total = models.PositiveIntegerField('Всего объектов', default=0)
+    processed = models.PositiveIntegerField('Обработано объектов', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    updated = models.DateTimeField('Обновлена', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('-id',)
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}: {self.status}'
+
+
+class Change(models.Model):
+    """
+    Модель записи журнала изменений.
+
+    id записи — токен синхронизации: клиент запрашивает изменения
+    после последнего полученного id (reviews.changes).
+    """
+
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    ACTIONS = [
+        (UPSERT, 'Создание или изменение'),
+        (DELETE, 'Удаление'),
+    ]
+    TITLE = 'title'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    MODELS = [
+        (TITLE, 'Произведение'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+        (REVIEW, 'Отзыв'),
+        (COMMENT, 'Комментарий'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(
+        'Модель', max_length=consts.CHANGE_FIELD_LENGTH, choices=MODELS
+    )
+    object_id = models.PositiveIntegerField('id объекта')
+    action = models.CharField(
+        'Действие', max_length=consts.CHANGE_FIELD_LENGTH, choices=ACTIONS
+    )
+    created = models.DateTimeField('Время', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=('model', 'object_id', 'id'), name='change_object'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.id}: {self.action} {self.model} {self.object_id}'
+
+
+class ChangeCompaction(models.Model):
+    """
+    Модель запуска сжатия журнала изменений.
+
+    Токены меньше floor устарели: удаления до них из журнала убраны.
+    """
+
+    floor = models.BigIntegerField('Минимальный токен', default=0)
+    removed = models.PositiveIntegerField('Удалено записей', default=0)
+    created = models.DateTimeField('Выполнено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Сжатие журнала изменений'
+        verbose_name_plural = 'Сжатия журнала изменений'
+        ordering = ('-id',)
+
+    def __str__(self):
+        return f'{self.created}: {self.removed}'
@@ -0,0 +1,225 @@
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import Signal, receiver
+
+from . import leaderboards
+from .changes import record_changes
+from .counters import change_titles_count
+from .models import Category, Change, Comment, Genre, Review, Title
+
+# Отправляется после массовых операций над пользователями
+# (bulk_create/bulk_update не вызывают post_save).
+# Аргументы: user_ids — множество id затронутых пользователей.
+users_changed = Signal()
+
+# Отправляется после массовых изменений произведений через
+# QuerySet.update (например, при пакетном удалении категории).
+# Аргументы: title_ids — id затронутых произведений.
+titles_changed = Signal()
+
+
+@receiver(post_init, sender=Title)
+def remember_title_category(sender, instance, **kwargs):
+    # Через __dict__, чтобы не загружать отложенное поле.
+    instance._saved_category_id = instance.__dict__.get('category_id')
+
+
+# Подключен раньше count_title_category, которая обновляет
+# _saved_category_id.
+@receiver(post_save, sender=Title)
+def sync_title_leaderboards(sender, instance, created, **kwargs):
+    if created:
+        leaderboards.sync_title_boards((instance.pk,))
+    elif instance._saved_category_id != instance.category_id:
+        if instance._saved_category_id is not None:
+            leaderboards.remove_from_boards(
+                (instance.pk,),
+                (leaderboards.category_board(instance._saved_category_id),),
+            )
+        if instance.category_id is not None:
+            leaderboards.add_to_boards(
+                (instance.pk,),
+                (leaderboards.category_board(instance.category_id),),
+            )
+
+
+@receiver(post_save, sender=Title)
+def count_title_category(sender, instance, created, **kwargs):
+    old_category_id = None if created else instance._saved_category_id
+    if old_category_id != instance.category_id:
+        change_titles_count(Category, (old_category_id,), -1)
+        change_titles_count(Category, (instance.category_id,), 1)
+    instance._saved_category_id = instance.category_id
+
+
+@receiver(pre_delete, sender=Title)
+def remember_title_genres(sender, instance, **kwargs):
+    instance._deleted_genre_ids = list(
+        instance.genre.values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Title)
+def uncount_deleted_title(sender, instance, **kwargs):
+    change_titles_count(Category, (instance.category_id,), -1)
+    change_titles_count(Genre, getattr(instance, '_deleted_genre_ids', ()), -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def count_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        links = sender.objects.filter(
+            **{'genre' if reverse else 'title': instance}
+        )
+        if action == 'pre_remove':
+            links = links.filter(
+                **{'title__in' if reverse else 'genre__in': pk_set}
+            )
+        instance._removed_links = list(
+            links.values_list('title_id', 'genre_id')
+        )
+        return
+    if action == 'post_add' and pk_set:
+        if reverse:
+            change_titles_count(Genre, [instance.pk] * len(pk_set), 1)
+        else:
+            change_titles_count(Genre, pk_set, 1)
+    elif action in ('post_remove', 'post_clear'):
+        removed = getattr(instance, '_removed_links', ())
+        change_titles_count(Genre, [genre_id for _, genre_id in removed], -1)
+        instance._removed_links = ()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def sync_genre_leaderboards(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action == 'post_clear':
+        if reverse:
+            leaderboards.drop_board(leaderboards.genre_board(instance.pk))
+        else:
+            leaderboards.drop_genre_boards(instance.pk)
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    if reverse:
+        title_ids, boards = pk_set, (leaderboards.genre_board(instance.pk),)
+    else:
+        title_ids = (instance.pk,)
+        boards = [leaderboards.genre_board(pk) for pk in pk_set]
+    if action == 'post_add':
+        leaderboards.add_to_boards(title_ids, boards)
+    else:
+        leaderboards.remove_from_boards(title_ids, boards)
+
+
+@receiver(titles_changed)
+def sync_changed_titles_leaderboards(sender, title_ids, **kwargs):
+    leaderboards.sync_title_boards(title_ids)
+
+
+@receiver(post_delete, sender=Category)
+def drop_category_leaderboard(sender, instance, **kwargs):
+    leaderboards.drop_board(leaderboards.category_board(instance.pk))
+
+
+@receiver(post_delete, sender=Genre)
+def drop_genre_leaderboard(sender, instance, **kwargs):
+    # Связи с произведениями удаляются каскадом без m2m_changed.
+    leaderboards.drop_board(leaderboards.genre_board(instance.pk))
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    instance._saved_score = instance.__dict__.get('score')
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, **kwargs):
+    old_score = None if created else instance._saved_score
+    if old_score != instance.score:
+        leaderboards.change_title_reviews(
+            instance.title_id,
+            count_delta=1 if created else 0,
+            score_delta=instance.score - (old_score or 0),
+            added=(instance.score, instance.pub_date),
+            removed=None if created else (old_score, instance.pub_date),
+        )
+    instance._saved_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def uncount_deleted_review(sender, instance, **kwargs):
+    leaderboards.change_title_reviews(
+        instance.title_id, count_delta=-1, score_delta=-instance.score,
+        removed=(instance.score, instance.pub_date),
+    )
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def remember_catalog_titles(sender, instance, **kwargs):
+    # Произведения теряют категорию или жанр без сигналов Title.
+    instance._affected_title_ids = list(
+        instance.title.values_list('id', flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def remember_cleared_titles(sender, instance, action, reverse, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._affected_title_ids = list(
+            instance.title.values_list('id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def log_saved(sender, instance, **kwargs):
+    record_changes(sender._meta.model_name, (instance.pk,))
+    if sender is Review:
+        record_changes(Change.TITLE, (instance.title_id,))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def log_deleted(sender, instance, **kwargs):
+    record_changes(sender._meta.model_name, (instance.pk,), Change.DELETE)
+    if sender is Review:
+        record_changes(Change.TITLE, (instance.title_id,))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def log_saved_catalog(sender, instance, created, **kwargs):
+    record_changes(sender._meta.model_name, (instance.pk,))
+    if not created:
+        record_changes(
+            Change.TITLE, instance.title.values_list('id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def log_deleted_catalog(sender, instance, **kwargs):
+    record_changes(sender._meta.model_name, (instance.pk,), Change.DELETE)
+    record_changes(Change.TITLE, instance._affected_title_ids)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        record_changes(Change.TITLE, (instance.pk,))
+    elif action == 'post_clear':
+        record_changes(Change.TITLE, instance._affected_title_ids)
+    else:
+        record_changes(Change.TITLE, pk_set or ())
+
+
+@receiver(titles_changed)
+def log_changed_titles(sender, title_ids, **kwargs):
+    record_changes(Change.TITLE, title_ids)
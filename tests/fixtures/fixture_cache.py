@@ -0,0 +1,18 @@
+import pytest
+from django.core.cache import cache
+
+from api.catalog import reset_slug_caches
+from api.revocation import revocation_list
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # База очищается между тестами без сигналов, а id объектов
+    # переиспользуются: кэши не должны переживать тест.
+    cache.clear()
+    reset_slug_caches()
+    revocation_list.reset()
+    yield
+    cache.clear()
+    reset_slug_caches()
+    revocation_list.reset()
@@ -0,0 +1,26 @@
+import pytest
+
+from api import querycheck
+
+
+@pytest.fixture(autouse=True)
+def query_detector(request, settings):
+    """
+    Проваливает тест, если в каком-либо запросе к API найдены N+1
+    или медленные запросы. Отключается маркером allow_repeated_queries.
+    """
+    settings.QUERY_DETECTOR = {
+        **querycheck.get_config(), 'ENABLED': True,
+    }
+    querycheck.reported.clear()
+    yield
+    issues = list(querycheck.reported)
+    querycheck.reported.clear()
+    if issues and not request.node.get_closest_marker(
+        'allow_repeated_queries'
+    ):
+        pytest.fail(
+            'Найдены N+1 или медленные запросы:\n'
+            + '\n'.join(map(querycheck.format_issue, issues)),
+            pytrace=False,
+        )
@@ -0,0 +1,127 @@
+import os
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.signals import users_changed
+from tests.conftest import MANAGE_PATH
+
+USERS_CSV = os.path.join(MANAGE_PATH, 'static', 'data', 'users.csv')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08BulkUsersAPI:
+
+    BULK_URL = '/api/v1/users/bulk/'
+
+    def test_01_bulk_not_admin(self, client, user_client, moderator_client):
+        data = [{'username': 'bulk_user', 'email': 'bulk@yamdb.fake'}]
+        response = client.post(
+            self.BULK_URL, data=data, content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что POST-запрос к `{self.BULK_URL}` без токена '
+            'возвращает ответ со статусом 401.'
+        )
+        for role_client in (user_client, moderator_client):
+            response = role_client.post(
+                self.BULK_URL, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что POST-запрос к `{self.BULK_URL}` доступен '
+                'только администратору.'
+            )
+
+    def test_02_bulk_create(self, admin_client, django_user_model):
+        data = [
+            {'username': f'bulk_{idx}', 'email': f'bulk_{idx}@yamdb.fake'}
+            for idx in range(20)
+        ]
+        data[3]['role'] = 'moderator'
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                self.BULK_URL, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Если POST-запрос администратора к `{self.BULK_URL}` содержит '
+            'корректные данные - должен вернуться ответ со статусом 201.'
+        )
+        assert len(response.json()) == len(data)
+        assert django_user_model.objects.filter(
+            username__startswith='bulk_'
+        ).count() == len(data)
+        assert django_user_model.objects.get(username='bulk_3').is_moderator
+        assert len(queries) < len(data), (
+            'Проверьте, что пользователи создаются пачкой, а не отдельным '
+            'запросом на каждого.'
+        )
+
+    def test_03_bulk_create_conflicts(self, admin_client, admin,
+                                      django_user_model):
+        users_count = django_user_model.objects.count()
+        data = [
+            {'username': 'new_user', 'email': 'new_user@yamdb.fake'},
+            {'username': admin.username, 'email': 'other@yamdb.fake'},
+            {'username': 'another', 'email': admin.email},
+            {'username': 'new_user', 'email': 'dup@yamdb.fake'},
+            {'username': 'me', 'email': 'me@yamdb.fake'},
+        ]
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(
+            self.BULK_URL, data=data[:4], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'1', '2', '3'}, (
+            'Проверьте, что ошибки уникальности возвращаются по номерам '
+            'записей.'
+        )
+        assert django_user_model.objects.count() == users_count, (
+            'Проверьте, что при ошибке ни один пользователь не создается.'
+        )
+
+    def test_04_bulk_patch_roles(self, admin_client, user, moderator):
+        received = []
+
+        def receiver(sender, user_ids, **kwargs):
+            received.append(user_ids)
+
+        users_changed.connect(receiver)
+        try:
+            response = admin_client.patch(
+                self.BULK_URL,
+                data=[
+                    {'username': user.username, 'role': 'moderator'},
+                    {'username': moderator.username, 'role': 'user'},
+                ],
+                format='json',
+            )
+        finally:
+            users_changed.disconnect(receiver)
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        moderator.refresh_from_db()
+        assert user.is_moderator and not moderator.is_moderator
+        assert received == [{user.id, moderator.id}], (
+            'Проверьте, что после массового изменения отправляется сигнал '
+            '`users_changed` со всеми затронутыми пользователями.'
+        )
+
+        response = admin_client.patch(
+            self.BULK_URL,
+            data=[{'username': 'missing', 'role': 'admin'}],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_load_users_command(self, django_user_model):
+        call_command('load_users', USERS_CSV, '--keep-ids',
+                     '--batch-size', '2')
+        assert django_user_model.objects.filter(
+            id=101, username='capt_obvious', role='admin'
+        ).exists()
+        call_command('load_users', USERS_CSV)
+        assert django_user_model.objects.count() == 5
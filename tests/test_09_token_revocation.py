@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import revocation
+from api.revocation import RevocationList
+from reviews.models import RevokedToken
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TokenRevocation:
+
+    ME_URL = '/api/v1/users/me/'
+    REVOKE_URL = '/api/v1/auth/revoke/'
+    REVOKE_USER_URL = '/api/v1/users/{username}/revoke-tokens/'
+
+    def test_01_revoke_own_token(self, user_client, user):
+        assert user_client.get(self.ME_URL).status_code == HTTPStatus.OK
+        response = user_client.post(self.REVOKE_URL)
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            f'Проверьте, что POST-запрос к `{self.REVOKE_URL}` возвращает '
+            'ответ со статусом 204.'
+        )
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отозванный токен больше не принимается.'
+        )
+
+    def test_02_revoke_user_tokens(self, admin_client, user_client,
+                                   moderator_client, moderator):
+        url = self.REVOKE_USER_URL.format(username=moderator.username)
+        response = user_client.post(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос к `{url}` доступен только '
+            'администратору.'
+        )
+        response = admin_client.post(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = moderator_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после отзыва токенов пользователя его старые '
+            'токены не принимаются.'
+        )
+
+    def test_03_revocation_list_refresh(self, user, django_assert_num_queries):
+        token = AccessToken.for_user(user)
+        revocations = RevocationList(refresh_seconds=3600)
+        with django_assert_num_queries(1):
+            assert not revocations.is_revoked(token)
+        RevokedToken.objects.create(
+            jti=token['jti'], expires_at=user.date_joined
+        )
+        with django_assert_num_queries(0):
+            assert not revocations.is_revoked(token), (
+                'Проверьте, что список не обращается к базе до истечения '
+                'интервала обновления.'
+            )
+        revocations.refresh(force=True)
+        with django_assert_num_queries(0):
+            assert revocations.is_revoked(token)
+
+    def test_04_full_reload_swaps_copy(self, user, monkeypatch):
+        token = AccessToken.for_user(user)
+        revocations = RevocationList(full_reload_seconds=0)
+        RevokedToken.objects.create(
+            jti=token['jti'], expires_at=user.date_joined
+        )
+        RevokedToken.objects.create(jti='other', expires_at=user.date_joined)
+        revocations.refresh(force=True)
+        seen = []
+        collect = revocation.collect
+
+        def check_live_copy(*args):
+            seen.append(token['jti'] in revocations.jtis)
+            collect(*args)
+
+        monkeypatch.setattr(revocation, 'collect', check_live_copy)
+        revocations.refresh(force=True)
+        assert seen and all(seen), (
+            'Проверьте, что при полной перезагрузке отозванные токены '
+            'не пропадают из действующей копии.'
+        )
+        assert revocations.is_revoked(token)
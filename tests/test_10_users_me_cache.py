@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.cache import get_me_payload
+from api.serializers import MeSerializer
+from reviews.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10UsersMeCache:
+
+    USERS_ME_URL = '/api/v1/users/me/'
+
+    def test_01_me_conditional_get(self, user_client, user,
+                                   django_assert_num_queries):
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{self.USERS_ME_URL}` '
+            'содержит заголовок `ETag`.'
+        )
+        with django_assert_num_queries(1):
+            response = user_client.get(
+                self.USERS_ME_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что GET-запрос с актуальным `If-None-Match` '
+            'возвращает ответ со статусом 304.'
+        )
+        with django_assert_num_queries(1):
+            response = user_client.get(self.USERS_ME_URL)
+        assert response.json()['username'] == user.username
+
+    def test_02_me_patch_invalidates(self, user_client):
+        etag = user_client.get(self.USERS_ME_URL).get('ETag')
+        response = user_client.patch(
+            self.USERS_ME_URL, data={'bio': 'new bio'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.get('ETag') != etag
+        response = user_client.get(
+            self.USERS_ME_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после PATCH-запроса к '
+            f'`{self.USERS_ME_URL}` кэш ответа сбрасывается.'
+        )
+        assert response.json()['bio'] == 'new bio'
+
+    def test_03_admin_edit_invalidates(self, user_client, admin_client, user):
+        user_client.get(self.USERS_ME_URL)
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.json()['role'] == 'moderator', (
+            'Проверьте, что изменение пользователя администратором '
+            f'сбрасывает кэш ответа `{self.USERS_ME_URL}`.'
+        )
+        admin_client.patch(
+            '/api/v1/users/bulk/',
+            data=[{'username': user.username, 'role': 'admin'}],
+            format='json',
+        )
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.json()['role'] == 'admin', (
+            'Проверьте, что массовое изменение пользователей сбрасывает кэш '
+            f'ответа `{self.USERS_ME_URL}`.'
+        )
+
+    def test_04_invalidated_after_commit(self, user_client, user):
+        stale = User.objects.get(pk=user.pk)
+        with transaction.atomic():
+            user.bio = 'new bio'
+            user.save()
+            # Параллельный запрос до коммита читает старую строку.
+            get_me_payload(stale, MeSerializer)
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.json()['bio'] == 'new bio', (
+            'Проверьте, что кэш ответа '
+            f'`{self.USERS_ME_URL}` сбрасывается после коммита транзакции.'
+        )
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+
+def slug_lookups(queries):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT') and '"slug"' in query['sql']
+        and ('reviews_category' in query['sql']
+             or 'reviews_genre' in query['sql'])
+        and 'INNER JOIN' not in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CatalogSlugCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def post_title(self, admin_client, genres, category):
+        return admin_client.post(self.TITLES_URL, data={
+            'name': 'Чудо-юдо',
+            'year': 1999,
+            'genre': genres,
+            'category': category,
+        })
+
+    def test_01_title_post_uses_slug_cache(self, admin_client):
+        genres = [genre['slug'] for genre in create_genre(admin_client)]
+        category = create_categories(admin_client)[0]['slug']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_title(admin_client, genres, category)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(slug_lookups(queries)) <= 2, (
+            'Проверьте, что при промахе кэша слаги категории и жанров '
+            'дочитываются не более чем одним запросом на справочник.'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_title(admin_client, genres, category)
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['category']['slug'] == category
+        assert not slug_lookups(queries), (
+            'Проверьте, что повторное создание произведения не читает '
+            'категории и жанры из базы.'
+        )
+
+    def test_02_catalog_writes_invalidate(self, admin_client):
+        genres = [genre['slug'] for genre in create_genre(admin_client)]
+        category = create_categories(admin_client)[0]['slug']
+        self.post_title(admin_client, genres, category)
+        admin_client.delete(f'/api/v1/genres/{genres[0]}/')
+        response = self.post_title(admin_client, genres, category)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что после удаления жанра его слаг больше не '
+            'принимается при создании произведения.'
+        )
+        response = self.post_title(admin_client, ['missing'], category)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
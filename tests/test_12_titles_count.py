@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Category, Genre
+from tests.utils import create_titles
+
+
+def get_counts(client, url):
+    response = client.get(url, {'with_counts': 1, 'limit': 100})
+    assert response.status_code == HTTPStatus.OK
+    return {
+        obj['slug']: obj['titles_count'] for obj in response.json()['results']
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitlesCount:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRE_URL = '/api/v1/genres/'
+
+    def test_01_counts_are_optional(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.CATEGORY_URL)
+        assert 'titles_count' not in response.json()['results'][0], (
+            'Проверьте, что поле `titles_count` отдается только по запросу '
+            '`with_counts`.'
+        )
+        assert get_counts(client, self.CATEGORY_URL) == {
+            'films': 1, 'books': 1
+        }
+        assert get_counts(client, self.GENRE_URL) == {
+            'horror': 1, 'comedy': 1, 'drama': 1
+        }
+
+    def test_02_counts_follow_title_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.patch(
+            title_url, data={'category': 'books', 'genre': ['drama']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert get_counts(client, self.CATEGORY_URL) == {
+            'films': 0, 'books': 2
+        }
+        assert get_counts(client, self.GENRE_URL) == {
+            'horror': 0, 'comedy': 0, 'drama': 2
+        }
+        admin_client.delete(title_url)
+        assert get_counts(client, self.CATEGORY_URL) == {
+            'films': 0, 'books': 1
+        }
+        assert get_counts(client, self.GENRE_URL) == {
+            'horror': 0, 'comedy': 0, 'drama': 1
+        }
+        call_command('check_titles_count')
+
+    def test_03_checker_fixes_drift(self, admin_client):
+        create_titles(admin_client)
+        Genre.objects.filter(slug='drama').update(titles_count=7)
+        with pytest.raises(CommandError):
+            call_command('check_titles_count')
+        call_command('check_titles_count', '--fix')
+        assert Genre.objects.get(slug='drama').titles_count == 1
+        assert Category.objects.get(slug='films').titles_count == 1
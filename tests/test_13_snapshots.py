@@ -0,0 +1,114 @@
+import gzip
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api import snapshots
+from tests.utils import create_categories
+
+
+@pytest.fixture
+def snapshots_dir(tmp_path):
+    with override_settings(CATALOG_SNAPSHOTS={
+        'ENABLED': True,
+        'DIR': tmp_path,
+        'BASE_URL': 'http://testserver',
+    }, BACKGROUND_JOBS_EAGER=True):
+        yield tmp_path
+
+
+def read_body(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CatalogSnapshots:
+
+    CATEGORY_URL = '/api/v1/categories/'
+
+    def test_01_snapshot_served_without_orm(self, client, admin_client,
+                                            snapshots_dir):
+        categories = create_categories(admin_client)
+        assert (snapshots_dir / 'categories.json').exists(), (
+            'Проверьте, что снимок категорий создается при изменении '
+            'справочника.'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.CATEGORY_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not queries.captured_queries, (
+            'Проверьте, что снимок отдается без запросов к базе.'
+        )
+        data = json.loads(read_body(response))
+        assert {obj['slug'] for obj in data['results']} == {
+            category['slug'] for category in categories
+        }
+
+        response = client.get(
+            self.CATEGORY_URL, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(read_body(response)).decode() == (
+            (snapshots_dir / 'categories.json').read_text()
+        )
+
+    def test_02_snapshot_updated_on_change(self, client, admin_client,
+                                           snapshots_dir):
+        create_categories(admin_client)
+        admin_client.delete(f'{self.CATEGORY_URL}films/')
+        response = client.get(self.CATEGORY_URL)
+        assert b'films' not in read_body(response), (
+            'Проверьте, что снимок перегенерируется после удаления категории.'
+        )
+        assert not list(snapshots_dir.glob('.*')), (
+            'Проверьте, что временные файлы не остаются после записи снимка.'
+        )
+
+    def test_03_not_served_for_authenticated(self, admin_client,
+                                             snapshots_dir):
+        create_categories(admin_client)
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(self.CATEGORY_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert queries.captured_queries
+
+    def test_04_regeneration_debounced(self, admin_client, snapshots_dir,
+                                       settings, monkeypatch):
+        settings.BACKGROUND_JOBS_EAGER = False
+        settings.CATALOG_SNAPSHOTS = {
+            **settings.CATALOG_SNAPSHOTS, 'DEBOUNCE_SECONDS': 0.2,
+        }
+        calls = []
+        done = threading.Event()
+
+        def record(names):
+            calls.append((set(names), threading.current_thread()))
+            done.set()
+
+        monkeypatch.setattr(snapshots, 'generate_snapshots', record)
+        create_categories(admin_client)
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert not calls, (
+            'Проверьте, что снимки не перегенерируются внутри запроса.'
+        )
+        assert done.wait(5)
+        (names, thread), = calls
+        assert names == {'categories', 'genres', 'titles-top'}, (
+            'Проверьте, что изменения за интервал объединяются в одну '
+            'перегенерацию.'
+        )
+        assert thread is not threading.main_thread()
+
+    def test_05_older_generation_not_written(self, snapshots_dir):
+        assert snapshots.publish_snapshot('genres', 2, {None: b'new'})
+        assert not snapshots.publish_snapshot('genres', 1, {None: b'old'}), (
+            'Проверьте, что опоздавший рендер не затирает более новый снимок.'
+        )
+        assert (snapshots_dir / 'genres.json').read_bytes() == b'new'
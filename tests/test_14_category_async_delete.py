@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import consts
+from reviews.models import Category, Title
+from tests.utils import create_titles
+
+
+@pytest.fixture(autouse=True)
+def eager_jobs(settings):
+    settings.BACKGROUND_JOBS_EAGER = True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14CategoryAsyncDelete:
+
+    CATEGORY_URL = '/api/v1/categories/'
+
+    # Пакеты по одному произведению: повторяющиеся запросы ожидаемы.
+    @pytest.mark.allow_repeated_queries
+    def test_01_async_delete_returns_job(self, admin_client, monkeypatch):
+        monkeypatch.setattr(consts, 'CATEGORY_DELETE_BATCH_SIZE', 1)
+        titles, categories, _ = create_titles(admin_client)
+        for title in titles:
+            admin_client.patch(
+                f'/api/v1/titles/{title["id"]}/', data={'category': 'films'}
+            )
+        response = admin_client.delete(
+            f'{self.CATEGORY_URL}films/?mode=async'
+        )
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что DELETE-запрос с `mode=async` возвращает ответ '
+            'со статусом 202.'
+        )
+        job = response.json()
+        assert response['Location'].endswith(f'/api/v1/jobs/{job["id"]}/')
+
+        response = admin_client.get(response['Location'])
+        assert response.status_code == HTTPStatus.OK
+        job = response.json()
+        assert job['status'] == 'done'
+        assert job['total'] == job['processed'] == len(titles)
+        assert not Category.objects.filter(slug='films').exists()
+        assert Title.objects.filter(category__isnull=True).count() == len(
+            titles
+        )
+        assert Category.objects.get(slug='books').titles_count == 0
+
+    def test_02_jobs_admin_only(self, admin_client, user_client):
+        create_titles(admin_client)
+        response = user_client.delete(f'{self.CATEGORY_URL}films/?mode=async')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        job_id = admin_client.delete(
+            f'{self.CATEGORY_URL}films/?mode=async'
+        ).json()['id']
+        response = user_client.get(f'/api/v1/jobs/{job_id}/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
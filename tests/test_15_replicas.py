@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import replicas
+from tests.utils import create_categories
+
+
+@pytest.fixture
+def read_aliases(monkeypatch):
+    """Подменяет выбор реплики и запоминает, куда шли чтения."""
+    aliases = []
+    monkeypatch.setattr(replicas, 'choose_replica', lambda: 'default')
+    db_for_read = replicas.PrimaryReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        aliases.append(replicas.read_alias.get())
+        return db_for_read(self, model, **hints)
+
+    monkeypatch.setattr(replicas.PrimaryReplicaRouter, 'db_for_read', spy)
+    return aliases
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Replicas:
+
+    def test_01_router(self):
+        router = replicas.PrimaryReplicaRouter()
+        assert router.db_for_read(None) == 'default'
+        token = replicas.read_alias.set('replica1')
+        try:
+            assert router.db_for_read(None) == 'replica1'
+            assert router.db_for_write(None) == 'default', (
+                'Проверьте, что запись всегда идет в основную базу.'
+            )
+        finally:
+            replicas.read_alias.reset(token)
+
+    def test_02_list_reads_from_replica(self, client, read_aliases):
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'default' in read_aliases, (
+            'Проверьте, что list читает с реплики.'
+        )
+        assert replicas.read_alias.get() is None, (
+            'Проверьте, что выбор реплики не переживает запрос.'
+        )
+
+    def test_03_reads_after_write_are_sticky(self, admin_client, client,
+                                             read_aliases, settings):
+        create_categories(admin_client)
+        read_aliases.clear()
+        admin_client.get('/api/v1/categories/')
+        assert read_aliases and not any(read_aliases), (
+            'Проверьте, что после записи пользователь читает из основной '
+            'базы.'
+        )
+        read_aliases.clear()
+        client.get('/api/v1/categories/')
+        assert 'default' in read_aliases, (
+            'Проверьте, что запись одного пользователя не влияет на чтение '
+            'других.'
+        )
+
+        settings.READ_YOUR_WRITES_SECONDS = 0
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Рок', 'slug': 'rock'
+        })
+        read_aliases.clear()
+        admin_client.get('/api/v1/categories/')
+        assert 'default' in read_aliases, (
+            'Проверьте, что липкость ограничена READ_YOUR_WRITES_SECONDS.'
+        )
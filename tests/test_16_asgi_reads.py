@@ -0,0 +1,124 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api import asgi
+from reviews.models import Category
+from api.urls import router
+from tests.utils import create_categories
+
+
+def asgi_get(path, headers=()):
+    """Выполняет GET-запрос к ASGI-приложению проекта."""
+    return asgi_request('GET', path, headers)
+
+
+def asgi_request(method, path, headers=(), body=b''):
+    """Выполняет запрос к ASGI-приложению проекта."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    async_to_sync(asgi.get_application())(scope, receive, send)
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], body
+
+
+@pytest.fixture(autouse=True)
+def clear_read_cache():
+    asgi.read_cache.clear()
+    yield
+    asgi.read_cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16AsgiReads:
+
+    def test_01_async_views(self):
+        patterns = {
+            pattern.name: pattern
+            for pattern in asgi.async_patterns(router.urls)
+        }
+        assert asyncio.iscoroutinefunction(
+            patterns['titles-list'].callback
+        ), (
+            'Проверьте, что под ASGI чтения обслуживают асинхронные вью.'
+        )
+        assert not asyncio.iscoroutinefunction(
+            patterns['users-list'].callback
+        )
+
+    def test_02_same_response_as_wsgi(self, admin_client, client):
+        create_categories(admin_client)
+        status, body = asgi_get('/api/v1/categories/')
+        assert status == HTTPStatus.OK
+        assert json.loads(body) == client.get('/api/v1/categories/').json()
+
+    def test_03_cached_until_change(self, admin_client, monkeypatch):
+        create_categories(admin_client)
+        asgi_get('/api/v1/categories/')
+
+        def fail(*args, **kwargs):
+            raise AssertionError('Ответ должен браться из кэша.')
+
+        monkeypatch.setattr(asgi, 'run_view', fail)
+        status, cached = asgi_get('/api/v1/categories/')
+        assert status == HTTPStatus.OK
+        monkeypatch.undo()
+
+        admin_client.post('/api/v1/categories/', data={
+            'name': 'Музыка', 'slug': 'music'
+        })
+        status, body = asgi_get('/api/v1/categories/')
+        assert body != cached, (
+            'Проверьте, что кэш ответов сбрасывается при изменении данных.'
+        )
+        assert 'music' in body.decode()
+
+    def test_04_authorized_requests_not_cached(self, admin_client):
+        create_categories(admin_client)
+        key = asgi.read_cache.make_key({
+            'type': 'http', 'method': 'GET', 'scheme': 'http',
+            'path': '/api/v1/categories/', 'query_string': b'',
+            'headers': [(b'authorization', b'Bearer token')],
+        })
+        assert key is None
+
+    def test_05_writes_bypass_read_pool(self, token_admin, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError('Запись не должна идти через пул чтений.')
+
+        monkeypatch.setattr(asgi, 'run_view', fail)
+        body = json.dumps({'name': 'Музыка', 'slug': 'music'}).encode()
+        status, _ = asgi_request(
+            'POST', '/api/v1/categories/',
+            headers=(
+                (b'authorization', f'Bearer {token_admin["access"]}'.encode()),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+            ),
+            body=body,
+        )
+        assert status == HTTPStatus.CREATED
+        assert Category.objects.filter(slug='music').exists()
@@ -0,0 +1,64 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+
+DATA = {
+    'name': 'Война и мир',
+    'text': 'Строка\u2028с разделителем\u2029абзаца',
+    'pub_date': datetime.datetime(
+        2021, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+    ),
+    'date': datetime.date(2021, 5, 1),
+    'score': Decimal('7.50'),
+    'rating': 7.333333333333333,
+    'detail': gettext_lazy('Not found.'),
+    'genre': ({'slug': 'drama'}, {'slug': 'comedy'}),
+    'big': 2 ** 70,
+    1: None,
+}
+
+
+class Test17Json:
+
+    def test_01_renderer_matches_drf(self):
+        assert renderers.FastJSONRenderer().render(DATA) == (
+            JSONRenderer().render(DATA)
+        ), 'Проверьте, что FastJSONRenderer рендерит так же, как JSONRenderer.'
+
+    def test_02_renderer_indent(self):
+        context = {'indent': 4}
+        assert renderers.FastJSONRenderer().render(
+            DATA, renderer_context=context
+        ) == JSONRenderer().render(DATA, renderer_context=context)
+
+    def test_03_parser_matches_drf(self):
+        content = JSONRenderer().render(DATA)
+        assert parsers.FastJSONParser().parse(io.BytesIO(content)) == (
+            JSONParser().parse(io.BytesIO(content))
+        )
+
+    @pytest.mark.parametrize(
+        'content',
+        (b'{"a": ', b'{"a": NaN}', b'\xff'),
+        ids=('truncated', 'nan', 'not_utf8'),
+    )
+    def test_04_parse_errors(self, content):
+        with pytest.raises(ParseError):
+            parsers.FastJSONParser().parse(io.BytesIO(content))
+
+    def test_05_fallback_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        content = renderers.FastJSONRenderer().render(DATA)
+        assert content == JSONRenderer().render(DATA)
+        assert parsers.FastJSONParser().parse(io.BytesIO(content))['name'] == (
+            'Война и мир'
+        )
@@ -0,0 +1,64 @@
+import gzip
+
+import pytest
+
+from api import compression
+from tests.utils import create_categories
+
+
+@pytest.fixture(autouse=True)
+def small_threshold(settings):
+    settings.COMPRESSION = {'MIN_SIZE': 100}
+    compression.compression_stats.reset()
+
+
+@pytest.mark.parametrize('header, expected', (
+    ('gzip', 'gzip'),
+    ('gzip, deflate', 'gzip'),
+    ('GZIP;q=0.5', 'gzip'),
+    ('gzip;q=0', None),
+    ('*', 'gzip'),
+    ('*;q=0.1, gzip;q=0', None),
+    ('deflate', None),
+    ('identity', None),
+    ('', None),
+))
+def test_negotiate_gzip(header, expected, monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert compression.negotiate(header) == expected
+
+
+def test_negotiate_prefers_quality(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', object())
+    assert compression.negotiate('gzip, br') == 'br'
+    assert compression.negotiate('gzip;q=1, br;q=0.5') == 'gzip'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Compression:
+
+    URL = '/api/v1/categories/'
+
+    def test_01_gzip(self, admin_client, client):
+        create_categories(admin_client)
+        plain = client.get(self.URL)
+        response = client.get(self.URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответ сжимается, если клиент принимает gzip.'
+        )
+        assert gzip.decompress(response.content) == plain.content
+        assert 'Accept-Encoding' in response['Vary']
+        stats = compression.compression_stats.snapshot()['categories-list']
+        assert stats['responses'] == 1
+        assert stats['original'] == len(plain.content)
+        assert stats['compressed'] == len(response.content)
+
+    def test_02_not_compressed(self, admin_client, client, settings):
+        create_categories(admin_client)
+        response = client.get(self.URL, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert not response.has_header('Content-Encoding')
+        settings.COMPRESSION = {'MIN_SIZE': 10 ** 6}
+        response = client.get(self.URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше MIN_SIZE не сжимаются.'
+        )
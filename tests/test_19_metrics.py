@@ -0,0 +1,99 @@
+import json
+import os
+import re
+
+import pytest
+
+from api.metrics import registry
+from tests.utils import create_titles
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def metric_value(content, name, **labels):
+    label_pattern = ','.join(
+        f'{label}="{re.escape(str(value))}"'
+        for label, value in labels.items()
+    )
+    match = re.search(
+        rf'^{name}\{{{label_pattern}\}} (\S+)$', content, re.M
+    )
+    assert match, f'Метрика {name} с метками {labels} не найдена.'
+    return float(match.group(1))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Metrics:
+
+    def test_01_server_timing(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        assert re.search(r'total;dur=[\d.]+', timing), (
+            'Проверьте, что ответ содержит заголовок Server-Timing.'
+        )
+        queries = int(re.search(r'desc="(\d+) queries"', timing).group(1))
+        assert queries > 0
+        assert re.search(r'serializer;dur=[\d.]+', timing)
+
+    def test_02_prometheus_endpoint(self, admin_client, client):
+        create_titles(admin_client)
+        registry.reset()
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+        response = client.get('/metrics')
+        assert response['Content-Type'].startswith('text/plain')
+        content = response.content.decode()
+        assert metric_value(
+            content, 'yamdb_requests_total',
+            route='categories-list', method='GET', status=200,
+        ) == 2
+        assert metric_value(
+            content, 'yamdb_request_duration_seconds_count',
+            route='categories-list',
+        ) == 2
+        assert metric_value(
+            content, 'yamdb_db_queries_bucket', route='categories-list',
+            le='+Inf',
+        ) == 2
+        assert metric_value(
+            content, 'yamdb_serializer_duration_seconds_sum',
+            route='categories-list',
+        ) > 0, 'Проверьте, что учитывается время сериализации.'
+        assert metric_value(
+            content, 'yamdb_response_size_bytes_sum', route='categories-list'
+        ) > 0
+
+    def test_03_metrics_of_all_processes(self, client, settings, tmp_path,
+                                         monkeypatch):
+        settings.METRICS = {'ENABLED': True, 'DIR': tmp_path}
+        fsyncs = []
+        monkeypatch.setattr(os, 'fsync', fsyncs.append)
+        client.get('/api/v1/genres/')
+        other = registry.state()
+        (tmp_path / 'metrics-999999.json').write_text(json.dumps(other))
+        content = client.get('/metrics').content.decode()
+        assert metric_value(
+            content, 'yamdb_requests_total',
+            route='genres-list', method='GET', status=200,
+        ) == 2, 'Проверьте, что /metrics суммирует метрики всех процессов.'
+        assert fsyncs == [], (
+            'Проверьте, что сброс метрик в файл не вызывает fsync.'
+        )
+
+    def test_04_allowed_ips_only(self, client, settings):
+        response = client.get('/metrics', REMOTE_ADDR='203.0.113.7')
+        assert response.status_code == 404, (
+            'Проверьте, что /metrics недоступен с адресов не из '
+            "METRICS['ALLOWED_IPS']."
+        )
+        settings.METRICS = {
+            **settings.METRICS, 'ALLOWED_IPS': ('203.0.113.7',)
+        }
+        response = client.get('/metrics', REMOTE_ADDR='203.0.113.7')
+        assert response.status_code == 200
@@ -0,0 +1,59 @@
+import pytest
+
+from api import querycheck
+from api.views import ReviewViewSet
+from tests.utils import create_reviews
+
+
+def test_normalize():
+    assert querycheck.normalize(
+        'SELECT "a" FROM "t" WHERE "id" IN (%s, %s, %s) AND "x" = 5'
+    ) == querycheck.normalize(
+        'SELECT "a" FROM "t" WHERE "id" IN (%s) AND "x" = 7'
+    )
+    assert querycheck.normalize(
+        "SELECT 1 FROM \"t\" WHERE \"name\" = 'it''s'"
+    ) == 'SELECT ? FROM "t" WHERE "name" = ?'
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.allow_repeated_queries
+class Test20QueryDetector:
+
+    def test_01_n_plus_one_with_field(self, admin_client, client,
+                                      monkeypatch, admin, moderator, user,
+                                      moderator_client, user_client):
+        _, titles = create_reviews(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+            user: user_client,
+        })
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset',
+            lambda self: self.get_title().reviews.all(),
+        )
+        querycheck.reported.clear()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client.get(url)
+        issues = [
+            issue for issue in querycheck.reported
+            if issue.kind == querycheck.N_PLUS_ONE
+        ]
+        fields = {field for issue in issues for field in issue.fields}
+        assert 'ReviewSerializer.author' in fields, (
+            'Проверьте, что детектор находит N+1 и указывает поле '
+            'сериализатора.'
+        )
+        assert all(issue.path == url for issue in issues)
+
+    def test_02_slow_queries(self, client, settings):
+        settings.QUERY_DETECTOR = {
+            **querycheck.get_config(), 'SLOW_QUERY_MS': 0
+        }
+        querycheck.reported.clear()
+        client.get('/api/v1/genres/')
+        assert any(
+            issue.kind == querycheck.SLOW for issue in querycheck.reported
+        )
+        assert querycheck.reported.maxlen == querycheck.REPORTED_LIMIT, (
+            'Проверьте, что список найденных проблем ограничен.'
+        )
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+from tests.conftest import MANAGE_PATH
+
+CHECK = '''
+import json
+import django
+from django.apps import apps
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+django.setup()
+try:
+    resolve('/admin/')
+    admin_routed = True
+except Resolver404:
+    admin_routed = False
+print(json.dumps({
+    'apps': [config.name for config in apps.get_app_configs()],
+    'middleware': settings.MIDDLEWARE,
+    'titles': resolve('/api/v1/titles/').url_name,
+    'admin_routed': admin_routed,
+}))
+'''
+
+
+def test_api_profile():
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK],
+        cwd=MANAGE_PATH,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings_api'},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    profile = json.loads(result.stdout)
+    assert profile['titles'] == 'titles-list'
+    assert not profile['admin_routed']
+    for app in ('django.contrib.admin', 'django.contrib.sessions',
+                'django.contrib.messages', 'django.contrib.staticfiles'):
+        assert app not in profile['apps'], (
+            f'Проверьте, что профиль settings_api не загружает {app}.'
+        )
+    assert 'django.middleware.csrf.CsrfViewMiddleware' not in (
+        profile['middleware']
+    )
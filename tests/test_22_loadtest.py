@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.loadtest import (
+    SIGNUP, LoadTest, build_scenarios, load_collection, percentile,
+)
+from api.management.commands.loadtest import COLLECTION, confirmation_code
+
+
+@pytest.fixture(scope='module')
+def collection():
+    return load_collection(COLLECTION)
+
+
+def find_step(groups, name):
+    return next(
+        step for steps in groups.values() for step in steps
+        if step.name == name
+    )
+
+
+def test_load_collection(collection):
+    variables, groups = collection
+    assert sum(map(len, groups.values())) == 231
+    assert 'tooLongUsername' in variables
+    token = find_step(groups, 'get_token_for_admin')
+    assert token.expected == HTTPStatus.OK
+    assert token.extract == {'adminToken': 'token'}, (
+        'Проверьте, что из тестов коллекции извлекаются сохраняемые '
+        'переменные.'
+    )
+    assert find_step(
+        groups, 'create_title_without_name // Admin'
+    ).token == 'adminToken', (
+        'Проверьте, что токен наследуется от auth папки.'
+    )
+
+
+def test_build_scenarios(collection):
+    _, groups = collection
+    scenarios = {
+        scenario.name: scenario for scenario in build_scenarios(groups)
+    }
+    assert not any('delete_' in name for name in scenarios)
+    assert scenarios['titles/get_titles_info'].weight > (
+        scenarios['titles/titles_creation'].weight
+    )
+    signup = scenarios[SIGNUP]
+    assert [step.name for step in signup.steps[:2]] == [
+        'get_confirmation_code_for_regular_user',
+        'get_token_for_regular_user',
+    ]
+    names = {
+        scenario.name
+        for scenario in build_scenarios(
+            groups, [('*', 0), ('titles/*', 3)]
+        )
+    }
+    assert names and all(name.startswith('titles/') for name in names)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_signup_chain(live_server, collection):
+    variables, groups = collection
+    signup = [
+        scenario for scenario in build_scenarios(groups)
+        if scenario.name == SIGNUP
+    ]
+    loadtest = LoadTest(
+        live_server.url, variables, groups, codes=confirmation_code, seed=1,
+    )
+    stats = loadtest.run_closed(signup, concurrency=1, iterations=3)
+    rows = {row['name']: row for row in stats.rows()}
+    token = rows['get_token_for_regular_user']
+    assert token['count'] == 3
+    assert token['errors'] == token['mismatches'] == 0, (
+        'Проверьте, что сценарий signup получает токен по коду '
+        'подтверждения.'
+    )
+    assert rows['ИТОГО']['mismatches'] == 0
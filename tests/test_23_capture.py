@@ -0,0 +1,159 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api import capture
+
+
+def read_capture(path):
+    capture.flush()
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.fixture
+def capture_path(settings, tmp_path):
+    path = tmp_path / 'capture.jsonl'
+    settings.CAPTURE = {
+        **capture.get_config(), 'PATH': path, 'SAMPLE_RATE': 1,
+    }
+    return path
+
+
+def test_writer_survives_write_errors(tmp_path):
+    path = tmp_path / 'missing' / 'capture.jsonl'
+    writer = capture.CaptureWriter(str(path), 10)
+    entry = (0, 'GET', None, '/api/v1/', None, {}, None, None, None, None,
+             200, 0.01, 'digest', 0)
+    writer.submit(entry)
+    assert writer.flush(timeout=5), (
+        'Проверьте, что ошибка записи не оставляет очередь недописанной.'
+    )
+    assert writer.failed == 1
+    assert writer.thread.is_alive(), (
+        'Проверьте, что поток записи переживает ошибку записи.'
+    )
+    path.parent.mkdir()
+    writer.submit(entry)
+    assert writer.flush(timeout=5)
+    assert len(path.read_text().splitlines()) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Capture:
+
+    def test_01_record(self, admin_client, admin, client, capture_path,
+                       settings):
+        settings.CAPTURE = {**settings.CAPTURE, 'BODY': 'full'}
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'},
+            format='json',
+        )
+        client.get('/api/v1/titles/', {'year': 1979})
+        created, listed = read_capture(capture_path)
+        assert created['method'] == 'POST'
+        assert created['status'] == 201
+        assert json.loads(created['body']) == {
+            'name': 'Фильм', 'slug': 'films'
+        }
+        assert created['role'] == 'admin'
+        assert created['user'] and created['user'] != str(admin.pk), (
+            'Проверьте, что пользователь в записи обезличен.'
+        )
+        assert listed['route'] == 'api/v1/titles/$'
+        assert listed['params'] == {'year': ['1979']}
+        assert listed['user'] is None
+        assert listed['duration_ms'] > 0
+
+    def test_02_digest_and_sampling(self, admin_client, capture_path,
+                                    settings):
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'},
+            format='json',
+        )
+        record, = read_capture(capture_path)
+        assert 'body' not in record, (
+            'Проверьте, что по умолчанию тело заменяется хэшем.'
+        )
+        assert len(record['body_sha256']) == 64
+        settings.CAPTURE = {**settings.CAPTURE, 'SAMPLE_RATE': 0}
+        admin_client.get('/api/v1/genres/')
+        assert len(read_capture(capture_path)) == 1
+
+    def test_03_no_credentials_or_usernames(self, admin_client, client,
+                                            capture_path, settings):
+        settings.CAPTURE = {**settings.CAPTURE, 'BODY': 'full'}
+        client.post(
+            '/api/v1/auth/signup/',
+            data=json.dumps(
+                {'username': 'secret_name', 'email': 'secret@yamdb.fake'}
+            ),
+            content_type='application/json',
+        )
+        client.post(
+            '/api/v1/auth/token/',
+            data=json.dumps(
+                {'username': 'secret_name', 'confirmation_code': 'c0de42'}
+            ),
+            content_type='application/json',
+        )
+        admin_client.post(
+            '/api/v1/users/',
+            data={'username': 'other_name', 'email': 'other@yamdb.fake'},
+            format='json',
+        )
+        admin_client.get('/api/v1/users/other_name/')
+        signup, token, created, detail = read_capture(capture_path)
+        text = capture_path.read_text(encoding='utf-8')
+        for secret in ('secret@yamdb.fake', 'c0de42', 'other@yamdb.fake'):
+            assert secret not in text, (
+                'Проверьте, что коды подтверждения и адреса почты не '
+                'попадают в запись трафика.'
+            )
+        assert 'body' not in signup and 'body' not in token
+        assert signup['body_sha256'] is None and signup['body_size']
+        assert json.loads(created['body'])['email'] == capture.REDACTED
+        assert detail['path'] == '/api/v1/users/{user}/'
+        assert 'other_name' not in json.dumps(detail), (
+            'Проверьте, что имя пользователя в пути обезличено.'
+        )
+
+    def test_04_replay(self, admin_client, admin, client, live_server,
+                       capture_path):
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'},
+            format='json',
+        )
+        for _ in range(3):
+            client.get('/api/v1/categories/')
+        admin_client.get('/api/v1/users/')
+        admin_client.get(f'/api/v1/users/{admin.username}/')
+        assert len(read_capture(capture_path)) == 6
+        capture_path.rename(capture_path.with_name('recorded.jsonl'))
+        out = StringIO()
+        call_command(
+            'replay_traffic', str(capture_path.with_name('recorded.jsonl')),
+            '--url', live_server.url, '--speed', 'max', stdout=out,
+        )
+        report = out.getvalue()
+        assert 'Воспроизведено 5 запросов' in report, (
+            'Проверьте, что запросы с телом без сохраненного текста '
+            'пропускаются.'
+        )
+        users = next(
+            line for line in report.splitlines()
+            if line.startswith('GET api/v1/users/$')
+        )
+        assert users.split()[-2:] == ['0', '0'], (
+            'Проверьте, что запросы пользователя воспроизводятся от имени '
+            'двойника с той же ролью.'
+        )
+        user = next(
+            line for line in report.splitlines()
+            if line.startswith('GET api/v1/users/(?P<username>')
+        )
+        assert user.split()[-2:] == ['0', '0'], (
+            'Проверьте, что имя пользователя в пути заменяется двойником.'
+        )
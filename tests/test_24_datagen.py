@@ -0,0 +1,65 @@
+import csv
+from collections import Counter
+
+import pytest
+
+from api.datagen import DATA_DIR, HEADERS, Plan, generate
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.reader(file))
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('dataset')
+    plan = Plan(300, 40, 2000, 3000, seed=7, chunk_size=450)
+    rows = generate(plan, directory, workers=2)
+    return directory, rows
+
+
+def test_schemas(dataset):
+    directory, rows = dataset
+    for table in HEADERS:
+        header, *data = read_rows(directory / f'{table}.csv')
+        assert header == read_rows(DATA_DIR / f'{table}.csv')[0], (
+            f'Проверьте, что {table}.csv записан в схеме static/data.'
+        )
+        assert len(data) == rows[table]
+    assert rows['review'] == 2000
+    assert rows['comments'] == 3000
+
+
+def test_deterministic(dataset, tmp_path):
+    directory, _ = dataset
+    generate(Plan(300, 40, 2000, 3000, seed=7, chunk_size=450), tmp_path,
+             workers=1)
+    for table in HEADERS:
+        assert (tmp_path / f'{table}.csv').read_bytes() == (
+            directory / f'{table}.csv'
+        ).read_bytes(), (
+            'Проверьте, что результат не зависит от числа процессов.'
+        )
+
+
+def test_distribution(dataset):
+    directory, _ = dataset
+    _, *reviews = read_rows(directory / 'review.csv')
+    pairs = [(title_id, author) for _, title_id, _, author, *_ in reviews]
+    assert len(set(pairs)) == len(pairs), (
+        'Проверьте, что у автора не больше одного отзыва на произведение.'
+    )
+    per_title = sorted(Counter(title for title, _ in pairs).values())
+    assert per_title[-1] >= 10 * per_title[len(per_title) // 2]
+    assert all(1 <= int(author) <= 300 for _, author in pairs)
+    _, *comments = read_rows(directory / 'comments.csv')
+    per_review = Counter(review_id for _, review_id, *_ in comments)
+    assert per_review.most_common(1)[0][1] > 100, (
+        'Проверьте, что часть комментариев приходится на вирусные отзывы.'
+    )
+
+
+def test_too_many_reviews():
+    with pytest.raises(ValueError):
+        Plan(10, 5, 51, 0)
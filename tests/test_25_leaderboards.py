@@ -0,0 +1,127 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.leaderboards import trend_term
+from reviews.models import Leaderboard, Review, TitleStats
+from tests.utils import create_single_review, create_titles
+
+
+def top_names(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK
+    return [(title['name'], title['rating']) for title in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Leaderboards:
+
+    TOP_URL = '/api/v1/titles/top/'
+    TRENDING_URL = '/api/v1/titles/trending/'
+
+    def test_01_top_follows_reviews(self, client, admin_client,
+                                    moderator_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = (title['id'] for title in titles)
+        assert top_names(client, self.TOP_URL) == []
+        create_single_review(user_client, terminator, 'Неплохо', 6)
+        create_single_review(moderator_client, terminator, 'Отлично', 10)
+        review = create_single_review(user_client, die_hard, 'Хорошо', 7)
+        assert top_names(client, self.TOP_URL) == [
+            ('Терминатор', 8), ('Крепкий орешек', 7)
+        ]
+        admin_client.patch(
+            f'/api/v1/titles/{die_hard}/reviews/{review.json()["id"]}/',
+            data={'score': 10},
+        )
+        assert top_names(client, self.TOP_URL) == [
+            ('Крепкий орешек', 10), ('Терминатор', 8)
+        ], 'Проверьте, что изменение оценки обновляет таблицу лидеров.'
+        admin_client.delete(
+            f'/api/v1/titles/{die_hard}/reviews/{review.json()["id"]}/'
+        )
+        assert top_names(client, self.TOP_URL) == [('Терминатор', 8)]
+
+    def test_02_category_and_genre_boards(self, client, admin_client,
+                                          user_client):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(user_client, title['id'], 'Текст', 5)
+        assert top_names(client, self.TOP_URL, category='films') == [
+            ('Терминатор', 5)
+        ]
+        assert top_names(client, self.TOP_URL, genre='drama') == [
+            ('Крепкий орешек', 5)
+        ]
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'category': 'books', 'genre': ['drama']},
+        )
+        assert top_names(client, self.TOP_URL, category='films') == []
+        assert top_names(client, self.TOP_URL, genre='drama') == [
+            ('Терминатор', 5), ('Крепкий орешек', 5)
+        ], 'Проверьте, что смена жанров переносит произведение в таблицы.'
+        admin_client.delete('/api/v1/genres/drama/')
+        assert not Leaderboard.objects.filter(board__startswith='genre:')
+        response = client.get(self.TOP_URL, {'genre': 'drama'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(
+            self.TOP_URL, {'genre': 'horror', 'category': 'books'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_trending_prefers_recent(self, client, admin_client,
+                                        moderator_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = (title['id'] for title in titles)
+        create_single_review(user_client, terminator, 'Классика', 10)
+        create_single_review(moderator_client, terminator, 'Классика', 10)
+        Review.objects.filter(title_id=terminator).update(
+            pub_date=timezone.now() - timedelta(days=60)
+        )
+        create_single_review(user_client, die_hard, 'Свежо', 6)
+        call_command('rebuild_leaderboards')
+        assert top_names(client, self.TOP_URL)[0][0] == 'Терминатор'
+        assert top_names(client, self.TRENDING_URL)[0][0] == (
+            'Крепкий орешек'
+        ), 'Проверьте, что в трендах старые оценки затухают.'
+
+    def test_04_rebuild_fixes_drift(self, client, admin_client,
+                                    user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 4)
+        TitleStats.objects.update(reviews_count=5, score_sum=50)
+        Leaderboard.objects.filter(board='all').delete()
+        call_command('rebuild_title_documents')
+        call_command('rebuild_leaderboards')
+        stats = TitleStats.objects.get(title_id=titles[0]['id'])
+        assert (stats.reviews_count, stats.score_sum) == (1, 4)
+        assert top_names(client, self.TOP_URL) == [('Терминатор', 4)]
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что rebuild_leaderboards обновляет рейтинг в '
+            'документах исправленных произведений.'
+        )
+
+    def test_05_removing_dominant_review(self, admin_client,
+                                         moderator_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Давно', 8)
+        Review.objects.update(pub_date=timezone.now() - timedelta(days=400))
+        call_command('rebuild_leaderboards')
+        review = create_single_review(moderator_client, title_id, 'Свежо', 6)
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/'
+        )
+        old = Review.objects.get(title_id=title_id)
+        stats = TitleStats.objects.get(title_id=title_id)
+        assert stats.trending == pytest.approx(
+            trend_term(old.score, old.pub_date), rel=1e-12
+        ), (
+            'Проверьте, что после удаления отзыва, составлявшего почти '
+            'весь трендовый счет, счет пересчитывается по отзывам.'
+        )
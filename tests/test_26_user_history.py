@@ -0,0 +1,97 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+
+def fill_history(author, count):
+    now = timezone.now()
+    titles = [Title.objects.create(name=f'Произведение {number}', year=2000)
+              for number in range(count)]
+    for number, title in enumerate(titles):
+        review = Review.objects.create(
+            author=author, title=title, text=f'Отзыв {number}', score=5
+        )
+        Comment.objects.create(
+            author=author, review=review, text=f'Комментарий {number}'
+        )
+    # Одинаковые даты у пар записей: страницы не должны терять их.
+    for model in (Review, Comment):
+        for number, obj in enumerate(model.objects.filter(author=author)):
+            model.objects.filter(pk=obj.pk).update(
+                pub_date=now - timedelta(minutes=number // 2)
+            )
+
+
+def read_all(client, url):
+    ids = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        ids += [obj['id'] for obj in response.json()['results']]
+        url = response.json()['next']
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26UserHistory:
+
+    def test_01_reviews_and_comments(self, client, user, moderator):
+        fill_history(user, 12)
+        fill_history(moderator, 2)
+        url = f'/api/v1/users/{user.username}'
+        reviews, pages = read_all(client, f'{url}/reviews/')
+        expected = list(Review.objects.filter(author=user).order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        assert reviews == expected, (
+            'Проверьте, что отзывы пользователя отдаются по курсору, '
+            'новые первыми, без пропусков и повторов.'
+        )
+        assert pages == 3
+        comments, _ = read_all(client, f'{url}/comments/')
+        assert len(set(comments)) == 12
+        response = client.get(
+            f'/api/v1/users/{moderator.username}/comments/'
+        )
+        comment = response.json()['results'][0]
+        assert set(comment) == {
+            'id', 'title', 'review', 'text', 'author', 'pub_date'
+        }
+        assert comment['author'] == moderator.username
+        response = client.get('/api/v1/users/nobody/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_queries_do_not_depend_on_author(self, client, user,
+                                                moderator):
+        fill_history(user, 12)
+        fill_history(moderator, 1)
+        counts = []
+        for author in (user, moderator):
+            with CaptureQueriesContext(connection) as queries:
+                client.get(f'/api/v1/users/{author.username}/comments/')
+            counts.append(len(queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов не зависит от автора.'
+        )
+
+    def test_03_history_uses_index(self, user):
+        fill_history(user, 3)
+        for model, index in (
+            (Review, 'review_author_pub_date'),
+            (Comment, 'comment_author_pub_date'),
+        ):
+            plan = model.objects.filter(author=user).order_by(
+                '-pub_date', '-id'
+            )[:6].explain()
+            assert index in plan and 'TEMP B-TREE' not in plan, (
+                'Проверьте, что история читается по индексу '
+                '(author, pub_date) без сортировки.'
+            )
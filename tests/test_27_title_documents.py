@@ -0,0 +1,116 @@
+from http import HTTPStatus
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, TitleDocument
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleDocuments:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_single_read(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 7)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 2, (
+            'Проверьте, что список произведений читается из документов '
+            'одним запросом (и запросом числа записей).'
+        )
+        results = response.json()['results']
+        assert [title['rating'] for title in results] == [None, 7]
+        assert results[1]['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert {genre['slug'] for genre in results[1]['genre']} == {
+            'horror', 'comedy'
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert len(queries) == 1
+        assert response.json() == results[1]
+        response = client.get(self.TITLES_URL, {'genre': 'drama'})
+        assert [title['name'] for title in response.json()['results']] == [
+            'Крепкий орешек'
+        ]
+        response = client.get(f'{self.TITLES_URL}999/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(f'{self.TITLES_URL}abc/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что нечисловой id произведения дает 404.'
+        )
+
+    def test_02_documents_follow_changes(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        admin_client.patch(url, data={'category': 'books', 'genre': ['drama']})
+        document = client.get(url).json()
+        assert document['category']['slug'] == 'books'
+        assert [genre['slug'] for genre in document['genre']] == ['drama']
+        category = Category.objects.get(slug='books')
+        category.name = 'Литература'
+        category.save()
+        assert client.get(url).json()['category']['name'] == 'Литература', (
+            'Проверьте, что переименование категории обновляет документы.'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        assert client.get(url).json()['genre'] == []
+        create_single_review(user_client, titles[0]['id'], 'Текст', 4)
+        assert client.get(url).json()['rating'] == 4
+        admin_client.delete(url)
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert TitleDocument.objects.count() == 1
+
+    def test_03_rebuild(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[1]["id"]}/'
+        expected = client.get(url).json()
+        TitleDocument.objects.update(data={})
+        call_command('rebuild_title_documents')
+        assert client.get(url).json() == expected
+
+    def test_04_migration_builds_same_documents(self, admin_client,
+                                                user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 7)
+        expected = {
+            document.title_id: (document.rating, document.data)
+            for document in TitleDocument.objects.all()
+        }
+        TitleDocument.objects.all().delete()
+        migration = import_module('reviews.migrations.0011_title_documents')
+        migration.fill_title_documents(apps, None)
+        assert {
+            document.title_id: (document.rating, document.data)
+            for document in TitleDocument.objects.all()
+        } == expected, (
+            'Проверьте, что миграция строит документы так же, как '
+            'TitleReadSerializer.'
+        )
+
+    def test_05_review_write_queries(self, client, admin_client,
+                                     user_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as queries:
+            response = create_single_review(
+                user_client, titles[0]['id'], 'Текст', 5
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(queries) <= 15, (
+            'Проверьте, что запись отзыва не перестраивает документ '
+            'произведения целиком.'
+        )
+        assert not any('reviews_genre' in query['sql'] for query in queries)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        document = client.get(url).json()
+        assert document['rating'] == 5
+        call_command('rebuild_title_documents')
+        assert client.get(url).json() == document
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.changes import read_changes
+from reviews.models import Change, Genre
+from tests.utils import create_single_review, create_titles
+
+CHANGES_URL = '/api/v1/changes/'
+
+
+def sync(client, token=None):
+    changes = []
+    while True:
+        response = client.get(
+            CHANGES_URL, {'since': token} if token else {}
+        )
+        assert response.status_code == HTTPStatus.OK
+        changes += response.json()['changes']
+        token = response.json()['token']
+        if not response.json()['has_more']:
+            return changes, token
+
+
+def summary(changes):
+    return {(change['model'], change['action']) for change in changes}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Changes:
+
+    def test_01_full_and_incremental_sync(self, client, admin_client,
+                                          user_client):
+        titles, _, _ = create_titles(admin_client)
+        changes, token = sync(client)
+        assert len([
+            change for change in changes if change['model'] == 'title'
+        ]) == 2, 'Проверьте, что каждый объект приходит один раз.'
+        assert summary(changes) == {
+            ('title', 'upsert'), ('category', 'upsert'), ('genre', 'upsert')
+        }
+        changes, token = sync(client, token)
+        assert changes == []
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Текст', 8
+        ).json()
+        changes, token = sync(client, token)
+        assert summary(changes) == {('review', 'upsert'), ('title', 'upsert')}
+        title = next(c for c in changes if c['model'] == 'title')
+        assert title['data']['rating'] == 8, (
+            'Проверьте, что изменение передает текущее представление.'
+        )
+        genre = Genre.objects.get(slug=titles[1]['genre'][0])
+        admin_client.delete(f'/api/v1/genres/{genre.slug}/')
+        admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        )
+        changes, _ = sync(client, token)
+        assert {
+            (change['model'], change['id'], change['action'])
+            for change in changes if change['action'] == 'delete'
+        } == {
+            ('review', review['id'], 'delete'), ('genre', genre.id, 'delete')
+        }
+        assert {
+            change['id'] for change in changes if change['model'] == 'title'
+        } == {titles[0]['id'], titles[1]['id']}
+
+    def test_02_paging_and_bad_token(self, client, admin_client):
+        create_titles(admin_client)
+        for since in ('abc', '²'):
+            response = client.get(CHANGES_URL, {'since': since})
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        expected, last_token = sync(client)
+        changes, token, pages = [], 0, 0
+        has_more = True
+        while has_more:
+            page, token, has_more = read_changes(token, limit=2)
+            changes += page
+            pages += 1
+        assert pages > 1
+        assert str(token) == last_token
+        assert summary(changes) == summary(expected)
+
+    def test_03_compaction(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        _, token = sync(client)
+        for year in (1985, 1986, 1987):
+            admin_client.patch(
+                f'/api/v1/titles/{titles[0]["id"]}/', data={'year': year}
+            )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        before = Change.objects.count()
+        call_command('compact_changes')
+        assert Change.objects.count() < before
+        assert Change.objects.filter(
+            model='title', object_id=titles[0]['id']
+        ).count() == 1, 'Проверьте, что перекрытые записи удаляются.'
+        changes, new_token = sync(client, token)
+        assert summary(changes) == {('title', 'upsert'), ('title', 'delete')}
+        Change.objects.filter(action='delete').update(
+            created=timezone.now() - timedelta(days=31)
+        )
+        call_command('compact_changes')
+        response = client.get(CHANGES_URL, {'since': token})
+        assert response.status_code == HTTPStatus.GONE, (
+            'Проверьте, что токен старше убранных удалений устаревает.'
+        )
+        assert client.get(
+            CHANGES_URL, {'since': new_token}
+        ).status_code == HTTPStatus.OK
+        changes, _ = sync(client)
+        assert len([c for c in changes if c['model'] == 'title']) == 1
@@ -0,0 +1,159 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+
+from api import asgi, events
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+EVENTS_URL = '/api/v1/events/'
+
+
+def make_scope(query_string, method='GET'):
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': EVENTS_URL,
+        'raw_path': EVENTS_URL.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+
+
+def subscribe_and_write(query_string, write, expected_frames):
+    """
+    Подписывается на поток, выполняет write и возвращает сообщения,
+    полученные до expected_frames событий.
+    """
+    messages = []
+    disconnect = asyncio.Event()
+    received = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        received.set()
+
+    def frames():
+        return [
+            message['body'] for message in messages[1:]
+            if message['body'].startswith(b'event:')
+        ]
+
+    async def run():
+        application = asgi.get_application()
+        task = asyncio.ensure_future(
+            application(make_scope(query_string), receive, send)
+        )
+        while len(messages) < 2:
+            received.clear()
+            await received.wait()
+        await sync_to_async(write)()
+        while len(frames()) < expected_frames:
+            received.clear()
+            await asyncio.wait_for(received.wait(), timeout=5)
+        disconnect.set()
+        await asyncio.wait_for(task, timeout=5)
+
+    async_to_sync(run)()
+    return messages[0], frames()
+
+
+def parse_frame(frame):
+    lines = dict(
+        line.split(': ', 1) for line in frame.decode().strip().split('\n')
+    )
+    return lines['event'], json.loads(lines['data'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Events:
+
+    def test_01_title_and_review_streams(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            admin_client, title_id, 'Отзыв', 6
+        ).json()
+
+        def write():
+            create_single_review(user_client, title_id, 'Новый отзыв', 9)
+            create_single_comment(
+                user_client, title_id, review['id'], 'Комментарий'
+            )
+
+        start, frames = subscribe_and_write(f'title={title_id}', write, 2)
+        assert start['status'] == HTTPStatus.OK
+        assert (b'content-type', b'text/event-stream; charset=utf-8') in (
+            start['headers']
+        )
+        (event, data), (comment_event, comment) = map(parse_frame, frames)
+        assert event == 'review' and data['text'] == 'Новый отзыв', (
+            'Проверьте, что подписчик произведения получает новые отзывы.'
+        )
+        assert comment_event == 'comment'
+        assert comment['review'] == review['id']
+
+        def comment_only():
+            create_single_review(user_client, titles[1]['id'], 'Другой', 5)
+            create_single_comment(
+                admin_client, title_id, review['id'], 'Ответ'
+            )
+
+        _, frames = subscribe_and_write(
+            f'review={review["id"]}', comment_only, 1
+        )
+        assert [parse_frame(frame)[0] for frame in frames] == ['comment'], (
+            'Проверьте, что подписчик отзыва получает только его комментарии.'
+        )
+
+    def test_02_between_processes(self, admin_client, user_client,
+                                  settings, tmp_path):
+        settings.EVENTS = {'DIR': str(tmp_path)}
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+
+        def write():
+            assert list(tmp_path.glob('*.sock')), (
+                'Проверьте, что процесс с подписчиками слушает unix-сокет.'
+            )
+            create_single_review(user_client, title_id, 'Текст', 7)
+
+        _, frames = subscribe_and_write(f'title={title_id}', write, 1)
+        assert parse_frame(frames[0])[1]['score'] == 7
+        events.broker.close()
+        assert not list(tmp_path.glob('*.sock'))
+
+    def test_03_bad_requests(self):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        application = asgi.get_application()
+        for query_string, method, status in (
+            ('', 'GET', HTTPStatus.BAD_REQUEST),
+            ('title=1&review=2', 'GET', HTTPStatus.BAD_REQUEST),
+            ('title=abc', 'GET', HTTPStatus.BAD_REQUEST),
+            ('title=1', 'POST', HTTPStatus.METHOD_NOT_ALLOWED),
+        ):
+            messages.clear()
+            async_to_sync(application)(
+                make_scope(query_string, method), receive, send
+            )
+            assert messages[0]['status'] == status, query_string
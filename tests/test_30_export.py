@@ -0,0 +1,151 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+
+from api import asgi
+from api.export import export
+from tests.utils import create_comments
+
+EXPORT_URL = '/api/v1/export/{}/'
+
+
+def read_lines(content):
+    return [json.loads(line) for line in content.splitlines()]
+
+
+def asgi_export(kind, token):
+    """Выполняет запрос выгрузки к ASGI-приложению проекта."""
+    messages = []
+    path = EXPORT_URL.format(kind)
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    async_to_sync(asgi.get_application())(scope, receive, send)
+    assert messages[-1].get('more_body', False) is False
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], body
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Export:
+
+    def test_01_endpoints(self, client, admin_client, user_client, admin,
+                          moderator_client, moderator):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+        })
+        response = client.get(EXPORT_URL.format('titles'))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что выгрузка доступна только авторизованным.'
+        )
+        for forbidden_client in (user_client, moderator_client):
+            response = forbidden_client.get(EXPORT_URL.format('titles'))
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что выгрузка доступна только администраторам.'
+            )
+        response = admin_client.get(EXPORT_URL.format('titles'))
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдается потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = read_lines(b''.join(response.streaming_content))
+        assert [row['id'] for row in rows] == sorted(
+            title['id'] for title in titles
+        )
+        assert rows[0]['rating'] == 5
+        response = admin_client.get(EXPORT_URL.format('reviews'))
+        rows = read_lines(b''.join(response.streaming_content))
+        assert [(row['id'], row['title'], row['author']) for row in rows] == [
+            (review['id'], titles[0]['id'], review['author'])
+            for review in reviews
+        ]
+        response = admin_client.get(
+            EXPORT_URL.format('comments'), {'compression': 'gzip'}
+        )
+        assert response['Content-Disposition'] == (
+            'attachment; filename="comments.ndjson.gz"'
+        )
+        rows = read_lines(
+            gzip.decompress(b''.join(response.streaming_content))
+        )
+        assert [row['text'] for row in rows] == [
+            comment['text'] for comment in comments
+        ]
+        assert rows[0]['review'] == reviews[0]['id']
+
+    def test_02_resume_and_errors(self, admin_client, admin,
+                                  moderator_client, moderator):
+        _, reviews, _ = create_comments(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+        })
+        response = admin_client.get(
+            EXPORT_URL.format('reviews'), {'after': reviews[0]['id']}
+        )
+        rows = read_lines(b''.join(response.streaming_content))
+        assert [row['id'] for row in rows] == [reviews[1]['id']], (
+            'Проверьте, что ?after= продолжает выгрузку после указанного id.'
+        )
+        assert list(export('reviews', chunk_size=1)) == [
+            line + b'\n' for line in b''.join(
+                export('reviews')
+            ).splitlines()
+        ], 'Проверьте, что выгрузка читается пачками по chunk_size.'
+        for params in (
+            {'after': 'abc'}, {'after': '²'}, {'compression': 'zip'}
+        ):
+            response = admin_client.get(EXPORT_URL.format('reviews'), params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(EXPORT_URL.format('users'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_command(self, admin_client, admin, tmp_path):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        path = tmp_path / 'titles.ndjson.gz'
+        call_command(
+            'export_ndjson', 'titles', output=str(path), gzip=True,
+            chunk_size=1, after=0,
+        )
+        first = read_lines(gzip.decompress(path.read_bytes()))
+        call_command(
+            'export_ndjson', 'titles', output=str(path), gzip=True,
+            after=first[0]['id'],
+        )
+        rows = read_lines(gzip.decompress(path.read_bytes()))
+        assert len(first) == len(titles)
+        assert rows == first + first[1:], (
+            'Проверьте, что продолжение дописывается в тот же файл.'
+        )
+
+    def test_04_asgi(self, admin_client, admin, token_admin):
+        _, reviews, _ = create_comments(admin_client, {admin: admin_client})
+        status, body = asgi_export('reviews', token_admin['access'])
+        assert status == HTTPStatus.OK
+        assert [row['id'] for row in read_lines(body)] == [
+            review['id'] for review in reviews
+        ], 'Проверьте, что выгрузка работает под ASGI.'
@@ -0,0 +1,182 @@
+import csv
+import sqlite3
+import threading
+import time
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections
+from django.utils.dateparse import parse_datetime
+
+from api import dump
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from tests.utils import create_comments
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.reader(file))
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    """
+    Копирует тестовую базу в файл в режиме WAL под псевдонимом
+    'snapshot': в отличие от общей базы в памяти, она дает писать
+    из другого соединения во время читающей транзакции.
+    """
+    path = str(tmp_path / 'snapshot.sqlite3')
+
+    def copy():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.execute('PRAGMA journal_mode=wal')
+        target.close()
+        connections.settings['snapshot'] = {
+            **connections.settings['default'], 'NAME': path,
+        }
+        return path
+
+    yield copy
+    if 'snapshot' in connections.settings:
+        connections['snapshot'].close()
+        del connections['snapshot']
+        del connections.settings['snapshot']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31DumpCsv:
+
+    def test_01_static_data_schema(self, admin_client, admin,
+                                   moderator_client, moderator, tmp_path):
+        create_comments(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+        })
+        call_command('dump_csv', str(tmp_path), chunk_size=1)
+        for table in dump.QUERIES:
+            assert read_csv(tmp_path / f'{table}.csv')[0] == read_csv(
+                DATA_DIR / f'{table}.csv'
+            )[0], f'Проверьте заголовок {table}.csv.'
+        assert not list(tmp_path.glob('*.part'))
+        users = read_csv(tmp_path / 'users.csv')[1:]
+        assert [int(row[0]) for row in users] == list(
+            User.objects.order_by('id').values_list('id', flat=True)
+        )
+        titles = read_csv(tmp_path / 'titles.csv')[1:]
+        assert len(titles) == Title.objects.count()
+        assert len(read_csv(tmp_path / 'genre_title.csv')) - 1 == (
+            Title.genre.through.objects.count()
+        )
+        review = Review.objects.order_by('id').first()
+        row = read_csv(tmp_path / 'review.csv')[1]
+        assert row[:5] == [
+            str(review.id), str(review.title_id), review.text,
+            str(review.author_id), str(review.score),
+        ]
+        assert row[5].endswith('Z')
+        assert parse_datetime(row[5]) == review.pub_date.replace(
+            microsecond=review.pub_date.microsecond // 1000 * 1000
+        ), 'Проверьте, что даты записываются как в static/data.'
+        comments = read_csv(tmp_path / 'comments.csv')[1:]
+        assert [int(row[0]) for row in comments] == list(
+            Comment.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def test_02_failed_dump_leaves_no_files(self, admin_client, admin,
+                                            tmp_path, monkeypatch):
+        create_comments(admin_client, {admin: admin_client})
+
+        def fail(value):
+            raise OSError('Диск заполнен.')
+
+        monkeypatch.setattr(dump, 'format_value', fail)
+        with pytest.raises(OSError):
+            dump.dump(tmp_path, ('category', 'review'), chunk_size=1)
+        assert list(tmp_path.iterdir()) == [], (
+            'Проверьте, что при ошибке не остается неполных файлов.'
+        )
+
+    def test_03_consistent_snapshot(self, admin_client, file_database,
+                                    tmp_path, monkeypatch):
+        titles = create_comments(admin_client, {})[2]
+        title_id = titles[0]['id']
+        genre_id = Genre.objects.exclude(title=title_id).first().id
+        path = file_database()
+        read_chunks = dump.read_chunks
+
+        def write_between_reads(queryset, chunk_size):
+            for number, chunk in enumerate(read_chunks(queryset, chunk_size)):
+                if queryset.model is Category and number == 0:
+                    # Категории прочитаны целиком, таблицу genre_title
+                    # выгрузка еще не читала.
+                    writer = threading.Thread(target=add_genre)
+                    writer.start()
+                    writer.join()
+                yield chunk
+
+        def add_genre():
+            with sqlite3.connect(path) as db:
+                db.execute(
+                    'INSERT INTO reviews_title_genre (title_id, genre_id) '
+                    'VALUES (?, ?)', (title_id, genre_id)
+                )
+
+        monkeypatch.setattr(dump, 'read_chunks', write_between_reads)
+        rows = dump.dump(
+            tmp_path / 'out', ('category', 'genre_title'), using='snapshot'
+        )
+        with sqlite3.connect(path) as db:
+            total, = db.execute(
+                'SELECT COUNT(*) FROM reviews_title_genre'
+            ).fetchone()
+        assert rows['genre_title'] == total - 1, (
+            'Проверьте, что все таблицы читаются из одного снимка: запись '
+            'во время выгрузки не должна в нее попасть.'
+        )
+
+    def test_04_failed_writer_does_not_hang(self, admin_client, tmp_path,
+                                            monkeypatch):
+        create_comments(admin_client, {})
+        write_table = dump.write_table
+        read_chunks = dump.read_chunks
+
+        def fail_categories(path, header, chunks):
+            if path.endswith('category.csv.part'):
+                time.sleep(0.2)
+                raise OSError('Диск заполнен.')
+            return write_table(path, header, chunks)
+
+        def fail_reading(queryset, chunk_size):
+            chunks = read_chunks(queryset, chunk_size)
+            yield next(chunks)
+            if queryset.model is Category:
+                chunks.close()
+                raise RuntimeError('Ошибка чтения.')
+            yield from chunks
+
+        monkeypatch.setattr(dump, 'write_table', fail_categories)
+        monkeypatch.setattr(dump, 'read_chunks', fail_reading)
+        monkeypatch.setattr(dump, 'QUEUE_CHUNKS', 1)
+        monkeypatch.setattr(dump, 'WAIT_SECONDS', 0.01)
+        errors = []
+
+        def run():
+            try:
+                dump.dump(tmp_path, ('category', 'genre'), chunk_size=1)
+            except (OSError, RuntimeError) as error:
+                errors.append(str(error))
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(10)
+        assert not thread.is_alive(), (
+            'Проверьте, что падение одного потока записи не блокирует '
+            'завершение остальных.'
+        )
+        assert errors
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connections
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    """Новое соединение с файловой базой SQLite."""
+    connections.settings['pragmas'] = {
+        **connections.settings['default'],
+        'NAME': str(tmp_path / 'pragmas.sqlite3'),
+    }
+    yield connections['pragmas']
+    connections['pragmas'].close()
+    del connections['pragmas']
+    del connections.settings['pragmas']
+
+
+def read_pragmas(connection):
+    with connection.cursor() as cursor:
+        return {
+            name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+            for name in ('journal_mode', 'busy_timeout', 'synchronous')
+        }
+
+
+@pytest.mark.django_db
+class Test32SqliteProduction:
+
+    def test_01_pragmas_applied(self, settings, file_connection):
+        settings.SQLITE_PRODUCTION = True
+        settings.SQLITE_PRAGMAS = {
+            **settings.SQLITE_PRAGMAS, 'busy_timeout': 1234,
+        }
+        assert read_pragmas(file_connection) == {
+            'journal_mode': 'wal',
+            'busy_timeout': 1234,
+            # synchronous=normal
+            'synchronous': 1,
+        }, 'Проверьте, что новое соединение получает SQLITE_PRAGMAS.'
+
+    def test_02_pragmas_skipped(self, settings, file_connection):
+        settings.SQLITE_PRODUCTION = False
+        settings.SQLITE_PRAGMAS = {
+            **settings.SQLITE_PRAGMAS, 'busy_timeout': 1234,
+        }
+        assert read_pragmas(file_connection) == {
+            'journal_mode': 'delete',
+            # Значение по умолчанию модуля sqlite3 (timeout=5).
+            'busy_timeout': 5000,
+            # synchronous=full
+            'synchronous': 2,
+        }, 'Проверьте, что без SQLITE_PRODUCTION PRAGMA не меняются.'